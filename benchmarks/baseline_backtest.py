@@ -0,0 +1,235 @@
+"""동등성 검사의 고정 기준: 최적화 전 backtest_fast (기준 커밋 8f96397 의 modules/strategy.py 에서 그대로 복사)
+
+run_backtest/엔진이 바뀌어도 기준이 같이 움직이지 않도록 함수 본문은 고치지 않습니다
+(이 함수들이 안 쓰는 streamlit 등 import 만 뺌). 호출 쪽 맞춤은 equivalence.baseline_result 에 있습니다.
+"""
+import numpy as np
+import pandas as pd
+
+def calculate_bollinger_bands(close_data, period, std_dev_mult):
+    period = int(period)
+    close_series = pd.Series(close_data)
+    ma = close_series.rolling(window=period).mean()
+    std = close_series.rolling(window=period).std()
+    upper = ma + (std * std_dev_mult)
+    lower = ma - (std * std_dev_mult)
+    return ma.to_numpy(), upper.to_numpy(), lower.to_numpy()
+
+def calculate_indicators(close_data, rsi_period):
+    rsi_period = int(rsi_period)
+    df = pd.DataFrame({'close': close_data})
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi.to_numpy()
+
+def backtest_fast(base, x_sig, x_trd, ma_dict_sig, ma_buy, offset_ma_buy, ma_sell, offset_ma_sell, offset_cl_buy, offset_cl_sell, ma_compare_short, ma_compare_long, offset_compare_short, offset_compare_long, initial_cash, stop_loss_pct, take_profit_pct, strategy_behavior, min_hold_days, fee_bps, slip_bps, use_trend_in_buy, use_trend_in_sell, buy_operator, sell_operator, 
+                  use_rsi_filter=False, rsi_period=14, rsi_min=30, rsi_max=70,
+                  use_market_filter=False, x_mkt=None, ma_mkt_arr=None,
+                  use_bollinger=False, bb_period=20, bb_std=2.0, 
+                  bb_entry_type="상단선 돌파 (추세)", bb_exit_type="중심선(MA) 이탈",
+                  use_atr_stop=False, atr_multiplier=2.0):
+    
+    n = len(base)
+    if n == 0: return {}
+    
+    ma_buy_arr, ma_sell_arr = ma_dict_sig.get(int(ma_buy)), ma_dict_sig.get(int(ma_sell))
+    ma_s_arr = ma_dict_sig.get(int(ma_compare_short)) if ma_compare_short else None
+    ma_l_arr = ma_dict_sig.get(int(ma_compare_long)) if ma_compare_long else None
+    rsi_arr = calculate_indicators(x_sig, int(rsi_period)) if use_rsi_filter else None
+    atr_arr = base["ATR"].to_numpy(dtype=float) if "ATR" in base.columns else np.zeros(n)
+    
+    bb_up, bb_mid, bb_lo = None, None, None
+    if use_bollinger: bb_mid, bb_up, bb_lo = calculate_bollinger_bands(x_sig, bb_period, bb_std)
+
+    idx0 = 50
+    xC_trd = x_trd
+    cash, position, hold_days, entry_price = float(initial_cash), 0.0, 0, 0.0
+    logs, asset_curve = [], []
+
+    def _fill(px, type): return px * (1 + (slip_bps + fee_bps)/10000.0) if type=='buy' else px * (1 - (slip_bps + fee_bps)/10000.0)
+
+    for i in range(idx0, n):
+        just_bought = False
+        exec_price, signal, reason, reason_detail = None, "HOLD", None, ""
+        close_today = xC_trd[i]
+        open_today, low_today, high_today = base["Open_trd"].iloc[i], base["Low_trd"].iloc[i], base["High_trd"].iloc[i]
+
+        try:
+            cl_b, ma_b = x_sig[i - int(offset_cl_buy)], ma_buy_arr[i - int(offset_ma_buy)]
+            cl_s, ma_s = x_sig[i - int(offset_cl_sell)], ma_sell_arr[i - int(offset_ma_sell)]
+        except: 
+            asset_curve.append(cash + position * close_today)
+            continue
+
+        buy_cond, sell_cond = False, False
+        buy_msg, sell_msg = "", "" 
+
+        # 1. 기술적 지표 조건 판단
+        if use_bollinger:
+            idx_b, idx_s = i - int(offset_cl_buy), i - int(offset_cl_sell)
+            
+            if "상단선" in str(bb_entry_type): 
+                buy_cond = cl_b > bb_up[idx_b]
+                buy_msg = f"종가({cl_b:.2f}) > 상단({bb_up[idx_b]:.2f})"
+            elif "하단선" in str(bb_entry_type): 
+                buy_cond = cl_b < bb_lo[idx_b]
+                buy_msg = f"종가({cl_b:.2f}) < 하단({bb_lo[idx_b]:.2f})"
+            else: 
+                buy_cond = cl_b > bb_mid[idx_b]
+                buy_msg = f"종가({cl_b:.2f}) > 중심({bb_mid[idx_b]:.2f})"
+
+            if "상단선" in str(bb_exit_type): 
+                sell_cond = cl_s < bb_up[idx_s]
+                sell_msg = f"종가({cl_s:.2f}) < 상단({bb_up[idx_s]:.2f})"
+            elif "하단선" in str(bb_exit_type): 
+                sell_cond = cl_s < bb_lo[idx_s]
+                sell_msg = f"종가({cl_s:.2f}) < 하단({bb_lo[idx_s]:.2f})"
+            else: 
+                sell_cond = cl_s < bb_mid[idx_s]
+                sell_msg = f"종가({cl_s:.2f}) < 중심({bb_mid[idx_s]:.2f})"
+        else:
+            t_ok = True
+            t_msg = ""
+            if ma_s_arr is not None: 
+                s_val = ma_s_arr[i-int(offset_compare_short)]
+                l_val = ma_l_arr[i-int(offset_compare_long)]
+                t_ok = s_val >= l_val
+                t_msg = f" [추세:{'상승' if t_ok else '하락'}]"
+
+            if buy_operator == ">":
+                buy_cond = (cl_b > ma_b)
+                buy_msg = f"종가({cl_b:.2f}) > 이평({ma_b:.2f})"
+            else:
+                buy_cond = (cl_b < ma_b)
+                buy_msg = f"종가({cl_b:.2f}) < 이평({ma_b:.2f})"
+            
+            if use_trend_in_buy and not t_ok: 
+                buy_cond = False
+                buy_msg += " (추세필터거부)"
+
+            if sell_operator == "OFF":
+                sell_cond = False
+                sell_msg = "매도조건 OFF"
+            else:
+                if sell_operator == "<":
+                    sell_cond = (cl_s < ma_s)
+                    sell_msg = f"종가({cl_s:.2f}) < 이평({ma_s:.2f})"
+                else:
+                    sell_cond = (cl_s > ma_s)
+                    sell_msg = f"종가({cl_s:.2f}) > 이평({ma_s:.2f})"
+                
+                if use_trend_in_sell and t_ok: 
+                    sell_cond = False
+                    sell_msg += " (역추세필터거부)"
+
+        if buy_cond and use_rsi_filter:
+            if rsi_arr[i-1] > rsi_max: 
+                buy_cond = False
+                buy_msg += f" (RSI 과열 {rsi_arr[i-1]:.1f})"
+        
+        if buy_cond and use_market_filter:
+            if x_mkt[i] < ma_mkt_arr[i]: 
+                buy_cond = False
+                buy_msg += f" (시장하락장 {x_mkt[i]:.1f})"
+
+        # 2. 매도 OFF 강제 적용
+        if sell_operator == "OFF":
+            sell_cond = False
+            sell_msg = "OFF"
+
+        stop_hit, take_hit = False, False
+        sold_today = False 
+
+        # 3. 포지션 관리 (진입/청산)
+        if position > 0:
+            current_stop_price = 0.0
+            atr_info_str = ""
+            
+            if use_atr_stop and atr_arr[i-hold_days] > 0: 
+                 entry_idx = i - hold_days
+                 if entry_idx >= 0:
+                     entry_atr = atr_arr[entry_idx]
+                     current_stop_price = entry_price - (entry_atr * float(atr_multiplier))
+                     atr_info_str = f"(ATR:{entry_atr:.2f}x{atr_multiplier})"
+            elif stop_loss_pct > 0:
+                current_stop_price = entry_price * (1 - stop_loss_pct / 100)
+                atr_info_str = f"(-{stop_loss_pct}%)"
+            
+            if current_stop_price > 0 and low_today <= current_stop_price:
+                stop_hit = True
+                exec_price = open_today if open_today < current_stop_price else current_stop_price
+                reason_detail = f"장중저가({low_today:.2f}) <= 손절가({current_stop_price:.2f}) {atr_info_str}"
+            
+            if take_profit_pct > 0 and not stop_hit:
+                tp_price = entry_price * (1 + take_profit_pct / 100)
+                if high_today >= tp_price: 
+                    take_hit = True
+                    exec_price = open_today if open_today > tp_price else tp_price
+                    reason_detail = f"장중고가({high_today:.2f}) >= 익절가({tp_price:.2f})"
+
+            if stop_hit or take_hit:
+                if not stop_hit and not take_hit: exec_price = close_today 
+                cash = position * _fill(exec_price, 'sell')
+                
+                r_type = "손절" if stop_hit else "익절"
+                if stop_hit and use_atr_stop: r_type = "ATR손절"
+                
+                position, signal, reason, entry_price = 0.0, "SELL", r_type, 0.0
+                sold_today = True
+
+        if position > 0 and signal == "HOLD":
+            if sell_cond and hold_days >= int(min_hold_days):
+                exec_price = close_today
+                cash = position * _fill(exec_price, 'sell')
+                position, signal, reason, entry_price = 0.0, "SELL", "전략매도", 0.0
+                reason_detail = sell_msg
+                sold_today = True
+
+        elif position == 0 and not sold_today:
+            if buy_cond:
+                exec_price = close_today
+                position = cash / _fill(exec_price, 'buy')
+                cash, signal, reason, just_bought, entry_price = 0.0, "BUY", "전략매수", True, exec_price
+                reason_detail = buy_msg
+
+        hold_days = hold_days + 1 if position > 0 and not just_bought else 0
+        total = cash + (position * close_today)
+        asset_curve.append(total)
+        
+        # [NEW] 로그에 상세 내용(reason_detail) 포함
+        if signal != "HOLD":
+            logs.append({
+                "날짜": base["Date"].iloc[i], "종가": close_today, "신호": signal, 
+                "체결가": exec_price, "자산": total, "이유": reason, 
+                "상세내용": reason_detail, "손절발동": stop_hit, "익절발동": take_hit
+            })
+
+    if not logs: return {}
+    s = pd.Series(asset_curve)
+    
+    g_profit, g_loss, wins = 0, 0, 0
+    last_buy_price = None
+    for r in logs:
+        if r['신호'] == 'BUY': last_buy_price = r['체결가']
+        elif r['신호'] == 'SELL' and last_buy_price:
+            pnl = (r['체결가'] - last_buy_price) / last_buy_price
+            if pnl > 0: wins += 1; g_profit += pnl
+            else: g_loss += abs(pnl)
+            last_buy_price = None
+            
+    total_sells = len([l for l in logs if l['신호']=='SELL'])
+    pf = (g_profit / g_loss) if g_loss > 0 else 999.0
+    win_rate = (wins / total_sells * 100) if total_sells > 0 else 0.0
+
+    return {
+        "수익률 (%)": round((asset_curve[-1] - initial_cash)/initial_cash*100, 2),
+        "MDD (%)": round(((s - s.cummax()) / s.cummax()).min() * 100, 2),
+        "승률 (%)": round(win_rate, 2),
+        "Profit Factor": round(pf, 2),
+        "총 매매 횟수": total_sells,
+        "매매 로그": logs,
+        "차트데이터": {"ma_buy_arr": ma_buy_arr[idx0:], "ma_sell_arr": ma_sell_arr[idx0:], "base": base.iloc[idx0:].reset_index(drop=True), "bb_up": bb_up[idx0:] if use_bollinger else None, "bb_lo": bb_lo[idx0:] if use_bollinger else None}
+    }
@@ -0,0 +1,345 @@
+"""고속 엔진 경로 동등성 검사 (기준: 최적화 전 backtest_fast 원본 루프, benchmarks/baseline_backtest.py)
+
+    python -m benchmarks.equivalence                                   # 합성 데이터 6종 x 무작위 설정 300개
+    python -m benchmarks.equivalence --datasets 10 --configs 1000 --seed 7
+    python -m benchmarks.equivalence --real .quantlab_cache            # CLI 디스크 캐시의 실제 시세도 포함
+    python -m benchmarks.equivalence --candidates event_jump batch --out eq.json
+
+후보마다 매매 로그(봉, 매수/매도, 체결가, 자산, 사유)·요약 지표·마지막 봉 보유 상태를 기준과 비교하고
+처음 어긋난 봉을 보고합니다 (지표만 내는 후보는 end 를 줄여 가며 이분 탐색). 하나라도 어긋나면 종료 코드 1.
+손절 우선(같은 봉 익절보다), 시가 갭 체결, 진입 시점 ATR 고정 손절, 매도한 봉 재진입 금지가 실제로
+몇 번 나왔는지도 함께 세어 검사 범위를 보여 줍니다.
+horizons 는 상장이 가장 긴 구간보다 늦은 종목으로 evaluate_horizons(한 번 로드, 구간별 워밍업)를
+구간마다 prepare_base 를 새로 부른 기준 결과와 비교합니다 (구간 첫 봉 날짜 포함).
+새 고속 경로는 CANDIDATES 에 (데이터, 설정 목록, rng) → 설정별 {"events", "metrics", "holding"} 함수를 넣으면 됩니다.
+"""
+import argparse
+import inspect
+import json
+import os
+import pickle
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.config import PARAM_DEFAULTS, StrategyConfig, BB_ENTRY_LABELS, BB_EXIT_LABELS
+from modules.engine import IDX0, ConditionCache, compile_strategy, evaluate_horizons, evaluate_many, market_arrays, simulate, simulate_nxt, summarize
+from modules.strategy import prepare_base, run_backtest
+from .baseline_backtest import backtest_fast as baseline_backtest_fast
+from .synthetic import synthetic_get_data, use_data, years_ago
+
+CASH = 5000000
+MAS = [1, 5, 10, 20, 50, 60, 120]
+MA_POOL = MAS + [200]
+METRIC_KEYS = ["수익률 (%)", "MDD (%)", "승률 (%)", "Profit Factor", "총 매매 횟수"]
+METRIC_TOL = 0.0101      # 지표는 둘 다 소수 둘째 자리 반올림이라 경계에서 0.01 차이는 허용
+PRICE_RTOL, ASSET_RTOL = 1e-9, 1e-7
+SYNTHETIC_YEARS = (3, 8, 15, 25, 40)
+HORIZON_YEARS = (5, 10, 15, 20)
+SHORT_TICKER, SHORT_START = "SYNH", "2019-03-01"   # 가장 긴 구간보다 늦게 상장한 종목 (BITX 처럼)
+
+_raw_prepare_base = inspect.unwrap(prepare_base)
+
+# --- 무작위 설정 ---
+def random_params(rng):
+    """엔진이 쓰는 모든 분기(연산자 OFF, 추세/RSI/시장/볼린저 필터, 고정·ATR 손절, 익절, 최소 보유, 비용)를 고르게 섞은 설정"""
+    offs = [0, 1, 5, 10, 20, 50]
+    return {**PARAM_DEFAULTS,
+            "ma_buy": rng.choice(MAS), "ma_sell": rng.choice(MAS), "offset_ma_buy": rng.choice(offs), "offset_ma_sell": rng.choice(offs),
+            "offset_cl_buy": rng.choice(offs), "offset_cl_sell": rng.choice(offs),
+            "ma_compare_short": rng.choice(MAS), "ma_compare_long": rng.choice(MAS),
+            "offset_compare_short": rng.choice(offs), "offset_compare_long": rng.choice(offs),
+            "use_trend_in_buy": rng.random() < 0.5, "use_trend_in_sell": rng.random() < 0.5,
+            "buy_operator": rng.choice([">", "<"]), "sell_operator": rng.choice(["<", ">", "OFF"]),
+            "stop_loss_pct": rng.choice([0.0, 0.0, 5.0, 15.0, 25.0]), "take_profit_pct": rng.choice([0.0, 0.0, 10.0, 25.0]),
+            "use_atr_stop": rng.random() < 0.3, "atr_multiplier": rng.choice([1.0, 2.0, 3.0]),
+            "min_hold_days": rng.choice([0, 0, 0, 3, 10]), "fee_bps": rng.choice([0.0, 25.0]), "slip_bps": rng.choice([0.0, 1.0, 5.0]),
+            "use_rsi_filter": rng.random() < 0.2, "rsi_period": rng.choice([7, 14]), "rsi_max": rng.choice([60, 70, 80]),
+            "use_market_filter": rng.random() < 0.2,
+            "use_bollinger": rng.random() < 0.2, "bb_period": rng.choice([10, 20]), "bb_std": rng.choice([1.5, 2.0]),
+            "bb_entry_type": rng.choice(list(BB_ENTRY_LABELS)), "bb_exit_type": rng.choice(list(BB_EXIT_LABELS))}
+
+# --- 데이터 ---
+def _dataset(name, sig, trd, mkt, start, end, get_data):
+    with use_data(get_data):
+        base, x_sig, x_trd, ma, x_mkt, ma_mkt = _raw_prepare_base(sig, trd, mkt, start, end, MA_POOL)
+    if base is None or len(base) <= IDX0 + 20: return None
+    return {"name": name, "base": base, "x_sig": x_sig, "x_trd": x_trd, "ma": ma, "x_mkt": x_mkt, "ma_mkt": ma_mkt,
+            "arrs": market_arrays(base, x_sig, x_trd, ma, x_mkt, ma_mkt),
+            "bar_of": {d: i for i, d in enumerate(base["Date"])}}
+
+def synthetic_datasets(count):
+    # 길이(3~40년), 시그널/매매 종목 분리 여부, 시장 지수 유무를 돌려 가며
+    out = []
+    for k in range(count):
+        years = SYNTHETIC_YEARS[k % len(SYNTHETIC_YEARS)]
+        sig, trd = f"SYN{k}", (f"SYN{k}" if k % 3 else f"SYN{k}B")
+        mkt = "SPY" if k % 2 == 0 else ""
+        ds = _dataset(f"synthetic:{sig}/{trd}/{mkt or '-'}/{years}y", sig, trd, mkt, *years_ago(years), synthetic_get_data)
+        if ds is not None: out.append(ds)
+    return out
+
+def real_datasets(cache_dir, limit=None):
+    """DiskCache 폴더의 get_data 결과(pickle)를 시그널=매매 종목으로 사용 (티커 이름은 파일에 없어 파일명으로 표시)"""
+    frames = {}
+    try: names = sorted(n for n in os.listdir(cache_dir) if n.startswith("get_data-") and n.endswith(".pkl"))
+    except OSError: return []
+    for n in names:
+        try:
+            with open(os.path.join(cache_dir, n), "rb") as f: _, df = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError, ImportError): continue
+        if isinstance(df, pd.DataFrame) and len(df) > IDX0 + 250 and {"Date", "Open", "High", "Low", "Close"} <= set(df.columns):
+            frames[n[9:21]] = df
+        if limit and len(frames) >= limit: break
+    get = lambda t, s, e: frames[t] if t in frames else pd.DataFrame(columns=["Date", "Open", "High", "Low", "Close", "Volume"])
+    out = []
+    for key, df in frames.items():
+        ds = _dataset(f"real:{key}", key, key, "", df["Date"].min(), df["Date"].max(), get)
+        if ds is not None: out.append(ds)
+    return out
+
+def _prefix(ds, end):
+    # 앞 end 봉만 남긴 데이터 (지표는 모두 과거만 보므로 잘라도 값이 같음)
+    sl = lambda a: None if a is None else a[:end]
+    return {**ds, "base": ds["base"].iloc[:end].reset_index(drop=True), "x_sig": ds["x_sig"][:end], "x_trd": ds["x_trd"][:end],
+            "ma": {w: a[:end] for w, a in ds["ma"].items()}, "x_mkt": sl(ds["x_mkt"]), "ma_mkt": sl(ds["ma_mkt"])}
+
+# --- 기준 ---
+def _metrics(res):
+    return {k: res[k] for k in METRIC_KEYS} if res else {}
+
+def _ref_result(ds, res):
+    events = [(ds["bar_of"][log["날짜"]], log["신호"], float(log["체결가"]), float(log["자산"]), log["이유"]) for log in res.get("매매 로그", [])]
+    st = res.get("최종상태")
+    holding = (st["position"] > 0, st["entry_idx"] if st["position"] > 0 else -1) if st else (False, -1)
+    return {"events": events, "metrics": _metrics(res), "holding": holding}
+
+def baseline_result(ds, d, cfg):
+    """원본 backtest_fast 결과를 비교 형식으로. 원본은 마지막 상태를 안 돌려주므로 보유는 마지막 로그가 매수인지로 판단.
+    시장 지수가 없는 데이터에서 원본은 시장 필터를 켜면 x_mkt[i] 에서 멈추므로, 엔진처럼 필터 없음으로 넘김"""
+    p = cfg.to_dict()
+    res = baseline_backtest_fast(
+        d["base"], d["x_sig"], d["x_trd"], d["ma"], p["ma_buy"], p["offset_ma_buy"], p["ma_sell"], p["offset_ma_sell"],
+        p["offset_cl_buy"], p["offset_cl_sell"], p["ma_compare_short"], p["ma_compare_long"], p["offset_compare_short"], p["offset_compare_long"],
+        CASH, p["stop_loss_pct"], p["take_profit_pct"], p["strategy_behavior"], p["min_hold_days"], p["fee_bps"], p["slip_bps"],
+        p["use_trend_in_buy"], p["use_trend_in_sell"], p["buy_operator"], p["sell_operator"],
+        use_rsi_filter=p["use_rsi_filter"], rsi_period=p["rsi_period"], rsi_max=p["rsi_max"],
+        use_market_filter=p["use_market_filter"] and d["x_mkt"] is not None, x_mkt=d["x_mkt"], ma_mkt_arr=d["ma_mkt"],
+        use_bollinger=p["use_bollinger"], bb_period=p["bb_period"], bb_std=p["bb_std"],
+        bb_entry_type=p["bb_entry_type"], bb_exit_type=p["bb_exit_type"], use_atr_stop=p["use_atr_stop"], atr_multiplier=p["atr_multiplier"])
+    events = [(ds["bar_of"][log["날짜"]], log["신호"], float(log["체결가"]), float(log["자산"]), log["이유"]) for log in res.get("매매 로그", [])]
+    holding = (True, events[-1][0]) if events and events[-1][1] == "BUY" else (False, -1)
+    return {"events": events, "metrics": _metrics(res), "holding": holding}
+
+def reference(ds, cfg, end=None):
+    d = ds if end is None else _prefix(ds, end)
+    return baseline_result(ds, d, cfg)
+
+# --- 후보 ---
+def _events_result(eq, events):
+    ev = [(int(b), side, float(px), float(asset), reason) for b, side, px, asset, reason in events]
+    holding = (True, ev[-1][0]) if ev and ev[-1][1] == "BUY" else (False, -1)
+    return {"events": ev, "metrics": summarize(eq, events, CASH), "holding": holding}
+
+def cand_event_jump(ds, cfgs, rng):
+    """compile_strategy + simulate (오늘 시그널/프리셋 요약이 쓰는 이벤트 점프 엔진)"""
+    out = []
+    for cfg in cfgs:
+        comp = compile_strategy(ds["arrs"], cfg)
+        out.append(_events_result(*simulate(ds["arrs"], comp["q"], comp["buy"], comp["sell"], IDX0, None, CASH)))
+    return out
+
+def cand_condition_cache(ds, cfgs, rng):
+    """ConditionCache + simulate_nxt (자동 탐색이 쓰는 조건 배열 재사용 경로, 캐시를 설정 간 공유)"""
+    cache = ConditionCache(maxsize=64)
+    out = []
+    for cfg in cfgs:
+        q = compile_strategy(ds["arrs"], cfg)["q"]
+        nb, ns = cache.signals(ds["arrs"], q)
+        out.append(_events_result(*simulate_nxt(ds["arrs"], q, nb, ns, IDX0, None, CASH)))
+    return out
+
+def _batch_result(r):
+    return {"metrics": {k: r[k] for k in METRIC_KEYS} if r else {}, "holding": (r["보유중"], r["진입봉"]) if r else None}
+
+def cand_batch(ds, cfgs, rng):
+    """evaluate_many (설정 여러 개를 한 봉 루프로, 프리셋 탭/CLI 경로) — 지표와 보유 상태만"""
+    return [_batch_result(r) for r in evaluate_many(ds["arrs"], cfgs, IDX0, None, CASH)]
+
+def _batch_prefix(ds, cfg, end):
+    return _batch_result(evaluate_many(ds["arrs"], [cfg], IDX0, end, CASH)[0])
+
+def cand_resume(ds, cfgs, rng):
+    """run_backtest 를 무작위 봉에서 끊고 "최종상태" 로 나머지를 이어서 계산 (프리셋 상태 저장 경로)"""
+    out, n = [], len(ds["base"])
+    for cfg in cfgs:
+        m = rng.randint(IDX0 + 1, n - 1)
+        d = _prefix(ds, m)
+        first = run_backtest(d["base"], d["x_sig"], d["x_trd"], d["ma"], cfg, CASH, d["x_mkt"], d["ma_mkt"])
+        full = run_backtest(ds["base"], ds["x_sig"], ds["x_trd"], ds["ma"], cfg, CASH, ds["x_mkt"], ds["ma_mkt"], state=first.get("최종상태"))
+        res = _ref_result(ds, full)
+        if full.get("이어서계산"): res["events"] = _ref_result(ds, first)["events"] + res["events"]
+        out.append(res)
+    return out
+
+def cand_batch_resume(ds, cfgs, rng):
+    """evaluate_many 를 무작위 봉에서 끊고 상태로 이어서 계산"""
+    m = rng.randint(IDX0 + 1, len(ds["base"]) - 1)
+    _, states = evaluate_many(ds["arrs"], cfgs, IDX0, m, CASH, return_states=True)
+    return [_batch_result(r) for r in evaluate_many(ds["arrs"], cfgs, m, None, CASH, states=states)]
+
+# 이름 → (설정 목록을 한 번에 평가하는 함수, 지표만 낼 때 첫 차이 봉을 찾는 (ds, cfg, end) 함수 또는 None)
+CANDIDATES = {
+    "event_jump": (cand_event_jump, None),
+    "condition_cache": (cand_condition_cache, None),
+    "batch": (cand_batch, _batch_prefix),
+    "resume": (cand_resume, None),
+    "batch_resume": (cand_batch_resume, None),
+}
+
+# --- 구간(시작일)별 평가: evaluate_horizons vs 구간마다 새로 로드 ---
+def _short_history(ticker, start, end):
+    df = synthetic_get_data(ticker, start, end)
+    return df[df["Date"] >= pd.Timestamp(SHORT_START)].reset_index(drop=True) if ticker == SHORT_TICKER else df
+
+def check_horizons(configs, seed, log=print, max_report=20):
+    """시그널/매매 종목 이력이 구간보다 짧을 때 evaluate_horizons 의 구간별 결과/첫 봉이 새 prepare_base + 기준과 같은지"""
+    rep = {"설정": 0, "불일치": 0, "목록": []}
+    starts, end = [years_ago(y)[0] for y in HORIZON_YEARS], years_ago(0)[1]
+    rng = random.Random(seed)
+    cfgs = [StrategyConfig.from_dict(random_params(rng)) for _ in range(configs)]
+    # 짧은 종목이 시그널이면 매매 종목 ATR 은 이미 워밍업돼 있고, 매매 종목이면 상장 후 ATR 워밍업만큼 잘림
+    for sig, trd in [(SHORT_TICKER, "SYNQ"), ("SYNQ", SHORT_TICKER)]:
+        t0 = time.perf_counter()
+        full = _dataset("horizon:full", sig, trd, "SPY", min(starts), end, _short_history)
+        res, idx = evaluate_horizons(full["arrs"], cfgs, starts)
+        for h, (years, start) in enumerate(zip(HORIZON_YEARS, starts)):
+            ds = _dataset(f"horizon:{sig}/{trd}/SPY/{years}y", sig, trd, "SPY", start, end, _short_history)
+            s = idx[h]
+            got = full["base"]["Date"].iloc[s] if s < len(full["base"]) else None
+            want = ds["base"]["Date"].iloc[0]
+            for cfg, r in zip(cfgs, res[h]):
+                rep["설정"] += 1
+                if got != want:
+                    d = {"종류": "구간 첫 봉", "봉": s, "기준": str(want.date()), "후보": str(got.date()) if got is not None else None}
+                else:
+                    cand = _batch_result(r)
+                    if cand["holding"] and cand["holding"][0]: cand["holding"] = (True, cand["holding"][1] - s)   # 구간 첫 봉 기준 위치로
+                    d = first_diff(reference(ds, cfg), cand)
+                if d is None: continue
+                rep["불일치"] += 1
+                if len(rep["목록"]) < max_report: rep["목록"].append({"데이터": ds["name"], "설정": cfg.to_dict(), **d})
+        log(f"  {f'horizon:{sig}/{trd} ({SHORT_TICKER} {SHORT_START}~)':<34} 구간 {len(starts)} · 설정 {configs} · {time.perf_counter() - t0:.1f}s")
+    return rep
+
+# --- 비교 ---
+def _close(a, b, rtol):
+    return a == b or abs(a - b) <= rtol * max(abs(a), abs(b), 1.0)
+
+def first_diff(ref, cand):
+    """첫 차이 {종류, 봉, 기준, 후보, ...} 또는 None. 후보에 없는 항목(events/holding)은 비교하지 않음"""
+    ev_r, ev_c = ref["events"], cand.get("events")
+    if ev_c is not None:
+        for k, (a, b) in enumerate(zip(ev_r, ev_c)):
+            if a[0] != b[0] or a[1] != b[1] or a[4] != b[4] or not _close(a[2], b[2], PRICE_RTOL) or not _close(a[3], b[3], ASSET_RTOL):
+                return {"종류": "매매 로그", "순번": k, "봉": min(a[0], b[0]), "기준": a, "후보": b}
+        if len(ev_r) != len(ev_c):
+            k = min(len(ev_r), len(ev_c))
+            extra = (ev_r if len(ev_r) > k else ev_c)[k]
+            return {"종류": "매매 로그", "순번": k, "봉": extra[0], "기준": ev_r[k] if len(ev_r) > k else None, "후보": ev_c[k] if len(ev_c) > k else None}
+    m_r, m_c = ref["metrics"], cand.get("metrics", {})
+    if bool(m_r) != bool(m_c): return {"종류": "지표", "항목": "매매 유무", "봉": None, "기준": m_r, "후보": m_c}
+    for key in METRIC_KEYS if m_r else []:
+        if abs(float(m_r[key]) - float(m_c[key])) > METRIC_TOL:
+            return {"종류": "지표", "항목": key, "봉": None, "기준": m_r[key], "후보": m_c[key]}
+    if cand.get("holding") is not None and m_r and tuple(cand["holding"]) != tuple(ref["holding"]):
+        return {"종류": "보유", "봉": None, "기준": ref["holding"], "후보": tuple(cand["holding"])}
+    return None
+
+def _bisect_bar(ds, cfg, prefix_fn):
+    # 지표만 내는 후보: end 를 줄여 가며 기준과 달라지는 가장 이른 끝 봉 (단조라고 가정한 이분 탐색)
+    lo, hi = IDX0 + 1, len(ds["base"])
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if first_diff(reference(ds, cfg, mid), prefix_fn(ds, cfg, mid)) is None: lo = mid + 1
+        else: hi = mid
+    return lo - 1
+
+# --- 검사 범위 (기준 매매 로그에서 규칙별로 몇 번 나왔는지) ---
+def coverage(ds, cfg, ref, counts):
+    arrs = ds["arrs"]
+    bump = lambda k: counts.__setitem__(k, counts.get(k, 0) + 1)
+    buy, entry = None, None
+    for bar, side, px, _, reason in ref["events"]:
+        bump(reason)
+        if side == "BUY":
+            entry = px; continue
+        if buy is None: buy = compile_strategy(arrs, cfg)["buy"]
+        if buy[bar]: bump("매도 봉 재진입 차단")
+        if reason == "전략매도": continue
+        if px == arrs["open"][bar]: bump("시가 갭 체결")
+        # 손절 봉에서 익절가에도 닿았으면 손절 우선 규칙이 쓰인 것
+        if reason != "익절" and cfg.take_profit_pct > 0 and arrs["high"][bar] >= entry * (1 + cfg.take_profit_pct / 100):
+            bump("손절·익절 같은 봉")
+
+def run(datasets, configs, seed, names, log=print, max_report=20):
+    """데이터마다 무작위 설정 configs 개를 기준/후보로 돌려 후보별 {설정 수, 불일치 수, 불일치 목록} 과 검사 범위를 반환"""
+    report = {name: {"설정": 0, "불일치": 0, "목록": []} for name in names}
+    counts = {}
+    for di, ds in enumerate(datasets):
+        rng = random.Random(seed * 1000 + di)
+        cfgs = [StrategyConfig.from_dict(random_params(rng)) for _ in range(configs)]
+        t0 = time.perf_counter()
+        refs = [reference(ds, cfg) for cfg in cfgs]
+        for cfg, ref in zip(cfgs, refs): coverage(ds, cfg, ref, counts)
+        for name in names:
+            fn, prefix_fn = CANDIDATES[name]
+            rep = report[name]
+            for cfg, ref, cand in zip(cfgs, refs, fn(ds, cfgs, random.Random(seed * 1000 + di))):
+                rep["설정"] += 1
+                d = first_diff(ref, cand)
+                if d is None: continue
+                rep["불일치"] += 1
+                if d["봉"] is None and prefix_fn is not None: d["봉"] = _bisect_bar(ds, cfg, prefix_fn)
+                if d["봉"] is not None: d["날짜"] = str(ds["base"]["Date"].iloc[d["봉"]].date())
+                if len(rep["목록"]) < max_report: rep["목록"].append({"데이터": ds["name"], "설정": cfg.to_dict(), **d})
+        log(f"  {ds['name']:<34} 봉 {len(ds['base']):>5} · 설정 {configs} · {time.perf_counter() - t0:.1f}s")
+    return report, counts
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.equivalence", description="고속 엔진 경로 vs backtest_fast 매매 로그/지표 비교")
+    ap.add_argument("--datasets", type=int, default=6, help="합성 데이터 개수")
+    ap.add_argument("--configs", type=int, default=300, help="데이터마다 무작위 설정 수")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--real", metavar="CACHE_DIR", help="CLI 디스크 캐시 폴더의 실제 시세도 사용 (예: .quantlab_cache)")
+    ap.add_argument("--real-limit", type=int, default=10)
+    ap.add_argument("--candidates", nargs="+", choices=list(CANDIDATES) + ["horizons"], default=list(CANDIDATES) + ["horizons"])
+    ap.add_argument("--out", help="불일치 목록을 JSON 으로 저장")
+    args = ap.parse_args(argv)
+
+    datasets = synthetic_datasets(args.datasets) + (real_datasets(args.real, args.real_limit) if args.real else [])
+    if not datasets:
+        print("❌ 검사할 데이터가 없습니다."); return 2
+    print(f"▶ 데이터 {len(datasets)}개 x 설정 {args.configs}개, 후보: {', '.join(args.candidates)}")
+    report, counts = run(datasets, args.configs, args.seed, [c for c in args.candidates if c in CANDIDATES])
+    if "horizons" in args.candidates: report["horizons"] = check_horizons(args.configs, args.seed)
+
+    print("검사 범위: " + " · ".join(f"{k} {v:,}" for k, v in sorted(counts.items(), key=lambda kv: -kv[1])))
+    bad = 0
+    for name, rep in report.items():
+        bad += rep["불일치"]
+        print(f"{'✅' if not rep['불일치'] else '❌'} {name:<16} 설정 {rep['설정']:,} · 불일치 {rep['불일치']:,}")
+        for d in rep["목록"][:3]:
+            print(f"    {d['데이터']} · {d['종류']}{' ' + d['항목'] if '항목' in d else ''} · 첫 차이 봉 {d.get('봉')} ({d.get('날짜', '-')})")
+            print(f"      기준 {d['기준']}\n      후보 {d['후보']}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"seed": args.seed, "configs": args.configs, "datasets": [d["name"] for d in datasets], "coverage": counts, "candidates": report},
+                      f, ensure_ascii=False, indent=1, default=lambda o: o.item() if isinstance(o, np.generic) else str(o))
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
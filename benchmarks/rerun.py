@@ -0,0 +1,237 @@
+"""화면 재실행(rerun) 지연 벤치마크 (Streamlit AppTest, 네트워크 없음)
+
+    python -m benchmarks.rerun                                     # 상호작용별 20회 → benchmarks/results/rerun_<시각>.json
+    python -m benchmarks.rerun -k preset --repeat 50
+    python -m benchmarks.rerun --sheet-latency 0.3 --gemini-latency 0.5     # 외부 서비스 지연 흉내
+    python -m benchmarks.suite compare old.json new.json                    # 결과 형식이 suite 와 같아 그대로 비교
+
+main.py 를 AppTest 로 띄우고 상호작용 하나마다 스크립트 전체 재실행 시간을 재서 p50/p95 를 냅니다.
+시세는 benchmarks/synthetic.py, 펀더멘털/구글 시트/Gemini 는 이 파일의 가짜로 바꾸고 저장 전략은 임시 SQLite 를 씁니다.
+재실행 안쪽은 profiler 구간으로 나눠 모듈 수준 작업(상태 초기화, 저장 전략 로드, 사이드바, 설정 패널 등
+탭 밖 전부)과 탭별 렌더링(요청한 계산 포함)을 따로 보여 줍니다.
+탭 전환은 브라우저에서만 일어나고 재실행이 없습니다 — 대신 st.tabs 는 매 재실행마다 모든 탭 본문을 그리므로
+탭별 렌더링 시간이 곧 모든 상호작용이 내는 비용입니다 (rerun / rerun_with_result 의 render.* 항목).
+p50/p95 는 at.run() 벽시계(AppTest 의 메시지 처리 포함), "스크립트" 는 main.py 안 profiler.start_run 부터 측정 패널 직전까지입니다.
+같은 프로세스에서 재므로 첫 로드의 import 비용은 빠져 있습니다 (그건 benchmarks/startup.py).
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from modules import data_loader, llm_advisor, profiler, utils
+from modules.presets import DEFAULT_PRESETS, parse_sheet_records
+from modules.strategy_store import StrategyStore, SheetReplica
+from .suite import RESULTS_DIR, ROOT, _meta, _load, compare, _print_compare
+from .synthetic import use_synthetic_data
+
+APP = os.path.join(ROOT, "main.py")
+TAB_STAGES = ["render.company", "render.signal", "render.presets", "render.backtest", "render.lab", "render.stoploss", "render.fundamentals"]
+APP_STAGES = ["app.init_state", "app.saved_strategies", "app.sidebar", "app.gemini_models", "app.params"]
+SAVED_STRATEGIES = 30   # 가짜 시트에 미리 넣어 둘 저장 전략 수
+
+# --- 가짜 외부 서비스 ---
+class FakeSheet:
+    """gspread 워크시트에서 SheetReplica/parse_sheet_records 가 쓰는 메서드만 (호출마다 latency 초 대기)"""
+    def __init__(self, rows, latency=0.0):
+        self.values, self.latency = [["Name", "Params"]] + [list(r) for r in rows], latency
+
+    def _wait(self):
+        if self.latency: time.sleep(self.latency)
+
+    def get_all_records(self):
+        self._wait()
+        return [dict(zip(self.values[0], r)) for r in self.values[1:]]
+
+    def get_all_values(self):
+        self._wait()
+        return [list(r) for r in self.values]
+
+    def append_row(self, row): self._wait(); self.values.append(list(row))
+    def append_rows(self, rows): self._wait(); self.values.extend(list(r) for r in rows)
+    def delete_rows(self, i): self._wait(); del self.values[i - 1]
+
+    def batch_update(self, updates):
+        self._wait()
+        for u in updates: self.values[int(u["range"][1:]) - 1][1] = u["values"][0][0]
+
+def fake_genai(latency=0.0):
+    """google.generativeai 대신 (모델 목록/답변 모두 고정 문자열)"""
+    def wait(): latency and time.sleep(latency)
+    def list_models():
+        wait()
+        return [SimpleNamespace(name=f"models/gemini-stub-{k}", supported_generation_methods=["generateContent"]) for k in range(3)]
+    class GenerativeModel:
+        def __init__(self, name): self.name = name
+        def generate_content(self, prompt): wait(); return SimpleNamespace(text=f"(stub {self.name}) {len(prompt)}자 프롬프트")
+    return SimpleNamespace(configure=lambda api_key=None: None, list_models=list_models, GenerativeModel=GenerativeModel)
+
+def fake_fundamental_info(ticker):
+    return {"Name": ticker, "Symbol": ticker, "Sector": "Synthetic", "MarketCap": 10 ** 10, "Beta": 1.5, "PER": 20.0, "PBR": 3.0,
+            "ROE": 0.15, "NetIncome": 10 ** 9, "Description": "benchmarks.rerun 가짜 펀더멘털"}
+
+def install_stubs(db_path, sheet_latency=0.0, gemini_latency=0.0):
+    """앱이 쓰는 외부 의존을 가짜로 교체 (저장 전략: 임시 SQLite + 가짜 시트, 기존 목록 캐시는 비움)"""
+    names = list(DEFAULT_PRESETS)
+    rows = [(f"저장전략{k:02d}", json.dumps(DEFAULT_PRESETS[names[k % len(names)]], ensure_ascii=False)) for k in range(SAVED_STRATEGIES)]
+    sheet = FakeSheet(rows, sheet_latency)
+    utils._store = StrategyStore(db_path)
+    utils._replica = SheetReplica(utils._store, lambda: sheet, parse_sheet_records)
+    utils._saved_strategies.invalidate()
+    data_loader.get_fundamental_info = fake_fundamental_info
+    genai = fake_genai(gemini_latency)
+    llm_advisor._genai = lambda api_key: genai
+
+# --- 재실행 측정 ---
+def _collect_runs():
+    # main.py 는 재실행마다 profiler.start_run 으로 새 집계를 스크립트 스레드에 걸므로 그 객체를 받아 둠.
+    # 다음 실행이 시작될 때 앞 실행을 보고서로 닫음 (st.rerun 으로 두 번 돈 경우도 합산)
+    runs, current, orig = [], [None], profiler.start_run
+    def start_run(label=None, on=True):
+        if current[0] is not None:
+            rep = profiler.report(current[0])
+            if rep["구간"]: runs.append(rep)
+        current[0] = orig(label, on)
+        return current[0]
+    def finish():
+        reps = runs + ([profiler.report(current[0])] if current[0] is not None else [])
+        runs.clear(); current[0] = None
+        return reps
+    profiler.start_run = start_run
+    return finish, orig
+
+def _stage_ms(reports):
+    out = {}
+    for rep in reports:
+        for s in rep["구간"]: out[s["구간"]] = out.get(s["구간"], 0.0) + s["합계(ms)"]
+    return out
+
+def _new_app(timeout):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.session_state["profiling_on"] = True
+    return at
+
+def _button(at, label):
+    return next(b for b in at.button if b.label.startswith(label))
+
+def _preset_cycle(at):
+    options = [o for o in at.sidebar.selectbox(key="preset_name_selector").options if o != "직접 설정"][:4]
+    k = 0
+    def step():
+        nonlocal k
+        at.sidebar.selectbox(key="preset_name_selector").set_value(options[k % len(options)]); k += 1
+    return step
+
+# 상호작용 이름 → (준비(at), 매번 할 동작을 돌려주는 함수(at)) — 동작 뒤 at.run() 한 번이 측정 대상
+def _prepare_result(at):
+    _button(at, "✅ 백테스트").click(); at.run()
+
+INTERACTIONS = {
+    "rerun": (None, lambda at: (lambda: None)),                                   # 아무것도 안 바꾼 재실행 (위젯 포커스 이동 등)
+    "preset_change": (None, _preset_cycle),                                        # 사이드바 프리셋 선택 → 설정값 교체
+    "backtest": (None, lambda at: (lambda: _button(at, "✅ 백테스트").click())),   # 백테스트 버튼 (계산 + st.rerun 한 번 더)
+    "signal": (None, lambda at: (lambda: _button(at, "📌 오늘의 매매 시그널").click())),
+    "rerun_with_result": (_prepare_result, lambda at: (lambda: None)),             # 백테스트 결과·차트가 있는 상태의 재실행
+}
+
+def _percentile(xs, q):
+    return float(np.percentile(xs, q)) if xs else 0.0
+
+def measure_interaction(name, repeat, timeout=120, gemini=False):
+    """새 AppTest 로 첫 실행 후 동작+재실행을 repeat 번. 재실행 벽시계/스크립트 안 시간과 구간별 시간 목록 반환"""
+    prepare, make_step = INTERACTIONS[name]
+    at = _new_app(timeout)
+    if gemini: at.session_state["gemini_key_input"] = "stub-key"
+    finish, orig_start_run = _collect_runs()
+    try:
+        t0 = time.perf_counter(); at.run(); first = (time.perf_counter() - t0) * 1000
+        if at.exception: raise RuntimeError(f"{name}: 첫 실행 예외 {at.exception[0].value}")
+        if prepare: prepare(at)
+        step = make_step(at)
+        wall, script, stages = [], [], []
+        for _ in range(repeat):
+            step()
+            finish()
+            t0 = time.perf_counter(); at.run(); wall.append((time.perf_counter() - t0) * 1000)
+            if at.exception: raise RuntimeError(f"{name}: 예외 {at.exception[0].value}")
+            reps = finish()
+            script.append(sum(r["경과(ms)"] for r in reps))
+            stages.append(_stage_ms(reps))
+    finally:
+        profiler.start_run = orig_start_run
+    return {"first_ms": first, "wall": wall, "script": script, "stages": stages, "script_runs": len(reps)}
+
+def _summary(m):
+    wall, script = m["wall"], m["script"]
+    tabs = [sum(s.get(k, 0.0) for k in TAB_STAGES) for s in m["stages"]]
+    module = [sc - t for sc, t in zip(script, tabs)]
+    stage_p50 = {k: round(statistics.median([s.get(k, 0.0) for s in m["stages"]]), 2)
+                 for k in APP_STAGES + TAB_STAGES if any(k in s for s in m["stages"])}
+    return {"median_ms": round(statistics.median(wall), 3), "p95_ms": round(_percentile(wall, 95), 3),
+            "min_ms": round(min(wall), 3), "max_ms": round(max(wall), 3), "runs": len(wall), "first_ms": round(m["first_ms"], 1),
+            "script_runs": m["script_runs"], "script_p50_ms": round(statistics.median(script), 2),
+            "module_p50_ms": round(statistics.median(module), 2), "module_p95_ms": round(_percentile(module, 95), 2),
+            "tabs_p50_ms": round(statistics.median(tabs), 2), "stages_p50_ms": stage_p50}
+
+def run_bench(pattern=None, repeat=20, sheet_latency=0.0, gemini_latency=0.0, gemini=False, log=print):
+    """INTERACTIONS 중 이름에 pattern 이 들어간 것을 재서 suite 와 같은 {"meta", "cases"} 형식으로 반환"""
+    cases = {}
+    with tempfile.TemporaryDirectory() as tmp, use_synthetic_data():
+        install_stubs(os.path.join(tmp, "strategies.db"), sheet_latency, gemini_latency)
+        for name in INTERACTIONS:
+            if pattern and pattern not in name: continue
+            cases[f"rerun.{name}"] = res = _summary(measure_interaction(name, repeat, gemini=gemini))
+            log(f"{name:<18} p50 {res['median_ms']:>8.1f} ms · p95 {res['p95_ms']:>8.1f} ms · 첫 실행 {res['first_ms']:>7.0f} ms"
+                f" | 스크립트 {res['script_p50_ms']:>7.1f} = 모듈 수준 {res['module_p50_ms']:>6.1f} + 탭 {res['tabs_p50_ms']:>7.1f}"
+                + (f" ({res['script_runs']}회 실행)" if res["script_runs"] > 1 else ""))
+    meta = {**_meta(), "repeat": repeat, "sheet_latency": sheet_latency, "gemini_latency": gemini_latency, "gemini": gemini}
+    return {"meta": meta, "cases": cases}
+
+def _print_stages(cases):
+    # 구간별 p50 (ms): 행 = 구간, 열 = 상호작용
+    names = list(cases)
+    keys = [k for k in APP_STAGES + TAB_STAGES if any(k in c["stages_p50_ms"] for c in cases.values())]
+    print(f"{'구간 p50 (ms)':<22}" + "".join(f"{n[6:]:>19}" for n in names))
+    for k in keys:
+        print(f"{k:<22}" + "".join(f"{cases[n]['stages_p50_ms'].get(k, 0.0):>19.1f}" for n in names))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.rerun", description="main.py 재실행 지연 (AppTest, 가짜 데이터/시트/Gemini)")
+    ap.add_argument("-k", dest="pattern", help=f"이름에 이 문자열이 들어간 상호작용만 ({', '.join(INTERACTIONS)})")
+    ap.add_argument("--repeat", type=int, default=20, help="상호작용별 측정 횟수")
+    ap.add_argument("--sheet-latency", type=float, default=0.0, help="가짜 시트 호출당 지연(초)")
+    ap.add_argument("--gemini-latency", type=float, default=0.0, help="가짜 Gemini 호출당 지연(초)")
+    ap.add_argument("--gemini", action="store_true", help="API 키를 넣은 상태로 (사이드바가 재실행마다 모델 목록을 부름)")
+    ap.add_argument("--out", help="결과 JSON 경로 (기본: benchmarks/results/rerun_<시각>.json)")
+    ap.add_argument("--baseline", help="저장 후 이 기준 JSON 과 비교 (suite compare 와 같은 판정)")
+    ap.add_argument("--threshold", type=float, default=0.2)
+    ap.add_argument("--min-ms", type=float, default=5.0)
+    args = ap.parse_args(argv)
+
+    from streamlit import config, logger
+    config.set_option("logger.level", "error"); logger.set_log_level("error")   # use_container_width 경고 등이 재실행마다 찍히지 않도록
+    new = run_bench(args.pattern, args.repeat, args.sheet_latency, args.gemini_latency, args.gemini)
+    if not new["cases"]:
+        print("❌ 해당하는 상호작용이 없습니다."); return 2
+    _print_stages(new["cases"])
+    out = args.out or os.path.join(RESULTS_DIR, f"rerun_{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f: json.dump(new, f, ensure_ascii=False, indent=1)
+    print(f"저장: {out}")
+    if not args.baseline: return 0
+    base = _load(args.baseline)
+    rows, regressions = compare(base, new, args.threshold, args.min_ms)
+    _print_compare(rows, base.get("meta", {}))
+    if regressions: print(f"⚠️ 느려진 상호작용 {regressions}개 (기준 대비 +{args.threshold:.0%} 초과)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""시작 시간(import 비용) 벤치마크
+
+    python -m benchmarks.startup                         # 시나리오별 중앙값 + 불러온 무거운 모듈
+    python -m benchmarks.startup --repeat 5 --top 8      # -X importtime 상위 패키지까지
+    python -m benchmarks.startup --save startup.json     # 기준값 저장
+    python -m benchmarks.startup --baseline startup.json # 기준 대비 느려지면 종료 코드 1
+
+시나리오마다 새 파이썬 프로세스를 띄워 측정합니다 (이미 import 된 모듈 캐시 영향 없음).
+  app_first_load : AppTest 로 main.py 첫 실행 (첫 화면 로딩, 위젯 렌더링까지)
+  app_imports    : main.py 상단 import 만
+  worker         : 엔진/전략 코어만 (병렬 워커, 배치가 평가에 쓰는 모듈)
+  cli            : python -m modules.cli 의 import
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 첫 화면에 필요 없으면 불러오지 않아야 하는 모듈 (지연 import 대상)
+HEAVY_MODULES = ["streamlit", "plotly", "google.generativeai", "yfinance", "FinanceDataReader",
+                 "gspread", "oauth2client", "matplotlib"]
+
+SCENARIOS = {
+    "app_first_load": ("from streamlit.testing.v1 import AppTest\n"
+                       "AppTest.from_file('main.py', default_timeout=120).run()"),
+    "app_imports": ("import streamlit, modules.utils, modules.data_loader, modules.strategy, modules.st_adapter, "
+                    "modules.llm_advisor, modules.engine, modules.config, modules.preset_store, modules.presets, "
+                    "modules.lazy, modules.validation"),
+    "worker": "import modules.engine, modules.strategy, modules.validation",
+    "cli": "import modules.cli",
+}
+
+_CHILD = """import json, sys, time
+t0 = time.perf_counter()
+{body}
+print("@@" + json.dumps({{"seconds": time.perf_counter() - t0, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def _importtime_top(stderr, top):
+    # -X importtime 출력: "import time: self [us] | cumulative | imported package" → 최상위 패키지별 누적
+    per_pkg = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        try:
+            _, cum, name = line.split(":", 1)[1].split("|")
+            cum_us = int(cum)
+        except ValueError: continue
+        if name.startswith(" ") and not name.startswith("  "):   # 들여쓰기 1칸 = 최상위 import
+            pkg = name.strip().split(".")[0]
+            per_pkg[pkg] = per_pkg.get(pkg, 0) + cum_us
+    return [(k, round(v / 1e6, 3)) for k, v in sorted(per_pkg.items(), key=lambda kv: -kv[1])[:top]]
+
+def run_scenario(name, repeat=3, top=0):
+    """새 프로세스에서 repeat 번 실행해 {초(중앙값), 프로세스 포함(중앙값), 무거운 모듈, 상위 import} 반환"""
+    code = _CHILD.format(body=SCENARIOS[name], heavy=HEAVY_MODULES)
+    cmd = [sys.executable] + (["-X", "importtime"] if top else []) + ["-c", code]
+    secs, totals, loaded, tops = [], [], [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        r = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+        totals.append(time.perf_counter() - t0)
+        out = [l for l in r.stdout.splitlines() if l.startswith("@@")]
+        if r.returncode != 0 or not out:
+            raise RuntimeError(f"{name} 실패 (code {r.returncode}): {r.stderr.strip().splitlines()[-1:]}")
+        res = json.loads(out[-1][2:])
+        secs.append(res["seconds"]); loaded = res["loaded"]
+        if top: tops = _importtime_top(r.stderr, top)
+    return {"초": round(statistics.median(secs), 3), "프로세스 포함 초": round(statistics.median(totals), 3),
+            "무거운 모듈": loaded, "상위 import": tops}
+
+def compare(results, baseline, tolerance=0.25, min_delta=0.05):
+    """기준보다 tolerance 비율 이상 (그리고 min_delta 초 이상) 느려졌거나 새로 불러온 무거운 모듈이 있으면 목록으로"""
+    problems = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base: continue
+        if res["초"] > base["초"] * (1 + tolerance) and res["초"] - base["초"] > min_delta:
+            problems.append(f"{name}: {base['초']:.3f}s → {res['초']:.3f}s")
+        new = sorted(set(res["무거운 모듈"]) - set(base.get("무거운 모듈", [])))
+        if new: problems.append(f"{name}: 새로 불러온 모듈 {', '.join(new)}")
+    return problems
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.startup", description="앱/워커/CLI 시작 import 비용 측정")
+    ap.add_argument("scenarios", nargs="*", help=f"{', '.join(SCENARIOS)} 중 선택 (기본: 전부)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--top", type=int, default=0, help="-X importtime 으로 누적 시간 상위 N개 패키지 표시")
+    ap.add_argument("--save", metavar="FILE", help="결과를 JSON 으로 저장 (다음 --baseline 용)")
+    ap.add_argument("--baseline", metavar="FILE", help="기준 JSON 과 비교해 느려지면 종료 코드 1")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="허용 비율 (기본 25%%)")
+    args = ap.parse_args(argv)
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown: ap.error(f"알 수 없는 시나리오: {', '.join(unknown)}")
+
+    results = {}
+    for name in args.scenarios or list(SCENARIOS):
+        res = results[name] = run_scenario(name, args.repeat, args.top)
+        print(f"{name:<15} {res['초']:>7.3f}s  (프로세스 포함 {res['프로세스 포함 초']:.3f}s)  "
+              f"무거운 모듈: {', '.join(res['무거운 모듈']) or '-'}")
+        for pkg, s in res["상위 import"]: print(f"{'':<17}{pkg:<28}{s:>7.3f}s")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f: json.dump(results, f, ensure_ascii=False, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f: problems = compare(results, json.load(f), args.tolerance)
+        for p in problems: print(f"⚠️ {p}")
+        return 1 if problems else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""엔진 벤치마크 (합성 시세, 네트워크 없음)
+
+    python -m benchmarks.suite run                                  # 전체 → benchmarks/results/bench_<시각>.json
+    python -m benchmarks.suite run -k backtest --repeat 10          # 이름에 backtest 가 들어간 항목만
+    python -m benchmarks.suite run --out benchmarks/baseline.json   # 기준값 저장
+    python -m benchmarks.suite run --baseline benchmarks/baseline.json
+    python -m benchmarks.suite compare old.json new.json --threshold 0.2
+
+compare / run --baseline 은 중앙값이 threshold 비율 이상 (그리고 --min-ms 이상) 느려진 항목이 있으면 종료 코드 1.
+데이터는 benchmarks/synthetic.py (티커별 고정 시드), 무작위 탐색은 random.seed(0) 으로 매번 같은 시도를 합니다.
+"""
+import argparse
+import datetime
+import inspect
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.config import PARAM_DEFAULTS, StrategyConfig
+from modules.engine import _fast_ma, calculate_atr, calculate_bollinger_bands, calculate_indicators, market_arrays
+from modules.presets import DEFAULT_PRESETS
+from modules.strategy import prepare_base, backtest_fast, summarize_signal_today, auto_search_train_test
+from modules.validation import stress_paths
+from .synthetic import use_synthetic_data, synthetic_get_data, years_ago
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+TICKERS = ("TQQQ", "TQQQ", "SPY")
+MA_POOL = [1, 5, 10, 20, 50, 60, 120, 200]
+BACKTEST_YEARS = (1, 5, 20, 40)
+SEARCH_TRIALS = (100, 1000)
+STRESS_PATHS = 500
+# 실험실 탭 기본 후보와 같은 탐색 공간
+SEARCH_CHOICES = {
+    "ma_buy": [1, 5, 10, 20, 50, 60, 120], "offset_ma_buy": [1, 5, 10, 20, 50], "offset_cl_buy": [1, 5, 10, 20, 50], "buy_operator": [">", "<"],
+    "ma_sell": [1, 5, 10, 20, 50, 60, 120], "offset_ma_sell": [1, 5, 10, 20, 50], "offset_cl_sell": [1, 5, 10, 20, 50], "sell_operator": ["<", ">", "OFF"],
+    "use_trend_in_buy": [False, True], "use_trend_in_sell": [True],
+    "ma_compare_short": [1, 5, 10, 20, 50, 60, 120], "ma_compare_long": [1, 5, 10, 20, 50, 60, 120],
+    "offset_compare_short": [1, 5, 10, 20, 50], "offset_compare_long": [1, 5, 10, 20, 50],
+    "stop_loss_pct": [0.0, 15.0, 25.0, 35.0], "take_profit_pct": [0.0, 15.0, 25.0, 35.0],
+    "use_atr_stop": [False, True], "atr_multiplier": [2.0, 3.0, 4.0],
+}
+
+_raw_prepare_base = inspect.unwrap(prepare_base)   # 캐시/계측 없이 정렬·병합만 재기
+
+def _params():
+    return StrategyConfig.from_dict({**PARAM_DEFAULTS, **DEFAULT_PRESETS["TQQQ"], "use_atr_stop": True})
+
+def _base(years, market=True):
+    start, end = years_ago(years)
+    return _raw_prepare_base(TICKERS[0], TICKERS[1], TICKERS[2] if market else "", start, end, MA_POOL)
+
+def _backtest_fast_call(base, x_sig, x_trd, ma_dict, q, x_mkt=None, ma_mkt_arr=None):
+    # 화면/예전 호출부와 같은 위치 인자 방식으로 backtest_fast 를 부름
+    p = q.to_dict()
+    return backtest_fast(base, x_sig, x_trd, ma_dict, p["ma_buy"], p["offset_ma_buy"], p["ma_sell"], p["offset_ma_sell"], p["offset_cl_buy"], p["offset_cl_sell"],
+                         p["ma_compare_short"], p["ma_compare_long"], p["offset_compare_short"], p["offset_compare_long"], 5000000,
+                         p["stop_loss_pct"], p["take_profit_pct"], p["strategy_behavior"], p["min_hold_days"], p["fee_bps"], p["slip_bps"],
+                         p["use_trend_in_buy"], p["use_trend_in_sell"], p["buy_operator"], p["sell_operator"],
+                         use_rsi_filter=p["use_rsi_filter"], rsi_period=p["rsi_period"], rsi_max=p["rsi_max"],
+                         use_market_filter=p["use_market_filter"], x_mkt=x_mkt, ma_mkt_arr=ma_mkt_arr,
+                         use_bollinger=p["use_bollinger"], bb_period=p["bb_period"], bb_std=p["bb_std"],
+                         bb_entry_type=p["bb_entry_type"], bb_exit_type=p["bb_exit_type"],
+                         use_atr_stop=p["use_atr_stop"], atr_multiplier=p["atr_multiplier"])
+
+# --- 측정 항목: (이름, 준비 함수 → 잴 함수, 기본 반복 수) ---
+def _case_prepare_base():
+    start, end = years_ago(20)
+    return lambda: _raw_prepare_base(*TICKERS, start, end, MA_POOL)
+
+def _case_indicator(kind):
+    df = synthetic_get_data(TICKERS[1], *years_ago(20))
+    x = df["Close"].to_numpy(dtype=float)
+    return {"ma": lambda: [_fast_ma(x, w) for w in MA_POOL],
+            "atr": lambda: calculate_atr(df, period=14),
+            "bollinger": lambda: calculate_bollinger_bands(x, 20, 2.0),
+            "rsi": lambda: calculate_indicators(x, 14)}[kind]
+
+def _case_backtest(years):
+    base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = _base(years)
+    q = _params()
+    return lambda: _backtest_fast_call(base, x_sig, x_trd, ma_dict, q, x_mkt, ma_mkt_arr)
+
+def _case_signal_summary():
+    base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = _base(20)
+    arrs, p = market_arrays(base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr), _params()
+    return lambda: summarize_signal_today(base, p, arrs)
+
+def _case_auto_search(trials):
+    start, end = years_ago(10)
+    def run():
+        random.seed(0)
+        return auto_search_train_test(TICKERS[0], TICKERS[1], start, end, 0.5, SEARCH_CHOICES, n_trials=trials)
+    return run
+
+def _case_stress_paths():
+    base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = _base(20)
+    arrs, q = market_arrays(base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr), _params()
+    return lambda: stress_paths(arrs, q, STRESS_PATHS, 20, seed=0)   # 경로별 simulate 루프 (화면 기본 300 경로)
+
+CASES = ([("prepare_base.align[20y]", _case_prepare_base, 10)]
+         + [(f"indicator.{k}[20y]", (lambda k=k: _case_indicator(k)), 20) for k in ("ma", "atr", "bollinger", "rsi")]
+         + [(f"backtest_fast[{y}y]", (lambda y=y: _case_backtest(y)), 5) for y in BACKTEST_YEARS]
+         + [("summarize_signal_today[20y]", _case_signal_summary, 20)]
+         + [(f"auto_search_train_test[{n}]", (lambda n=n: _case_auto_search(n)), 3 if n < 1000 else 1) for n in SEARCH_TRIALS]
+         + [(f"stress_paths[20y,{STRESS_PATHS}]", _case_stress_paths, 3)])
+
+def measure(fn, repeat, warmup=1):
+    for _ in range(warmup): fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); times.append((time.perf_counter() - t0) * 1000)
+    return {"median_ms": round(statistics.median(times), 3), "min_ms": round(min(times), 3), "max_ms": round(max(times), 3), "runs": repeat}
+
+def _meta():
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError: commit = None
+    return {"created": datetime.datetime.now().isoformat(timespec="seconds"), "commit": commit, "python": platform.python_version(),
+            "numpy": np.__version__, "pandas": pd.__version__, "platform": platform.platform(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+def run_suite(pattern=None, repeat=None, log=print):
+    """CASES 중 이름에 pattern 이 들어간 항목을 재서 {"meta", "cases": {이름: {median_ms, min_ms, max_ms, runs}}} 반환"""
+    cases = {}
+    with use_synthetic_data():
+        for name, setup, default_repeat in CASES:
+            if pattern and pattern not in name: continue
+            cases[name] = res = measure(setup(), repeat or default_repeat)
+            log(f"{name:<30} {res['median_ms']:>10.2f} ms  (min {res['min_ms']:.2f}, {res['runs']}회)")
+    return {"meta": _meta(), "cases": cases}
+
+def compare(base, new, threshold=0.2, min_ms=0.5):
+    """항목별 [이름, 기준 ms, 현재 ms, 비율, 판정] 과 느려진 항목 수. 판정: 느려짐/빨라짐/"" (차이가 min_ms 미만이면 무시)"""
+    rows, regressions = [], 0
+    for name, cur in new["cases"].items():
+        old = base.get("cases", {}).get(name)
+        if old is None:
+            rows.append([name, None, cur["median_ms"], None, "새 항목"]); continue
+        b, c = old["median_ms"], cur["median_ms"]
+        ratio = c / b if b > 0 else float("inf")
+        verdict = ""
+        if abs(c - b) >= min_ms:
+            if ratio > 1 + threshold: verdict = "느려짐"; regressions += 1
+            elif ratio < 1 / (1 + threshold): verdict = "빨라짐"
+        rows.append([name, b, c, round(ratio, 3), verdict])
+    return rows, regressions
+
+def _print_compare(rows, base_meta):
+    print(f"기준: {base_meta.get('created')} (commit {base_meta.get('commit')}, {base_meta.get('machine')}, python {base_meta.get('python')})")
+    for name, b, c, ratio, verdict in rows:
+        mark = {"느려짐": "🔺", "빨라짐": "🔻", "새 항목": "＋"}.get(verdict, "  ")
+        print(f"{mark} {name:<30} {'-' if b is None else f'{b:.2f}':>10} → {c:>10.2f} ms  {'' if ratio is None else f'x{ratio:.2f}'} {verdict}")
+
+def _load(path):
+    with open(path, encoding="utf-8") as f: return json.load(f)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="합성 시세 엔진 벤치마크 / 기준값 비교")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="측정해서 JSON 저장")
+    r.add_argument("-k", dest="pattern", help="이름에 이 문자열이 들어간 항목만")
+    r.add_argument("--repeat", type=int, help="항목별 반복 수 (기본은 항목마다 다름)")
+    r.add_argument("--out", help="결과 JSON 경로 (기본: benchmarks/results/bench_<시각>.json)")
+    r.add_argument("--baseline", help="저장 후 이 기준 JSON 과 비교")
+    c = sub.add_parser("compare", help="두 결과 JSON 비교")
+    c.add_argument("base"); c.add_argument("new")
+    for p in (r, c):
+        p.add_argument("--threshold", type=float, default=0.2, help="느려짐 판정 비율 (기본 0.2 = 20%%)")
+        p.add_argument("--min-ms", type=float, default=0.5, help="이보다 작은 차이는 무시 (ms)")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "compare":
+        base, new = _load(args.base), _load(args.new)
+    else:
+        new = run_suite(args.pattern, args.repeat)
+        out = args.out or os.path.join(RESULTS_DIR, f"bench_{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f: json.dump(new, f, ensure_ascii=False, indent=1)
+        print(f"저장: {out}")
+        if not args.baseline: return 0
+        base = _load(args.baseline)
+    rows, regressions = compare(base, new, args.threshold, args.min_ms)
+    _print_compare(rows, base.get("meta", {}))
+    if regressions: print(f"⚠️ 느려진 항목 {regressions}개 (기준 대비 +{args.threshold:.0%} 초과)")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
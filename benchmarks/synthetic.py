@@ -0,0 +1,85 @@
+"""네트워크 없이 쓰는 결정적 합성 시세 (벤치마크/동등성 검사용)
+
+    df = synthetic_ohlcv(years=20, seed=1, leverage=3)        # 레버리지 ETF 같은 변동성
+    with use_synthetic_data():                                # get_data 를 합성 데이터로 교체
+        base, *_ = prepare_base("SOXL", "SOXL", "SPY", start, end, [5, 20])
+
+같은 인자면 항상 같은 데이터입니다 (numpy default_rng + 티커 이름 crc32 시드).
+"""
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+CALENDAR_START = "1980-01-02"
+CALENDAR_END = "2030-12-31"
+MARKET_TICKERS = {"SPY", "QQQ", "^GSPC", "^IXIC", "^KS11", "KS11", "069500"}   # 레버리지 없는 시장 지수로 생성
+
+def synthetic_ohlcv(years=20, seed=0, start="2000-01-03", annual_drift=0.08, annual_vol=0.22, leverage=1.0,
+                    gap_prob=0.03, gap_vol=0.03, intraday_vol=0.012, missing_prob=0.002, base_price=100.0, bars=None):
+    """기하 브라운 운동 종가 + 갭 시가 + 장중 고저가 OHLCV (Date/Open/High/Low/Close/Volume)
+    leverage: 기초 일간 수익률에 곱하는 배수 (3 이면 3배 ETF 처럼 변동성·경로 의존 손실이 커짐)
+    gap_prob/gap_vol: 전일 종가 대비 시가가 크게 튀는 날의 비율과 크기 (손절/익절의 시가 체결 경로)
+    missing_prob: 거래일을 빼는 비율 (종목 간 휴장일 차이 → prepare_base 의 날짜 맞추기)"""
+    n = int(bars) if bars is not None else int(round(years * TRADING_DAYS))
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / TRADING_DAYS
+    r = (annual_drift - 0.5 * annual_vol ** 2) * dt + annual_vol * np.sqrt(dt) * rng.standard_normal(n)
+    r = np.log1p(np.clip(leverage * np.expm1(r), -0.95, None))         # 일간 단순수익률에 배수 (일일 리밸런싱)
+    gap = np.where(rng.random(n) < gap_prob, rng.normal(0.0, gap_vol * max(leverage, 1.0), n), 0.0)
+    close = base_price * np.exp(np.cumsum(r))
+    prev = np.concatenate([[base_price], close[:-1]])
+    # 시가 = 전일 종가 x (평소 작은 움직임 + 가끔 갭), 종가는 그날 수익률이 그대로 나오도록 유지
+    open_ = prev * np.exp(gap + rng.normal(0.0, intraday_vol * 0.3, n))
+    wig = intraday_vol * max(leverage, 1.0)
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0.0, wig, n)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0.0, wig, n)))
+    volume = rng.lognormal(15.0, 0.5, n).round()
+    dates = pd.bdate_range(start, periods=n)
+    df = pd.DataFrame({"Date": dates, "Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume})
+    if missing_prob > 0:
+        keep = rng.random(n) >= missing_prob
+        keep[0] = keep[-1] = True
+        df = df[keep].reset_index(drop=True)
+    return df
+
+def ticker_seed(ticker):
+    return zlib.crc32(str(ticker).strip().upper().encode("utf-8"))
+
+@lru_cache(maxsize=64)
+def _ticker_history(ticker):
+    # 티커마다 1980~2030 전 구간을 한 번 만들고 요청 구간만 잘라 씀 (기간이 달라도 같은 날은 같은 값)
+    ticker = ticker.strip().upper()
+    bars = len(pd.bdate_range(CALENDAR_START, CALENDAR_END))
+    if ticker in MARKET_TICKERS:
+        return synthetic_ohlcv(seed=ticker_seed(ticker), start=CALENDAR_START, bars=bars, annual_vol=0.18, gap_prob=0.01)
+    return synthetic_ohlcv(seed=ticker_seed(ticker), start=CALENDAR_START, bars=bars, leverage=3.0, annual_drift=0.10)
+
+def synthetic_get_data(ticker, start_date, end_date):
+    """data_loader.get_data 와 같은 모양의 합성 데이터 (빈 티커는 빈 DF)"""
+    if not ticker: return pd.DataFrame(columns=["Date", "Open", "High", "Low", "Close", "Volume"])
+    df = _ticker_history(ticker)
+    lo, hi = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    return df[(df["Date"] >= lo) & (df["Date"] <= hi)].reset_index(drop=True)
+
+def years_ago(years, end=None):
+    end = pd.Timestamp(end or "2024-12-31")
+    return (end - pd.DateOffset(days=int(round(years * 365.25)))).date(), end.date()
+
+@contextmanager
+def use_data(get_data):
+    """블록 안에서 코어의 get_data 를 get_data(ticker, start, end) 로 바꾸고 prepare_base 캐시를 비웁니다 (나갈 때 원래대로)"""
+    from modules import data_loader, strategy
+    saved = (data_loader.get_data, strategy.get_data)
+    data_loader.get_data = strategy.get_data = get_data
+    strategy.prepare_base.clear()
+    try: yield get_data
+    finally:
+        data_loader.get_data, strategy.get_data = saved
+        strategy.prepare_base.clear()
+
+def use_synthetic_data():
+    return use_data(synthetic_get_data)
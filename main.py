@@ -1,18 +1,34 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import datetime
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import random
-import google.generativeai as genai
+import time
 
 # 모듈 불러오기
-from modules.utils import load_saved_strategies, save_strategy_to_file, delete_strategy_from_file, parse_choices
+from modules.utils import load_saved_strategies, save_strategy_to_file, delete_strategy_from_file, strategy_sync_status, parse_choices
 from modules.data_loader import get_data, get_fundamental_info
-from modules.strategy import prepare_base, check_signal_today, backtest_fast, summarize_signal_today, auto_search_train_test, apply_opt_params
-from modules.llm_advisor import ask_gemini_analysis, ask_gemini_chat, ask_gemini_comprehensive_analysis
+from modules.strategy import prepare_base, prepare_signal_base, run_backtest, summarize_signal_today, auto_search_train_test, evaluate_presets, evaluate_preset_horizons, preset_tickers
+from modules.st_adapter import use_streamlit_cache, check_signal_today, apply_opt_params
+from modules.llm_advisor import list_gemini_models, ask_gemini_analysis, ask_gemini_chat, ask_gemini_comprehensive_analysis
+from modules.engine import market_arrays
+from modules.config import StrategyConfig
+from modules.preset_store import PresetStateStore
+from modules.presets import DEFAULT_PRESETS as BUILTIN_PRESETS
+from modules.lazy import lazy_module, lazy_attr
+from modules.cache import cache_stats
+from modules import profiler
+from modules.validation import purged_cv, trade_returns, bootstrap_trades, stress_paths, sensitivity_grid, SENSITIVITY_PARAMS, cost_sweep, breakeven_cost, month_start_bars, start_date_curve
+
+# 차트는 결과가 생긴 뒤에만 그리므로 plotly 는 처음 그릴 때 불러옵니다 (첫 화면 로딩 단축)
+go = lazy_module("plotly.graph_objects")
+make_subplots = lazy_attr("plotly.subplots", "make_subplots")
 
 st.set_page_config(page_title="QuantLab: Modular Ver.", page_icon="⚡", layout="wide")
+use_streamlit_cache()   # 코어의 데이터 캐시를 st.cache_data 로 (세션 간 공유)
+
+# 구간별 시간 측정 (사이드바에서 켜면 이번 재실행 전체를 모아 맨 아래 패널에 표시, 집계는 이 세션의 이번 실행에만)
+profiler.start_run("app rerun", st.session_state.get("profiling_on", False))
 
 # --- [함수 정의] 전략을 한글 문장으로 변환 ---
 def translate_strategy_condition(ticker, ma_period, offset_ma, offset_cl, operator):
@@ -66,20 +82,14 @@ def _init_default_state():
     for k, v in defaults.items():
         if k not in st.session_state: st.session_state[k] = v
 
-_init_default_state()
+with profiler.timer("app.init_state"): _init_default_state()
 
-# ---------------------------------------------------------
-# [복구 완료] 사용자님의 원본 프리셋 데이터 전체
-# ---------------------------------------------------------
-DEFAULT_PRESETS = {
-    "GGLL": {"signal_ticker": "GGLL", "trade_ticker": "GGLL", "offset_cl_buy": 10, "buy_operator": ">", "offset_ma_buy": 50, "ma_buy": 5, "offset_cl_sell": 10, "sell_operator": "<", "offset_ma_sell": 20, "ma_sell": 20, "use_trend_in_buy": True, "use_trend_in_sell": True, "offset_compare_short": 10, "ma_compare_short": 20, "offset_compare_long": 50, "ma_compare_long": 10, "stop_loss_pct": 20.0, "take_profit_pct": 20.0},
-    "TQQQ": {"signal_ticker": "TQQQ", "trade_ticker": "TQQQ", "offset_cl_buy": 50, "buy_operator": ">", "offset_ma_buy": 10, "ma_buy": 1, "offset_cl_sell": 50, "sell_operator": ">", "offset_ma_sell": 1, "ma_sell": 1, "use_trend_in_buy": True, "use_trend_in_sell": True, "offset_compare_short": 1, "ma_compare_short": 50, "offset_compare_long": 10, "ma_compare_long": 1, "stop_loss_pct": 15.0, "take_profit_pct": 25.0},
-    "BITX-TQQQ": {"signal_ticker": "BITX", "trade_ticker": "TQQQ", "offset_cl_buy": 10, "buy_operator": ">", "offset_ma_buy": 10, "ma_buy": 20, "offset_cl_sell": 50, "sell_operator": ">", "offset_ma_sell": 1, "ma_sell": 5, "use_trend_in_buy": False, "use_trend_in_sell": True, "offset_compare_short": 50, "ma_compare_short": 5, "offset_compare_long": 1, "ma_compare_long": 50, "stop_loss_pct": 0.0, "take_profit_pct": 15.0},
-}
+# 기본 프리셋은 modules/presets.py (CLI 배치와 공유), 여기서는 복사본에 저장 전략을 합침
+DEFAULT_PRESETS = dict(BUILTIN_PRESETS)
 
 # 로컬 파일(구글 시트 등)에 저장된 전략이 있다면 합치기
 try:
-    saved_strategies = load_saved_strategies()
+    with profiler.timer("app.saved_strategies"): saved_strategies = load_saved_strategies()
     if saved_strategies:
         DEFAULT_PRESETS.update(saved_strategies)
 except Exception as e:
@@ -88,6 +98,32 @@ except Exception as e:
 PRESETS = DEFAULT_PRESETS
 st.session_state["ALL_PRESETS_DATA"] = PRESETS
 
+# 저장/엔진 실행에 쓰는 전략 파라미터 키
+STRATEGY_KEYS = [
+    "signal_ticker_input", "trade_ticker_input", "market_ticker_input",
+    "buy_operator", "sell_operator", "strategy_behavior",
+    "ma_buy", "ma_sell", 
+    "offset_cl_buy", "offset_cl_sell", "offset_ma_buy", "offset_ma_sell",
+    "use_trend_in_buy", "use_trend_in_sell",
+    "ma_compare_short", "ma_compare_long", "offset_compare_short", "offset_compare_long",
+    "stop_loss_pct", "take_profit_pct", "min_hold_days",
+    "fee_bps", "slip_bps",
+    "use_market_filter", "market_ma_period",
+    "use_bollinger", "bb_period", "bb_std", "bb_entry_type", "bb_exit_type",
+    "use_rsi_filter", "rsi_period", "rsi_max",
+    # [추가됨] ATR 설정 저장
+    "use_atr_stop", "atr_multiplier"
+]
+
+def _current_params():
+    return {k: st.session_state.get(k) for k in STRATEGY_KEYS}
+
+def _parse_config(params):
+    # 값이 잘못됐으면 (음수 오프셋 등) 예외 대신 화면에 오류를 띄우고 None
+    try: return StrategyConfig.from_dict(params)
+    except ValueError as e:
+        st.error(f"⚠️ 설정 오류: {e}"); return None
+
 def _on_preset_change():
     name = st.session_state["preset_name_selector"]
     st.session_state["preset_name"] = name
@@ -106,7 +142,7 @@ def _on_preset_change():
 # ==========================================
 # 2. 사이드바 (설정 & 저장)
 # ==========================================
-with st.sidebar:
+with st.sidebar, profiler.timer("app.sidebar"):
     st.header("⚙️ 설정 & Gemini")
     
     # API 키 입력
@@ -114,13 +150,13 @@ with st.sidebar:
     if api_key_input: 
         st.session_state["gemini_api_key"] = api_key_input
         try:
-            genai.configure(api_key=api_key_input)
-            models = [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+            with profiler.timer("app.gemini_models"): models = list_gemini_models(api_key_input)
             st.session_state["selected_model_name"] = st.selectbox("🤖 모델 선택", models, index=0)
         except: 
             st.error("모델 로드 실패")
     
     st.divider()
+    st.checkbox("⏱️ 구간별 시간 측정", key="profiling_on", help="데이터 로드/지표/엔진/차트 시간을 맨 아래 사이드바 패널에 표시")
 
     with st.expander("💾 전략 저장/삭제"):
         with st.form("strategy_save_form", clear_on_submit=False):
@@ -129,22 +165,7 @@ with st.sidebar:
             
             if submitted:
                 if save_name:
-                    keys_to_save = [
-                        "signal_ticker_input", "trade_ticker_input", "market_ticker_input",
-                        "buy_operator", "sell_operator", "strategy_behavior",
-                        "ma_buy", "ma_sell", 
-                        "offset_cl_buy", "offset_cl_sell", "offset_ma_buy", "offset_ma_sell",
-                        "use_trend_in_buy", "use_trend_in_sell",
-                        "ma_compare_short", "ma_compare_long", "offset_compare_short", "offset_compare_long",
-                        "stop_loss_pct", "take_profit_pct", "min_hold_days",
-                        "fee_bps", "slip_bps",
-                        "use_market_filter", "market_ma_period",
-                        "use_bollinger", "bb_period", "bb_std", "bb_entry_type", "bb_exit_type",
-                        "use_rsi_filter", "rsi_period", "rsi_max",
-                        # [추가됨] ATR 설정 저장
-                        "use_atr_stop", "atr_multiplier"
-                    ]
-                    params = {k: st.session_state.get(k) for k in keys_to_save}
+                    params = _current_params()
                     save_strategy_to_file(save_name, params)
                     st.session_state["preset_name_selector"] = save_name
                     st.rerun()
@@ -157,6 +178,9 @@ with st.sidebar:
             st.session_state["preset_name_selector"] = "직접 설정"
             st.rerun()
 
+        sync = strategy_sync_status()
+        if sync["대기"] and not sync["꺼짐"]: st.caption(f"☁️ 구글 시트 반영 대기 {sync['대기']}개" + (f" ({sync['오류']})" if sync["오류"] else ""))
+
     st.divider()
     
     selected_preset = st.selectbox(
@@ -179,7 +203,7 @@ start_date = col4.date_input("시작일", value=datetime.date(2020, 1, 1),min_va
 end_date = col5.date_input("종료일", value=datetime.date.today())
 
 # --- 사이드바 상세 설정 UI (전체 교체) ---
-with st.expander("📈 상세 설정 (Offset, 비용 등)", expanded=False):
+with st.expander("📈 상세 설정 (Offset, 비용 등)", expanded=False), profiler.timer("app.params"):
     tabs = st.tabs(["📊 이평선 설정", "🚦 시장 필터", "🌊 볼린저 밴드", "🛡️ 리스크/기타"])
 
     # 1. 이평선 및 추세선 설정
@@ -187,8 +211,8 @@ with st.expander("📈 상세 설정 (Offset, 비용 등)", expanded=False):
         st.markdown("#### 📥 매수 조건")
         c1, c2 = st.columns(2)
         c1.number_input("매수 이평 (MA)", key="ma_buy", step=1, min_value=1)
-        c2.number_input("매수 이평 Offset", key="offset_ma_buy", step=1)
-        c1.number_input("매수 종가 Offset", key="offset_cl_buy", step=1)
+        c2.number_input("매수 이평 Offset", key="offset_ma_buy", step=1, min_value=0)
+        c1.number_input("매수 종가 Offset", key="offset_cl_buy", step=1, min_value=0)
         c2.selectbox("매수 부호", [">", "<"], key="buy_operator")
         st.checkbox("매수 추세 필터 (정배열)", key="use_trend_in_buy")
 
@@ -196,8 +220,8 @@ with st.expander("📈 상세 설정 (Offset, 비용 등)", expanded=False):
         st.markdown("#### 📤 매도 조건")
         c3, c4 = st.columns(2)
         c3.number_input("매도 이평 (MA)", key="ma_sell", step=1, min_value=1)
-        c4.number_input("매도 이평 Offset", key="offset_ma_sell", step=1)
-        c3.number_input("매도 종가 Offset", key="offset_cl_sell", step=1)
+        c4.number_input("매도 이평 Offset", key="offset_ma_sell", step=1, min_value=0)
+        c3.number_input("매도 종가 Offset", key="offset_cl_sell", step=1, min_value=0)
         c4.selectbox("매도 부호", ["<", ">", "OFF"], key="sell_operator")
         st.checkbox("매도 역추세 필터 (역배열)", key="use_trend_in_sell")
 
@@ -210,11 +234,11 @@ with st.expander("📈 상세 설정 (Offset, 비용 등)", expanded=False):
         with t1:
             st.markdown("**단기 추세선 (Short)**")
             st.number_input("기간 (Period)", key="ma_compare_short", step=1, min_value=1)
-            st.number_input("오프셋 (Offset)", key="offset_compare_short", step=1)
+            st.number_input("오프셋 (Offset)", key="offset_compare_short", step=1, min_value=0)
         with t2:
             st.markdown("**장기 추세선 (Long)**")
             st.number_input("기간 (Period)", key="ma_compare_long", step=1, min_value=1)
-            st.number_input("오프셋 (Offset)", key="offset_compare_long", step=1)
+            st.number_input("오프셋 (Offset)", key="offset_compare_long", step=1, min_value=0)
 
     # 2. 시장 필터
     with tabs[1]:
@@ -248,7 +272,7 @@ with st.expander("📈 상세 설정 (Offset, 비용 등)", expanded=False):
                 st.number_input("고정 손절 (%)", step=0.5, key="stop_loss_pct")
             
             st.number_input("익절 (%)", step=0.5, key="take_profit_pct")
-            st.number_input("최소 보유일", step=1, key="min_hold_days")
+            st.number_input("최소 보유일", step=1, key="min_hold_days", min_value=0)
         with c6:
             st.markdown("#### ⚙️ 기타")
             st.selectbox("행동 패턴", ["1. 포지션 없으면 매수 / 보유 중이면 매도", "2. 매수 우선"], key="strategy_behavior")
@@ -268,7 +292,7 @@ with st.expander("📈 상세 설정 (Offset, 비용 등)", expanded=False):
 # ==========================================
 tab0, tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["🏢 기업 정보", "🎯 시그널", "📚 PRESETS", "🧪 백테스트", "🧬 실험실", "🧮 손절 계산기", "📊 펀더멘털"])
 
-with tab0:
+with tab0, profiler.timer("render.company"):
     st.markdown("### 🏢 기업 기본 정보 (Fundamental)")
     if trade_ticker:
         fd = get_fundamental_info(trade_ticker)
@@ -289,22 +313,18 @@ with tab0:
     else:
         st.warning("티커를 입력해주세요.")
 
-with tab1:
-    if st.button("📌 오늘의 매매 시그널 확인", type="primary", use_container_width=True):
-        base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = prepare_base(
-            signal_ticker, trade_ticker, market_ticker, start_date, end_date, 
-            [st.session_state.ma_buy, st.session_state.ma_sell, st.session_state.ma_compare_short, st.session_state.ma_compare_long], 
-            st.session_state.market_ma_period
-        )
+with tab1, profiler.timer("render.signal"):
+    if st.button("📌 오늘의 매매 시그널 확인", type="primary", use_container_width=True) and _parse_config(_current_params()) is not None:
+        # 마지막 봉 판정에 필요한 만큼만 로드 (가장 긴 이평/볼린저/RSI/시장 이평 창 + 오프셋)
+        params = _current_params()
+        base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = prepare_signal_base(signal_ticker, trade_ticker, market_ticker, start_date, end_date, params)
         if base is not None:
-             check_signal_today(base, st.session_state.ma_buy, st.session_state.offset_ma_buy, st.session_state.ma_sell, st.session_state.offset_ma_sell, st.session_state.offset_cl_buy, st.session_state.offset_cl_sell, st.session_state.ma_compare_short, st.session_state.ma_compare_long, st.session_state.offset_compare_short, st.session_state.offset_compare_long, st.session_state.buy_operator, st.session_state.sell_operator, st.session_state.use_trend_in_buy, st.session_state.use_trend_in_sell,
-                                st.session_state.use_market_filter, market_ticker, st.session_state.market_ma_period, 
-                                st.session_state.use_bollinger, st.session_state.bb_period, st.session_state.bb_std, st.session_state.bb_entry_type, st.session_state.bb_exit_type)
+             check_signal_today(base, params, market_arrays(base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr))
         else: st.error("데이터 로딩 실패")
 
 # --- tab2 전체 교체 ---
 # --- Tab 2: 프리셋 전체 분석 ---
-with tab2:
+with tab2, profiler.timer("render.presets"):
     st.markdown("### 📚 전략 일괄 진단 & 기간별 스트레스 테스트")
     
     # 백테스트는 항상 실행 (화면엔 안 보임)
@@ -320,92 +340,20 @@ with tab2:
         st.info(f"사이드바에 설정된 기간 (**{start_date} ~ {end_date}**)을 기준으로 현재 상태를 진단합니다.")
         
         if st.button("🚀 분석 시작 (현재 설정)", type="primary"):
-            rows = []
             progress_text = "전략 분석 중..."
             my_bar = st.progress(0, text=progress_text)
-            total_presets = len(PRESETS)
-            
-            for i, (name, p) in enumerate(PRESETS.items()):
-                my_bar.progress(int((i / total_presets) * 100), text=f"분석 중: {name}")
-                
-                s_ticker = p.get("signal_ticker", p.get("signal_ticker_input", "SOXL"))
-                t_ticker = p.get("trade_ticker", p.get("trade_ticker_input", "SOXL"))
-                m_ticker = p.get("market_ticker", p.get("market_ticker_input", "SPY"))
-                
-                ma_pool = [
-                    int(p.get("ma_buy", 50)), int(p.get("ma_sell", 10)),
-                    int(p.get("ma_compare_short", 0) or 0), int(p.get("ma_compare_long", 0) or 0)
-                ]
-                
-                base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = prepare_base(
-                    s_ticker, t_ticker, m_ticker, start_date, end_date, ma_pool, 
-                    int(p.get("market_ma_period", 200))
-                )
-                
-                if base is not None and not base.empty:
-                    # 시그널 요약
-                    sig_res = summarize_signal_today(get_data(s_ticker, start_date, end_date), p)
-                    
-                    row_data = {
-                        "전략명": name, 
-                        "티커": t_ticker, # [수정] s_ticker -> t_ticker (매매 티커 기준)
-                        "현재상태": sig_res["label"], 
-                        "최근매수": sig_res["last_buy"],
-                        "보유여부": "❓ 미확인"
-                    }
 
-                    # 백테스트 실행
-                    bt_res = backtest_fast(
-                        base, x_sig, x_trd, ma_dict,
-                        int(p.get("ma_buy", 50)), int(p.get("offset_ma_buy", 0)),
-                        int(p.get("ma_sell", 10)), int(p.get("offset_ma_sell", 0)),
-                        int(p.get("offset_cl_buy", 0)), int(p.get("offset_cl_sell", 0)),
-                        int(p.get("ma_compare_short", 0) or 0), int(p.get("ma_compare_long", 0) or 0),
-                        int(p.get("offset_compare_short", 0)), int(p.get("offset_compare_long", 0)),
-                        5000000, 
-                        float(p.get("stop_loss_pct", 0.0)), float(p.get("take_profit_pct", 0.0)),
-                        str(p.get("strategy_behavior", "1")), int(p.get("min_hold_days", 0)),
-                        float(p.get("fee_bps", 25)), float(p.get("slip_bps", 1)),
-                        bool(p.get("use_trend_in_buy", True)), bool(p.get("use_trend_in_sell", False)),
-                        str(p.get("buy_operator", ">")), str(p.get("sell_operator", "<")),
-                        use_rsi_filter=bool(p.get("use_rsi_filter", False)),
-                        rsi_period=int(p.get("rsi_period", 14)), rsi_min=30, rsi_max=int(p.get("rsi_max", 70)),
-                        use_market_filter=bool(p.get("use_market_filter", False)),
-                        x_mkt=x_mkt, ma_mkt_arr=ma_mkt_arr,
-                        use_bollinger=bool(p.get("use_bollinger", False)),
-                        bb_period=int(p.get("bb_period", 20)), bb_std=float(p.get("bb_std", 2.0)),
-                        bb_entry_type=str(p.get("bb_entry_type", "")), bb_exit_type=str(p.get("bb_exit_type", "")),
-                        use_atr_stop=bool(p.get("use_atr_stop", False)),
-                        atr_multiplier=float(p.get("atr_multiplier", 2.0))
-                    )
-                    
-                    # 보유 여부 및 날짜 표시 로직
-                    hold_status = "⚪ 미보유"
-                    trades = bt_res.get('매매 로그', [])
-                    
-                    if trades:
-                        last_trade = trades[-1]
-                        if last_trade.get('신호') == 'BUY':
-                            buy_date = last_trade.get('날짜')
-                            if isinstance(buy_date, pd.Timestamp):
-                                buy_date_str = buy_date.strftime("%Y-%m-%d")
-                            else:
-                                buy_date_str = str(buy_date)[:10]
-                            hold_status = f"🟢 보유중 ({buy_date_str})"
-                    
-                    row_data.update({
-                        "보유여부": hold_status,
-                        "총 수익률(%)": f"{bt_res.get('수익률 (%)', 0)}%",
-                        "MDD(%)": f"{bt_res.get('MDD (%)', 0)}%",
-                        "승률(%)": f"{bt_res.get('승률 (%)', 0)}%",
-                        "매매횟수": bt_res.get('총 매매 횟수', 0)
-                    })
-                    
-                    rows.append(row_data)
-                else:
-                    rows.append({"전략명": name, "티커": t_ticker, "보유여부": "❌ 에러", "현재상태": "데이터오류"})
+            # (시그널, 매매, 시장) 조합별로 데이터/이평선을 한 번만 만들고 묶어서 평가
+            # 설정/데이터가 그대로인 프리셋은 저장된 상태를 재사용 (새 봉만 생겼으면 그 봉만 계산)
+            preset_store = PresetStateStore()
+            rows = evaluate_presets(
+                PRESETS, start_date, end_date, store=preset_store,
+                on_progress=lambda done, total, s_ticker: my_bar.progress(int(done / total * 100), text=f"분석 중: {s_ticker} 그룹")
+            )
 
             my_bar.empty()
+            run = preset_store.last_run
+            st.caption(f"💾 저장된 결과 재사용 {run.get('재사용', 0)}개 · 새 봉만 계산 {run.get('이어서', 0)}개 · 전체 계산 {run.get('전체', 0)}개")
             
             if rows:
                 df_result = pd.DataFrame(rows)
@@ -446,74 +394,37 @@ with tab2:
             periods = [5, 10, 15, 20]
             data_list = []
             
-            total_steps = len(PRESETS) * len(periods)
             p_bar = st.progress(0, text="멀티 백테스트 준비 중...")
-            step_count = 0
             today = datetime.date.today()
-            
+            start_dates = [today - datetime.timedelta(days=365 * yr) for yr in periods]
+
+            # 조합별로 20년치만 한 번 로드하고, 구간마다 포지션/지표를 새로 시작한 것과 같게 한 배치로 계산
+            horizon_res = evaluate_preset_horizons(
+                PRESETS, start_dates, today,
+                on_progress=lambda done, total, s_ticker: p_bar.progress(int(done / total * 100), text=f"[{s_ticker}] 구간 분석 중...")
+            )
+
             for name, p in PRESETS.items():
-                s_ticker = p.get("signal_ticker", p.get("signal_ticker_input", "SOXL"))
-                t_ticker = p.get("trade_ticker", p.get("trade_ticker_input", "SOXL"))
-                m_ticker = p.get("market_ticker", p.get("market_ticker_input", "SPY"))
-                
                 # 전략 식별자 (매매 티커 표시)
                 # [수정] s_ticker -> t_ticker
-                strategy_idx = f"{name} ({t_ticker})"
+                strategy_idx = f"{name} ({preset_tickers(p)[1]})"
                 row_data = {}
-                
-                for yr in periods:
-                    step_count += 1
-                    p_bar.progress(int((step_count / total_steps) * 100), text=f"[{name}] {yr}년 데이터 분석 중...")
-                    start_d = today - datetime.timedelta(days=365 * yr)
-                    
-                    ma_pool = [
-                        int(p.get("ma_buy", 50)), int(p.get("ma_sell", 10)),
-                        int(p.get("ma_compare_short", 0) or 0), int(p.get("ma_compare_long", 0) or 0)
-                    ]
-                    
-                    try:
-                        base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = prepare_base(
-                            s_ticker, t_ticker, m_ticker, start_d, today, ma_pool, 
-                            int(p.get("market_ma_period", 200))
-                        )
-                        
-                        if base is not None and not base.empty:
-                            res = backtest_fast(
-                                base, x_sig, x_trd, ma_dict,
-                                int(p.get("ma_buy", 50)), int(p.get("offset_ma_buy", 0)),
-                                int(p.get("ma_sell", 10)), int(p.get("offset_ma_sell", 0)),
-                                int(p.get("offset_cl_buy", 0)), int(p.get("offset_cl_sell", 0)),
-                                int(p.get("ma_compare_short", 0) or 0), int(p.get("ma_compare_long", 0) or 0),
-                                int(p.get("offset_compare_short", 0)), int(p.get("offset_compare_long", 0)),
-                                5000000, 
-                                float(p.get("stop_loss_pct", 0.0)), float(p.get("take_profit_pct", 0.0)),
-                                str(p.get("strategy_behavior", "1")), int(p.get("min_hold_days", 0)),
-                                float(p.get("fee_bps", 25)), float(p.get("slip_bps", 1)),
-                                bool(p.get("use_trend_in_buy", True)), bool(p.get("use_trend_in_sell", False)),
-                                str(p.get("buy_operator", ">")), str(p.get("sell_operator", "<")),
-                                use_rsi_filter=bool(p.get("use_rsi_filter", False)),
-                                rsi_period=int(p.get("rsi_period", 14)), rsi_min=30, rsi_max=int(p.get("rsi_max", 70)),
-                                use_market_filter=bool(p.get("use_market_filter", False)),
-                                x_mkt=x_mkt, ma_mkt_arr=ma_mkt_arr,
-                                use_bollinger=bool(p.get("use_bollinger", False)),
-                                bb_period=int(p.get("bb_period", 20)), bb_std=float(p.get("bb_std", 2.0)),
-                                bb_entry_type=str(p.get("bb_entry_type", "")), bb_exit_type=str(p.get("bb_exit_type", "")),
-                                use_atr_stop=bool(p.get("use_atr_stop", False)),
-                                atr_multiplier=float(p.get("atr_multiplier", 2.0))
-                            )
-                            
-                            real_start = base['Date'].iloc[0].date()
-                            years_avail = round((today - real_start).days / 365, 1)
-                            suffix = f" ({years_avail}y)" if years_avail < (yr - 0.5) else ""
-                            
-                            row_data[('수익률', f"{yr}년")] = f"{res.get('수익률 (%)', 0)}%{suffix}"
-                            row_data[('MDD', f"{yr}년")] = f"{res.get('MDD (%)', 0)}%"
-                            row_data[('승률', f"{yr}년")] = f"{res.get('승률 (%)', 0)}%"
-                            row_data[('매매횟수', f"{yr}년")] = f"{res.get('총 매매 횟수', 0)}회"
-                        else:
-                            for cat in ['수익률', 'MDD', '승률', '매매횟수']: row_data[(cat, f"{yr}년")] = "-"
-                    except:
+                per_horizon = horizon_res.get(name)
+
+                for h, yr in enumerate(periods):
+                    if per_horizon is None:
                         for cat in ['수익률', 'MDD', '승률', '매매횟수']: row_data[(cat, f"{yr}년")] = "Err"
+                    elif per_horizon[h] is None:
+                        for cat in ['수익률', 'MDD', '승률', '매매횟수']: row_data[(cat, f"{yr}년")] = "-"
+                    else:
+                        res, real_start = per_horizon[h]
+                        years_avail = round((today - real_start).days / 365, 1)
+                        suffix = f" ({years_avail}y)" if years_avail < (yr - 0.5) else ""
+
+                        row_data[('수익률', f"{yr}년")] = f"{res.get('수익률 (%)', 0)}%{suffix}"
+                        row_data[('MDD', f"{yr}년")] = f"{res.get('MDD (%)', 0)}%"
+                        row_data[('승률', f"{yr}년")] = f"{res.get('승률 (%)', 0)}%"
+                        row_data[('매매횟수', f"{yr}년")] = f"{res.get('총 매매 횟수', 0)}회"
 
                 row_data[('전략', '이름')] = strategy_idx
                 data_list.append(row_data)
@@ -534,8 +445,8 @@ with tab2:
                 final_cols = [c for c in desired_cols if c in df_raw.columns]
                 st.dataframe(df_raw[final_cols], use_container_width=True)
                 
-with tab3:
-    if st.button("✅ 백테스트 실행 (종가매매)", type="primary", use_container_width=True):
+with tab3, profiler.timer("render.backtest"):
+    if st.button("✅ 백테스트 실행 (종가매매)", type="primary", use_container_width=True) and (cfg := _parse_config(_current_params())) is not None:
         
         p_ma_buy = int(st.session_state.ma_buy)
         p_ma_sell = int(st.session_state.ma_sell)
@@ -547,19 +458,10 @@ with tab3:
         
         if base is not None:
             with st.spinner("과거 데이터를 한 땀 한 땀 분석 중..."):
-                p_use_rsi = st.session_state.get("use_rsi_filter", False)
-                p_rsi_period = st.session_state.get("rsi_period", 14)
-                p_rsi_max = st.session_state.get("rsi_max", 70)
-
-                res = backtest_fast(base, x_sig, x_trd, ma_dict, p_ma_buy, st.session_state.offset_ma_buy, p_ma_sell, st.session_state.offset_ma_sell, st.session_state.offset_cl_buy, st.session_state.offset_cl_sell, p_ma_compare_short, p_ma_compare_long, st.session_state.offset_compare_short, st.session_state.offset_compare_long, 5000000, st.session_state.stop_loss_pct, st.session_state.take_profit_pct, st.session_state.strategy_behavior, st.session_state.min_hold_days, st.session_state.fee_bps, st.session_state.slip_bps, st.session_state.use_trend_in_buy, st.session_state.use_trend_in_sell, st.session_state.buy_operator, st.session_state.sell_operator, 
-                                use_rsi_filter=p_use_rsi, rsi_period=p_rsi_period, rsi_min=30, rsi_max=p_rsi_max,
-                                use_market_filter=st.session_state.use_market_filter, x_mkt=x_mkt, ma_mkt_arr=ma_mkt_arr,
-                                use_bollinger=st.session_state.use_bollinger, bb_period=st.session_state.bb_period, bb_std=st.session_state.bb_std, 
-                                bb_entry_type=st.session_state.bb_entry_type, bb_exit_type=st.session_state.bb_exit_type,
-                                # [추가됨] ATR 파라미터 전달
-                                use_atr_stop=st.session_state.get("use_atr_stop", False),
-                                atr_multiplier=st.session_state.get("atr_multiplier", 2.0))
+                res = run_backtest(base, x_sig, x_trd, ma_dict, cfg, 5000000, x_mkt, ma_mkt_arr)
             st.session_state["bt_result"] = res
+            st.session_state.pop("bt_stress", None); st.session_state.pop("bt_cost", None); st.session_state.pop("bt_start_curve", None)
+            st.session_state["bt_bootstrap"] = bootstrap_trades(trade_returns(res.get('매매 로그', []), 5000000)) if res else None
             if "ai_analysis" in st.session_state: del st.session_state["ai_analysis"]
             st.rerun()
         else: st.error("데이터 로딩 실패")
@@ -657,6 +559,92 @@ with tab3:
             
             k3.metric("승률", f"{res['승률 (%)']}%")
             k4.metric("Profit Factor", res['Profit Factor'])
+
+            # [NEW] 매매 단위 부트스트랩 (Monte Carlo)
+            mc = st.session_state.get("bt_bootstrap")
+            if mc:
+                with st.expander(f"🎲 몬테카를로 견고성 ({mc['시뮬레이션']:,}회 재추출, 매매 {mc['매매수']}건)"):
+                    st.caption("매매별 수익률(비용 포함)을 복원추출해 순서를 섞은 결과입니다. MDD는 매매 단위로 계산되어 일봉 MDD보다 얕게 나올 수 있습니다.")
+                    df_mc = pd.DataFrame({k: {**mc[k], "실제": mc["실제"][k]} for k in ["수익률 (%)", "MDD (%)", "최대 연속손실"]}).T
+                    st.dataframe(df_mc, use_container_width=True)
+                    st.metric("손실 확률", f"{mc['손실확률 (%)']}%")
+
+            # [NEW] 블록 부트스트랩 합성 경로 스트레스 테스트
+            with st.expander("🌀 합성 경로 스트레스 테스트 (Block Bootstrap)"):
+                st.caption("시그널/매매/시장 일간 수익률을 같은 날짜 블록 단위로 재조합해 '있을 법한 다른 역사'를 만들고, 현재 설정을 모든 경로에 실행합니다.")
+                s1, s2 = st.columns(2)
+                n_paths = s1.number_input("경로 수", 50, 2000, 300, step=50)
+                block_len = s2.number_input("평균 블록 길이 (일)", 1, 250, 20)
+                if st.button("🌀 스트레스 테스트 실행") and _parse_config(_current_params()) is not None:
+                    ma_pool = [int(st.session_state.ma_buy), int(st.session_state.ma_sell), int(st.session_state.ma_compare_short or 0), int(st.session_state.ma_compare_long or 0)]
+                    base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = prepare_base(signal_ticker, trade_ticker, market_ticker, start_date, end_date, ma_pool, st.session_state.market_ma_period)
+                    if base is not None:
+                        with st.spinner("합성 경로 생성 및 일괄 백테스트 중..."):
+                            arrs = market_arrays(base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr)
+                            st.session_state["bt_stress"] = stress_paths(arrs, _current_params(), int(n_paths), int(block_len))
+                    else: st.error("데이터 로딩 실패")
+
+                df_st = st.session_state.get("bt_stress")
+                if df_st is not None and not df_st.empty:
+                    q1, q2, q3 = st.columns(3)
+                    q1.metric("수익률 중앙값", f"{df_st['수익률 (%)'].median():.1f}%", f"하위5%: {df_st['수익률 (%)'].quantile(0.05):.1f}%", delta_color="off")
+                    q2.metric("MDD 중앙값", f"{df_st['MDD (%)'].median():.1f}%", f"하위5%: {df_st['MDD (%)'].quantile(0.05):.1f}%", delta_color="off")
+                    q3.metric("손실 경로 비율", f"{(df_st['수익률 (%)'] < 0).mean() * 100:.1f}%")
+                    fig_st = go.Figure(go.Histogram(x=df_st['수익률 (%)'], nbinsx=50, name="경로별 수익률"))
+                    fig_st.add_vline(x=res['수익률 (%)'], line_dash="dash", line_color="gold", annotation_text="실제")
+                    fig_st.update_layout(height=300, template="plotly_dark", margin=dict(t=30, b=30))
+                    st.plotly_chart(fig_st, use_container_width=True)
+
+            # [NEW] 수수료/슬리피지 민감도 (매매 1회 시뮬레이션 후 비용만 재계산)
+            with st.expander("💸 비용 민감도 (수수료 스윕)"):
+                st.caption(f"슬리피지 {st.session_state.slip_bps}bps 고정, 수수료를 0부터 올려가며 수익률 변화를 봅니다. 매매 시점은 비용과 무관해 한 번만 시뮬레이션합니다.")
+                c_max, c_step = st.columns(2)
+                fee_max = c_max.number_input("최대 수수료 (bps)", 10, 1000, 200, step=10)
+                fee_step = c_step.number_input("간격 (bps)", 1, 100, 5)
+                if st.button("💸 비용 스윕 실행") and _parse_config(_current_params()) is not None:
+                    ma_pool = [int(st.session_state.ma_buy), int(st.session_state.ma_sell), int(st.session_state.ma_compare_short or 0), int(st.session_state.ma_compare_long or 0)]
+                    base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = prepare_base(signal_ticker, trade_ticker, market_ticker, start_date, end_date, ma_pool, st.session_state.market_ma_period)
+                    if base is not None:
+                        arrs = market_arrays(base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr)
+                        st.session_state["bt_cost"] = cost_sweep(arrs, _current_params(), list(range(0, int(fee_max) + 1, int(fee_step))))
+                    else: st.error("데이터 로딩 실패")
+
+                df_cost = st.session_state.get("bt_cost")
+                if df_cost is not None and not df_cost.empty:
+                    be = breakeven_cost(df_cost)
+                    st.metric("손익분기 총비용", f"{be} bps" if be is not None else "범위 밖", help="수익률이 0%가 되는 1회 체결당 비용(수수료+슬리피지)")
+                    fig_c = go.Figure(go.Scatter(x=df_cost["총비용(bps)"], y=df_cost["수익률 (%)"], mode="lines+markers", name="수익률"))
+                    fig_c.add_vline(x=st.session_state.fee_bps + st.session_state.slip_bps, line_dash="dash", line_color="gold", annotation_text="현재")
+                    fig_c.update_layout(height=300, template="plotly_dark", xaxis_title="총비용 (bps)", yaxis_title="수익률 (%)", margin=dict(t=30, b=30))
+                    st.plotly_chart(fig_c, use_container_width=True)
+
+            # [NEW] 시작일 민감도 (시작 시점만 바꿔 끝까지 매매)
+            with st.expander("📅 시작일 민감도 (시작 시점별 수익률)"):
+                st.caption("시작일을 바꿔가며 무포지션에서 시작해 오늘까지 매매한 결과입니다. 같은 매매 경로에 합류하면 그 경로를 재사용해 계산을 멈춥니다.")
+                sd_mode = st.radio("시작 시점", ["매월 첫 거래일", "모든 거래일"], horizontal=True)
+                if st.button("📅 시작일 분석 실행") and _parse_config(_current_params()) is not None:
+                    ma_pool = [int(st.session_state.ma_buy), int(st.session_state.ma_sell), int(st.session_state.ma_compare_short or 0), int(st.session_state.ma_compare_long or 0)]
+                    base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = prepare_base(signal_ticker, trade_ticker, market_ticker, start_date, end_date, ma_pool, st.session_state.market_ma_period)
+                    if base is not None:
+                        with st.spinner("시작일별 경로 계산 중..."):
+                            arrs = market_arrays(base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr)
+                            starts = month_start_bars(arrs["dates"]) if sd_mode == "매월 첫 거래일" else None
+                            st.session_state["bt_start_curve"] = start_date_curve(arrs, _current_params(), starts)
+                    else: st.error("데이터 로딩 실패")
+
+                df_sd = st.session_state.get("bt_start_curve")
+                if df_sd is not None and not df_sd.empty:
+                    r1, r2, r3 = st.columns(3)
+                    r1.metric("수익률 중앙값", f"{df_sd['수익률 (%)'].median():.1f}%", f"하위5%: {df_sd['수익률 (%)'].quantile(0.05):.1f}%", delta_color="off")
+                    r2.metric("MDD 중앙값", f"{df_sd['MDD (%)'].median():.1f}%", f"하위5%: {df_sd['MDD (%)'].quantile(0.05):.1f}%", delta_color="off")
+                    r3.metric("손실 시작일 비율", f"{(df_sd['수익률 (%)'] < 0).mean() * 100:.1f}%")
+                    fig_sd = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.05)
+                    fig_sd.add_trace(go.Scatter(x=df_sd["시작일"], y=df_sd["수익률 (%)"], name="수익률 (%)", line=dict(color="#00F0FF")), row=1, col=1)
+                    fig_sd.add_trace(go.Scatter(x=df_sd["시작일"], y=df_sd["MDD (%)"], name="MDD (%)", line=dict(color="#FF4B4B"), fill="tozeroy"), row=2, col=1)
+                    fig_sd.update_layout(height=450, template="plotly_dark", margin=dict(t=30, b=30))
+                    st.plotly_chart(fig_sd, use_container_width=True)
+                    stats = df_sd.attrs.get("stats", {})
+                    if stats: st.caption(f"시작점 {stats['시작점']:,}개 · 끝까지 계산한 경로 {stats['끝까지 계산한 경로']}개 · 시뮬레이션 봉 {stats['시뮬레이션 봉']:,} (단순 반복 시 {stats['단순 반복 시 봉']:,})")
             
             # ---------------------------------------
             # (아래는 기존 차트 그리기 코드 그대로 유지)
@@ -669,6 +657,7 @@ with tab3:
                 chart_data = res.get("차트데이터", {})
                 base_df = chart_data.get("base")
                 
+                t_chart = time.perf_counter()
                 fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.03, row_heights=[0.5, 0.25, 0.25], 
                                     subplot_titles=("주가 & 매매타점 (Candle + MA)", "내 자산 vs 보유 전략 (Equity)", "MDD (%)"))
 
@@ -698,6 +687,7 @@ with tab3:
 
                 fig.update_layout(height=900, template="plotly_dark", hovermode="x unified", xaxis_rangeslider_visible=False)
                 st.plotly_chart(fig, use_container_width=True)
+                profiler.add("render.backtest_chart", time.perf_counter() - t_chart)
 
                 st.markdown("### 📅 월별 수익률 Heatmap")
                 df_log['Year'] = df_log['날짜'].dt.year
@@ -745,7 +735,7 @@ with tab3:
         else:
             st.warning("⚠️ 매매 신호가 발생하지 않았습니다.")
 
-with tab4:
+with tab4, profiler.timer("render.lab"):
     st.markdown("### 🧬 전략 파라미터 자동 최적화 (Grid Search)")
     st.caption("여러 설정을 자동으로 돌려보고 가장 좋은 수익률을 찾아냅니다.")
     
@@ -820,23 +810,29 @@ with tab4:
             "min_train_ret": min_train_ret, "min_test_ret": min_test_ret
         }
         
-        with st.spinner("AI가 최적의 파라미터를 탐색 중입니다..."):
-            df_opt = auto_search_train_test(
-                signal_ticker, trade_ticker, start_date, end_date, split_ratio, choices, 
-                n_trials=int(n_trials), initial_cash=5000000, 
-                fee_bps=st.session_state.fee_bps, slip_bps=st.session_state.slip_bps, strategy_behavior=st.session_state.strategy_behavior, min_hold_days=st.session_state.min_hold_days,
-                constraints=constraints
-            )
+        # 후보 값 검사 (음수 오프셋 등, 항목마다 가장 작은 값)
+        if _parse_config({k: min(v) for k, v in choices.items() if v}) is not None:
+            with st.spinner("AI가 최적의 파라미터를 탐색 중입니다..."):
+                df_opt = auto_search_train_test(
+                    signal_ticker, trade_ticker, start_date, end_date, split_ratio, choices, 
+                    n_trials=int(n_trials), initial_cash=5000000, 
+                    fee_bps=st.session_state.fee_bps, slip_bps=st.session_state.slip_bps, strategy_behavior=st.session_state.strategy_behavior, min_hold_days=st.session_state.min_hold_days,
+                    constraints=constraints
+                )
             
-            if not df_opt.empty:
-                for col in df_opt.columns:
-                    df_opt[col] = pd.to_numeric(df_opt[col], errors='ignore')
-                df_opt = df_opt.round(2)
+                opt_cache_stats = df_opt.attrs.get("cache_stats")
+                if opt_cache_stats:
+                    st.caption("♻️ 조건 배열 캐시 적중률 — " + " / ".join(f"{k}: {v['hit_rate']}% ({v['hits']}/{v['hits'] + v['misses']})" for k, v in opt_cache_stats.items()))
 
-                st.session_state['opt_results'] = df_opt 
-                st.session_state['sort_metric'] = sort_metric
-            else:
-                st.warning("조건을 만족하는 결과가 없습니다.")
+                if not df_opt.empty:
+                    for col in df_opt.columns:
+                        df_opt[col] = pd.to_numeric(df_opt[col], errors='ignore')
+                    df_opt = df_opt.round(2)
+
+                    st.session_state['opt_results'] = df_opt 
+                    st.session_state['sort_metric'] = sort_metric
+                else:
+                    st.warning("조건을 만족하는 결과가 없습니다.")
 
     if 'opt_results' in st.session_state:
         df_show = st.session_state['opt_results'].sort_values(st.session_state['sort_metric'], ascending=False).head(top_n)
@@ -849,8 +845,91 @@ with tab4:
                 if st.button(f"🥇 적용하기 #{i}", key=f"apply_{i}", on_click=apply_opt_params, args=(row,)):
                     st.rerun()
 
+        # --- 상위 후보 견고성 검증 (CPCV) ---
+        with st.expander("🧪 조합 퍼지 교차검증 (CPCV)"):
+            st.caption("기간을 N개 그룹으로 나눠 모든 Train/Test 조합에서 상위 후보의 Out-of-Sample 성과 분포를 봅니다. 그룹 사이에는 엠바고 공백을 둡니다.")
+            v1, v2, v3 = st.columns(3)
+            cv_groups = v1.number_input("그룹 수 (N)", 3, 12, 6)
+            cv_test = v2.number_input("Test 그룹 수", 1, 6, 2)
+            cv_embargo = v3.number_input("엠바고 (봉)", 0, 100, 5)
+            if st.button("🧪 CPCV 실행"):
+                cand_rows = [dict(r) for _, r in df_show.iterrows()]
+                common = {"fee_bps": st.session_state.fee_bps, "slip_bps": st.session_state.slip_bps,
+                          "min_hold_days": st.session_state.min_hold_days, "strategy_behavior": st.session_state.strategy_behavior}
+                cands = [{**common, **r} for r in cand_rows]
+                cv_pool = set([5, 10, 20, 60, 120])
+                for r in cand_rows:
+                    for k in ["ma_buy", "ma_sell", "ma_compare_short", "ma_compare_long"]:
+                        if pd.notna(r.get(k)) and int(r[k]) > 0: cv_pool.add(int(r[k]))
+                base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = prepare_base(signal_ticker, trade_ticker, "", start_date, end_date, sorted(cv_pool))
+                if base is None:
+                    st.error("데이터 로딩 실패")
+                elif int(cv_test) >= int(cv_groups):
+                    st.error("Test 그룹 수는 전체 그룹 수보다 작아야 합니다.")
+                else:
+                    with st.spinner("조합별 교차검증 중..."):
+                        arrs = market_arrays(base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr)
+                        cv = purged_cv(arrs, cands, int(cv_groups), int(cv_test), int(cv_embargo))
+                    if cv["summary"].empty:
+                        st.warning("검증할 데이터가 부족합니다.")
+                    else:
+                        cv["summary"].insert(1, "원래 순위", list(df_show.index))
+                        if cv["pbo"] is not None:
+                            st.metric("PBO (과최적화 확률)", f"{cv['pbo']}%", help="Train 1등 후보가 OOS에서 중앙값 아래로 떨어진 조합 비율")
+                        st.dataframe(cv["summary"], hide_index=True, use_container_width=True)
+                        st.dataframe(cv["splits"], hide_index=True, use_container_width=True)
 
-with tab5:
+    # ---------------------------------------------------------
+    # 2-파라미터 민감도 히트맵 (현재 설정 기준)
+    # ---------------------------------------------------------
+    st.divider()
+    st.markdown("### 🗺️ 파라미터 민감도 히트맵")
+    st.caption("현재 설정에서 두 파라미터만 격자로 바꿔가며 수익률/MDD를 한 번에 계산합니다. ★ 표시가 현재 설정입니다.")
+    h1, h2 = st.columns(2)
+    axes = {}
+    for col, axis, default_key in [(h1, "X", "ma_buy"), (h2, "Y", "ma_sell")]:
+        with col:
+            key = st.selectbox(f"{axis}축 파라미터", SENSITIVITY_PARAMS, index=SENSITIVITY_PARAMS.index(default_key), key=f"sens_{axis}_key")
+            a1, a2, a3 = st.columns(3)
+            is_float = key in ["stop_loss_pct", "take_profit_pct", "atr_multiplier", "bb_std"]
+            lo = a1.number_input("시작", value=1.0 if is_float else 5.0, key=f"sens_{axis}_lo")
+            hi = a2.number_input("끝", value=30.0 if is_float else 120.0, key=f"sens_{axis}_hi")
+            step = a3.number_input("간격", value=1.0 if is_float else 5.0, min_value=0.1 if is_float else 1.0, key=f"sens_{axis}_step")
+            vals = list(np.round(np.arange(lo, hi + step / 2, step), 4)) if hi >= lo else []
+            axes[axis] = (key, vals if is_float else sorted(set(int(v) for v in vals)))
+    sens_metric = st.radio("표시 지표", ["수익률 (%)", "MDD (%)", "총 매매 횟수"], horizontal=True, key="sens_metric")
+
+    if st.button("🗺️ 히트맵 계산"):
+        (x_key, x_vals), (y_key, y_vals) = axes["X"], axes["Y"]
+        if x_key == y_key or not x_vals or not y_vals:
+            st.error("서로 다른 두 파라미터와 올바른 범위를 지정해주세요.")
+        elif _parse_config({**_current_params(), x_key: x_vals[0], y_key: y_vals[0]}) is not None:   # 축은 오름차순이라 첫 값만 검사
+            cur = _current_params()
+            sens_pool = {int(cur["ma_buy"]), int(cur["ma_sell"]), int(cur["ma_compare_short"] or 0), int(cur["ma_compare_long"] or 0)}
+            for k, vs in [(x_key, x_vals), (y_key, y_vals)]:
+                if k.startswith("ma_"): sens_pool.update(int(v) for v in vs)
+            base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = prepare_base(signal_ticker, trade_ticker, market_ticker, start_date, end_date, sorted(sens_pool), st.session_state.market_ma_period)
+            if base is None: st.error("데이터 로딩 실패")
+            else:
+                with st.spinner(f"{len(x_vals) * len(y_vals):,}개 조합 일괄 계산 중..."):
+                    arrs = market_arrays(base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr)
+                    grid = sensitivity_grid(arrs, cur, x_key, x_vals, y_key, y_vals)
+                st.session_state["sens_result"] = {"grid": grid, "x": (x_key, x_vals), "y": (y_key, y_vals), "cur": (cur.get(x_key), cur.get(y_key))}
+
+    if "sens_result" in st.session_state:
+        sr = st.session_state["sens_result"]
+        (x_key, x_vals), (y_key, y_vals) = sr["x"], sr["y"]
+        z = sr["grid"][sens_metric]
+        fig_s = go.Figure(go.Heatmap(z=z, x=[str(v) for v in x_vals], y=[str(v) for v in y_vals], colorscale="RdBu", zmid=0 if sens_metric != "총 매매 횟수" else None, colorbar=dict(title=sens_metric)))
+        cx, cy = sr["cur"]
+        if cx is not None and cy is not None:
+            ix = int(np.argmin([abs(float(v) - float(cx)) for v in x_vals]))
+            iy = int(np.argmin([abs(float(v) - float(cy)) for v in y_vals]))
+            fig_s.add_trace(go.Scatter(x=[str(x_vals[ix])], y=[str(y_vals[iy])], mode="markers", marker=dict(symbol="star", size=18, color="gold", line=dict(color="black", width=1)), name="현재 설정"))
+        fig_s.update_layout(height=600, template="plotly_dark", xaxis_title=x_key, yaxis_title=y_key, margin=dict(t=30, b=30))
+        st.plotly_chart(fig_s, use_container_width=True)
+
+with tab5, profiler.timer("render.stoploss"):
     st.markdown("### 🧮 매매 계획 계산기 (손절 & 익절)")
     st.caption("진입 정보를 입력하면, ATR(변동성)과 고정 비율(%) 기준의 목표가를 비교해줍니다.")
 
@@ -947,7 +1026,7 @@ with tab5:
                 st.error("데이터를 불러올 수 없습니다.")
 
 # --- 탭 6: 펀더멘털 (주가 vs EPS) ---
-with tab6:
+with tab6, profiler.timer("render.fundamentals"):
     st.markdown("### 📊 펀더멘털 & EPS 추세 분석")
     st.caption("주가(Price) 흐름과 기업의 **EPS(주당순이익)** 추이를 함께 비교합니다.")
 
@@ -1167,15 +1246,20 @@ with tab6:
                     except Exception as e:
                         st.error(f"오류 발생: {e}")
 
-
-
-
-
-
-
-
-
-
-
-
-
+# ==========================================
+# ⏱️ 구간별 시간 (이번 재실행)
+# ==========================================
+if profiler.enabled():
+    prof = profiler.report()
+    with st.sidebar.expander(f"⏱️ 구간별 시간 (이번 실행 {prof['경과(ms)']:.0f}ms)", expanded=True):
+        if prof["구간"]: st.dataframe(pd.DataFrame(prof["구간"]), hide_index=True, use_container_width=True)
+        if prof["카운터"]: st.caption(" · ".join(f"{k} {v:,}" for k, v in prof["카운터"].items()))
+        st.download_button("JSON 내보내기", profiler.export_json(prof), file_name="profile.json", mime="application/json")
+
+# 캐시 현황 (TTL/메모리 예산 판단용, 프로세스 전체 누적)
+with st.sidebar.expander("🗄️ 캐시 현황"):
+    df_cache = pd.DataFrame(cache_stats())
+    if df_cache.empty: st.caption("아직 사용한 캐시가 없습니다.")
+    else:
+        df_cache["MB"] = (df_cache.pop("바이트") / 1e6).round(2)
+        st.dataframe(df_cache, hide_index=True, use_container_width=True)
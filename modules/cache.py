@@ -0,0 +1,206 @@
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+# ---------------------------------------------------------------
+# 코어용 캐시 (Streamlit 비의존)
+# @cached(ttl=...) 함수는 호출 시점의 백엔드로 감싸집니다.
+# 기본은 프로세스 내 TTL+LRU 메모리 캐시, 앱은 set_cache_backend 로 st.cache_data 를, CLI 는 DiskCache 를 끼웁니다.
+# 모든 캐시는 레지스트리에 이름으로 등록되어 적중/미스/제거 수와 보관 중인 항목·바이트를 cache_stats() 로 봅니다.
+# ---------------------------------------------------------------
+
+# --- 캐시 레지스트리 ---
+def approx_size(v):
+    """값이 차지하는 메모리 추정 (바이트). DataFrame/ndarray 는 데이터 크기, 컨테이너는 재귀 (숫자 리스트는 첫 원소로 추정)"""
+    if v is None: return 0
+    if hasattr(v, "memory_usage"):   # DataFrame / Series
+        try:
+            mu = v.memory_usage(deep=True, index=True)
+            return int(mu.sum()) if hasattr(mu, "sum") else int(mu)
+        except (TypeError, ValueError): pass
+    nb = getattr(v, "nbytes", None)  # ndarray
+    if isinstance(nb, int): return nb
+    if isinstance(v, (list, tuple)):
+        if v and isinstance(v[0], (int, float)): return sys.getsizeof(v) + len(v) * sys.getsizeof(v[0])
+        return sys.getsizeof(v) + sum(approx_size(x) for x in v)
+    if isinstance(v, dict): return sys.getsizeof(v) + sum(approx_size(k) + approx_size(x) for k, x in v.items())
+    return sys.getsizeof(v)
+
+class CacheStats:
+    """캐시 하나의 적중/미스/제거(만료·용량 초과) 수와 보관 중인 항목 수·바이트"""
+    def __init__(self, name, kind):
+        self.name, self.kind = name, kind
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.entries = self.bytes = 0
+
+    def hit(self):
+        with self._lock: self.hits += 1
+
+    def miss(self):
+        with self._lock: self.misses += 1
+
+    def stored(self, nbytes, entries=1):
+        with self._lock: self.entries += entries; self.bytes += nbytes
+
+    def removed(self, nbytes, entries=1, evicted=True):
+        with self._lock:
+            self.entries -= entries; self.bytes -= nbytes
+            if evicted: self.evictions += entries
+
+    def set_size(self, entries, nbytes):
+        with self._lock: self.entries, self.bytes = entries, nbytes
+
+    def row(self):
+        with self._lock: h, m, e, n, b = self.hits, self.misses, self.evictions, self.entries, self.bytes
+        return {"캐시": self.name, "종류": self.kind, "적중": h, "미스": m, "적중률(%)": round(h / (h + m) * 100, 1) if h + m else 0.0,
+                "항목": n, "바이트": b, "제거": e}
+
+_registry, _registry_lock = {}, threading.Lock()
+
+def register_cache(name, kind="memory"):
+    """이름으로 CacheStats 를 가져옴 (없거나 종류가 바뀌었으면 새로 만듦 — 백엔드 교체는 새 캐시)"""
+    with _registry_lock:
+        stats = _registry.get(name)
+        if stats is None or stats.kind != kind: stats = _registry[name] = CacheStats(name, kind)
+        return stats
+
+def cache_stats():
+    """등록된 모든 캐시의 현황 [{캐시, 종류, 적중, 미스, 적중률(%), 항목, 바이트, 제거}] (이름순)"""
+    with _registry_lock: stats = sorted(_registry.values(), key=lambda s: s.name)
+    return [s.row() for s in stats]
+
+def _freeze(v):
+    # 리스트/딕셔너리 인자도 키로 쓸 수 있게 (ma_pool 등)
+    if isinstance(v, (list, tuple)): return tuple(_freeze(x) for x in v)
+    if isinstance(v, dict): return tuple(sorted((k, _freeze(x)) for k, x in v.items()))
+    if isinstance(v, set): return frozenset(_freeze(x) for x in v)
+    try:
+        hash(v); return v
+    except TypeError: return repr(v)
+
+class MemoryCache:
+    """프로세스 내 TTL + LRU 캐시 (기본 백엔드). 값은 복사하지 않으므로 결과를 수정하지 마세요."""
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+
+    def wrap(self, fn, ttl=None):
+        entries, lock = OrderedDict(), threading.Lock()
+        stats = register_cache(fn.__qualname__, "memory")
+
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            key = (_freeze(args), _freeze(kwargs))
+            with lock:
+                hit = entries.get(key)
+                if hit is not None and (ttl is None or time.monotonic() - hit[0] < ttl):
+                    entries.move_to_end(key)
+                    stats.hit()
+                    return hit[1]
+            stats.miss()
+            value = fn(*args, **kwargs)
+            nbytes = approx_size(value)
+            with lock:
+                old = entries.pop(key, None)
+                if old is not None: stats.removed(old[2])   # 만료된 항목 교체
+                entries[key] = (time.monotonic(), value, nbytes)
+                stats.stored(nbytes)
+                while len(entries) > self.maxsize: stats.removed(entries.popitem(last=False)[1][2])
+            return value
+
+        def clear():
+            with lock:
+                entries.clear(); stats.set_size(0, 0)
+        inner.clear = clear
+        return inner
+
+class DiskCache:
+    """pickle 파일 캐시 (CLI 배치처럼 프로세스가 매번 새로 뜨는 경우 실행 간 재사용).
+    ttl: 지정하면 함수별 ttl 대신 사용 (None 이면 함수의 ttl, 함수도 None 이면 만료 없음)"""
+    def __init__(self, path, ttl=None):
+        self.path, self.ttl = path, ttl
+        self._stats = {}   # 파일 이름 앞부분(함수 이름) → CacheStats
+
+    def _files(self, name):
+        try: return [e for e in os.scandir(self.path) if e.name.startswith(f"{name}-") and e.name.endswith(".pkl")]
+        except OSError: return []
+
+    def wrap(self, fn, ttl=None):
+        ttl = self.ttl if self.ttl is not None else ttl
+        prefix = f"{fn.__module__}.{fn.__qualname__}"
+        stats = self._stats[fn.__name__] = register_cache(fn.__qualname__, "disk")
+        files = self._files(fn.__name__)   # 이전 실행이 남긴 파일
+        stats.set_size(len(files), sum(e.stat().st_size for e in files))
+
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            digest = hashlib.sha1(repr((prefix, _freeze(args), _freeze(kwargs))).encode("utf-8")).hexdigest()
+            fp = os.path.join(self.path, f"{fn.__name__}-{digest}.pkl")
+            old_size = None
+            try:
+                old_size = os.path.getsize(fp)
+                with open(fp, "rb") as f: saved_at, value = pickle.load(f)
+                if ttl is None or time.time() - saved_at < ttl:
+                    stats.hit()
+                    return value
+            except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError, ImportError): pass
+            stats.miss()
+            value = fn(*args, **kwargs)
+            try:
+                os.makedirs(self.path, exist_ok=True)
+                tmp = f"{fp}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f: pickle.dump((time.time(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, fp)
+                if old_size is not None: stats.removed(old_size)   # 만료/깨진 파일 교체
+                stats.stored(os.path.getsize(fp))
+            except OSError: pass
+            return value
+
+        return inner
+
+    def prune(self, max_age):
+        """max_age 초보다 오래된 캐시 파일 삭제 (날짜가 키에 들어가 매일 새 파일이 생기므로)"""
+        removed, now = 0, time.time()
+        try: names = os.listdir(self.path)
+        except OSError: return 0
+        for name in names:
+            fp = os.path.join(self.path, name)
+            try:
+                if name.endswith((".pkl", ".tmp")) and now - os.path.getmtime(fp) > max_age:
+                    size = os.path.getsize(fp)
+                    os.remove(fp); removed += 1
+                    stats = self._stats.get(name.rsplit("-", 1)[0]) if name.endswith(".pkl") else None
+                    if stats is not None: stats.removed(size)
+            except OSError: pass
+        return removed
+
+_backend = MemoryCache()
+
+def set_cache_backend(backend):
+    """캐시 백엔드 교체 (wrap(fn, ttl) 을 가진 객체). 이후 첫 호출부터 새 백엔드로 감쌉니다."""
+    global _backend
+    _backend = backend
+
+def get_cache_backend():
+    return _backend
+
+def cached(ttl=None):
+    """데이터 로드처럼 같은 인자면 결과가 같은 함수에 붙이는 캐시 데코레이터"""
+    def deco(fn):
+        bound = {"backend": None, "fn": None}
+
+        @wraps(fn)
+        def call(*args, **kwargs):
+            if bound["backend"] is not _backend:
+                bound["backend"], bound["fn"] = _backend, _backend.wrap(fn, ttl)
+            return bound["fn"](*args, **kwargs)
+
+        def clear():
+            if bound["fn"] is not None and hasattr(bound["fn"], "clear"): bound["fn"].clear()
+        call.clear = clear
+        return call
+    return deco
@@ -0,0 +1,139 @@
+"""장 마감 후 프리셋 일괄 평가 (브라우저 없이 실행하는 배치)
+
+    python -m modules.cli                          # 기본 프리셋 + my_strategies.json, 오늘까지
+    python -m modules.cli --presets a.json --sheet --out batch_out --format json parquet
+
+종료 코드: 0 전부 성공 / 1 일부 프리셋 데이터 오류 / 2 평가할 프리셋 없음·출력 실패·잘못된 인자
+Streamlit/Plotly/Gemini 는 import 하지 않습니다 (코어 모듈만 사용).
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import sys
+import time
+
+from . import profiler
+from .cache import DiskCache, set_cache_backend, cache_stats
+from .preset_store import PresetStateStore
+from .presets import DEFAULT_PRESETS, load_preset_file, load_sheet_presets_from_env
+from .strategy import evaluate_presets
+from .strategy_store import StrategyStore
+
+EXIT_OK, EXIT_PARTIAL, EXIT_FAILED = 0, 1, 2
+CACHE_MAX_AGE_DAYS = 7
+DEFAULT_PRESET_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "my_strategies.json")
+
+def _parse_args(argv):
+    ap = argparse.ArgumentParser(prog="python -m modules.cli", description="프리셋 일괄 평가 (시그널/보유/성과) → JSON/Parquet")
+    ap.add_argument("--presets", action="append", default=None, metavar="FILE",
+                    help="{전략명: 파라미터} JSON 파일 (여러 번 지정 가능, 기본: 저장소의 my_strategies.json)")
+    ap.add_argument("--no-builtin", action="store_true", help="기본 프리셋 제외")
+    ap.add_argument("--db", default="strategies.db", help="앱이 저장한 전략 SQLite 파일 (없으면 건너뜀, 빈 값이면 사용 안 함)")
+    ap.add_argument("--sheet", action="store_true", help="구글 시트 전략도 포함 (환경변수 GCP_KEY, SHEET_URL)")
+    ap.add_argument("--start", default="2020-01-01", help="평가 시작일 (앱 사이드바 기본값과 같음)")
+    ap.add_argument("--end", default=None, help="평가 종료일 (기본: 오늘)")
+    ap.add_argument("--out", default="batch_out", help="출력 폴더")
+    ap.add_argument("--format", nargs="+", choices=["json", "parquet"], default=["json"],
+                    help="parquet 은 pyarrow 또는 fastparquet 가 있어야 함 (없으면 경고 후 건너뜀)")
+    ap.add_argument("--workers", type=int, default=4, help="(시그널, 매매, 시장) 조합 병렬 수")
+    ap.add_argument("--cache-dir", default=".quantlab_cache", help="시세 데이터 디스크 캐시 폴더 (빈 값이면 메모리 캐시)")
+    ap.add_argument("--cache-ttl", type=float, default=None, help="디스크 캐시 유효 시간(초), 기본은 함수별 값")
+    ap.add_argument("--state", default="preset_state.json", help="프리셋 상태 저장 파일 (앱과 공유, 빈 값이면 사용 안 함)")
+    ap.add_argument("--profile", metavar="FILE", help="구간별 시간(데이터 로드/지표/엔진)을 JSON 으로 저장")
+    ap.add_argument("-q", "--quiet", action="store_true")
+    return ap.parse_args(argv)
+
+def load_presets(files=None, builtin=True, sheet=False, log=print, db=None):
+    """기본 프리셋 + JSON 파일 + 앱 저장 전략(SQLite) + (선택) 구글 시트. 뒤에 읽은 것이 같은 이름을 덮어씁니다 (앱과 같은 순서)"""
+    presets = dict(DEFAULT_PRESETS) if builtin else {}
+    for path in files if files is not None else ([DEFAULT_PRESET_FILE] if os.path.exists(DEFAULT_PRESET_FILE) else []):
+        loaded = load_preset_file(path)
+        if not loaded: log(f"⚠️ 프리셋 파일을 읽지 못했습니다: {path}")
+        presets.update(loaded)
+    if db and os.path.exists(db):
+        try: presets.update(StrategyStore(db).all())
+        except Exception as e: log(f"⚠️ 전략 저장소를 읽지 못했습니다: {db} ({e})")
+    if sheet:
+        try:
+            loaded = load_sheet_presets_from_env()
+            if loaded is None: log("⚠️ GCP_KEY/SHEET_URL 환경변수가 없어 시트 전략을 건너뜁니다.")
+            else: presets.update(loaded)
+        except Exception as e: log(f"⚠️ 시트 전략 로드 실패: {e}")
+    return presets
+
+def parquet_engine():
+    """설치된 parquet 엔진 이름 (requirements 에 없는 선택 의존성) 또는 None"""
+    for name in ("pyarrow", "fastparquet"):
+        if importlib.util.find_spec(name) is not None: return name
+    return None
+
+def write_outputs(rows, meta, out_dir, formats, log=print):
+    """rows 를 {out_dir}/presets_{종료일}.json / .parquet 로 저장하고 파일 경로 목록을 반환"""
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"presets_{meta['end'].replace('-', '')}")
+    paths = []
+    if "json" in formats:
+        with open(f"{stem}.json", "w", encoding="utf-8") as f:
+            json.dump({**meta, "presets": rows}, f, ensure_ascii=False, indent=1, default=str)
+        paths.append(f"{stem}.json")
+    if "parquet" in formats and parquet_engine() is None:
+        log("⚠️ pyarrow/fastparquet 가 설치되어 있지 않아 parquet 저장을 건너뜁니다 (pip install pyarrow).")
+    elif "parquet" in formats:
+        import pandas as pd
+        df = pd.DataFrame(rows)
+        for c in df.columns:
+            # 에러 행 때문에 숫자/문자가 섞인 열은 문자열로 (parquet 은 열마다 한 타입)
+            if df[c].dtype == object and df[c].map(type).nunique() > 1: df[c] = df[c].astype(str)
+        df.to_parquet(f"{stem}.parquet", index=False, engine=parquet_engine())
+        paths.append(f"{stem}.parquet")
+    return paths
+
+def main(argv=None):
+    args = _parse_args(argv)
+    log = (lambda *a: None) if args.quiet else (lambda *a: print(*a, file=sys.stderr))
+    t0 = time.perf_counter()
+    if args.profile:
+        profiler.start_run("cli")
+    end = args.end or datetime.date.today().isoformat()
+    try: start_date, end_date = datetime.date.fromisoformat(args.start), datetime.date.fromisoformat(end)
+    except ValueError as e:
+        log(f"❌ 날짜 형식 오류: {e}"); return EXIT_FAILED
+
+    if args.cache_dir:
+        cache = DiskCache(args.cache_dir, args.cache_ttl)
+        cache.prune(CACHE_MAX_AGE_DAYS * 86400)
+        set_cache_backend(cache)
+
+    presets = load_presets(args.presets, not args.no_builtin, args.sheet, log, args.db)
+    if not presets:
+        log("❌ 평가할 프리셋이 없습니다."); return EXIT_FAILED
+
+    store = PresetStateStore(args.state) if args.state else None
+    log(f"▶ 프리셋 {len(presets)}개 평가 ({start_date} ~ {end_date})")
+    rows = evaluate_presets(presets, start_date, end_date, max_workers=args.workers, store=store,
+                            on_progress=lambda done, total, s_ticker: log(f"  {done}/{total} {s_ticker}"))
+    failed = [r["전략명"] for r in rows if r.get("현재상태") == "데이터오류"]
+
+    meta = {"generated_at": datetime.datetime.now().isoformat(timespec="seconds"), "start": str(start_date), "end": str(end_date),
+            "count": len(rows), "failed": failed, "reuse": store.last_run if store is not None else {}, "cache": cache_stats()}
+    try: paths = write_outputs(rows, meta, args.out, args.format, log)
+    except Exception as e:
+        log(f"❌ 결과 저장 실패: {e}"); return EXIT_FAILED
+
+    for r in rows:
+        if r.get("현재상태") != "데이터오류":
+            log(f"  {r['전략명']:<20} {r['현재상태']:<10} {r['보유여부']}")
+    log(f"✅ 저장: {', '.join(paths)} ({time.perf_counter() - t0:.1f}s, 재사용 {meta['reuse']})")
+    if failed: log(f"⚠️ 데이터 오류 {len(failed)}개: {', '.join(failed)}")
+    for c in meta["cache"]:
+        log(f"  🗄️ {c['캐시']:<22} {c['종류']:<9} 적중 {c['적중']} / 미스 {c['미스']} ({c['적중률(%)']}%) · 항목 {c['항목']} · {c['바이트'] / 1e6:.2f}MB · 제거 {c['제거']}")
+    if args.profile:
+        try:
+            with open(args.profile, "w", encoding="utf-8") as f: f.write(profiler.export_json())
+        except OSError as e: log(f"⚠️ 프로파일 저장 실패: {e}")
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+from dataclasses import dataclass, fields, replace as _dc_replace
+from enum import IntEnum
+import math
+
+# ---------------------------------------------------------------
+# 전략 설정 (검증된 불변 객체, Streamlit 비의존)
+# 프리셋 dict / session_state 값은 여기서 한 번만 변환하고,
+# 엔진/최적화/캐시 키는 이 객체의 속성과 enum 코드만 사용합니다.
+# ---------------------------------------------------------------
+
+class Op(IntEnum):
+    """비교 연산자 (매도는 OFF 가능)"""
+    GT = 0
+    LT = 1
+    OFF = 2
+
+    @property
+    def symbol(self):
+        return (">", "<", "OFF")[self]
+
+    @classmethod
+    def buy(cls, v):
+        # backtest_fast 와 동일: ">" 가 아니면 "<"
+        if isinstance(v, Op): return v
+        return cls.GT if str(v) == ">" else cls.LT
+
+    @classmethod
+    def sell(cls, v):
+        # "OFF" 는 매도 끔, "<" 가 아니면 ">"
+        if isinstance(v, Op): return v
+        s = str(v)
+        return cls.OFF if s == "OFF" else (cls.LT if s == "<" else cls.GT)
+
+class BBMode(IntEnum):
+    """볼린저 기준선 (UI 문구의 '상단선'/'하단선' 포함 여부로 판별)"""
+    MID = 0
+    UPPER = 1
+    LOWER = 2
+
+    @classmethod
+    def parse(cls, v):
+        if isinstance(v, BBMode): return v
+        s = str(v or "")
+        if "상단선" in s: return cls.UPPER
+        if "하단선" in s: return cls.LOWER
+        return cls.MID
+
+# UI 선택지 문구 (to_dict 로 되돌릴 때 사용)
+BB_ENTRY_LABELS = {BBMode.UPPER: "상단선 돌파 (추세)", BBMode.LOWER: "하단선 이탈 (역추세)", BBMode.MID: "중심선 돌파"}
+BB_EXIT_LABELS = {BBMode.MID: "중심선(MA) 이탈", BBMode.UPPER: "상단선 복귀", BBMode.LOWER: "하단선 이탈"}
+
+_INT_KEYS = ("ma_buy", "offset_ma_buy", "ma_sell", "offset_ma_sell", "offset_cl_buy", "offset_cl_sell",
+             "offset_compare_short", "offset_compare_long", "min_hold_days", "rsi_period", "rsi_max",
+             "market_ma_period", "bb_period")
+_OPTIONAL_INT_KEYS = ("ma_compare_short", "ma_compare_long")   # None/"" 은 0 (추세 비교 끔)
+_FLOAT_KEYS = ("stop_loss_pct", "take_profit_pct", "fee_bps", "slip_bps", "bb_std", "atr_multiplier")
+_BOOL_KEYS = ("use_trend_in_buy", "use_trend_in_sell", "use_rsi_filter", "use_market_filter", "use_bollinger", "use_atr_stop")
+_NON_NEGATIVE = ("ma_buy", "ma_sell", "ma_compare_short", "ma_compare_long", "offset_ma_buy", "offset_ma_sell",
+                 "offset_cl_buy", "offset_cl_sell", "offset_compare_short", "offset_compare_long", "min_hold_days")
+
+_PARSERS = {k: int for k in _INT_KEYS}
+_PARSERS.update({k: (lambda v: int(v or 0)) for k in _OPTIONAL_INT_KEYS})
+_PARSERS.update({k: float for k in _FLOAT_KEYS})
+_PARSERS.update({k: bool for k in _BOOL_KEYS})
+_PARSERS.update({"buy_operator": Op.buy, "sell_operator": Op.sell, "strategy_behavior": str,
+                 "bb_entry_type": BBMode.parse, "bb_exit_type": BBMode.parse})
+
+def _parse(key, value):
+    v = _PARSERS[key](value)
+    if key in _NON_NEGATIVE and v < 0: raise ValueError(f"{key} 는 0 이상이어야 합니다: {value}")
+    return v
+
+@dataclass(frozen=True, slots=True)
+class StrategyConfig:
+    """백테스트 한 번에 필요한 전략 파라미터. 불변/해시 가능하므로 캐시 키로 바로 쓸 수 있습니다."""
+    ma_buy: int = 50
+    offset_ma_buy: int = 0
+    ma_sell: int = 10
+    offset_ma_sell: int = 0
+    offset_cl_buy: int = 0
+    offset_cl_sell: int = 0
+    ma_compare_short: int = 0
+    ma_compare_long: int = 0
+    offset_compare_short: int = 0
+    offset_compare_long: int = 0
+    stop_loss_pct: float = 0.0
+    take_profit_pct: float = 0.0
+    strategy_behavior: str = "1"
+    min_hold_days: int = 0
+    fee_bps: float = 25.0
+    slip_bps: float = 1.0
+    use_trend_in_buy: bool = True
+    use_trend_in_sell: bool = False
+    buy_operator: Op = Op.GT
+    sell_operator: Op = Op.LT
+    use_rsi_filter: bool = False
+    rsi_period: int = 14
+    rsi_max: int = 70
+    use_market_filter: bool = False
+    market_ma_period: int = 200
+    use_bollinger: bool = False
+    bb_period: int = 20
+    bb_std: float = 2.0
+    bb_entry_type: BBMode = BBMode.MID
+    bb_exit_type: BBMode = BBMode.MID
+    use_atr_stop: bool = False
+    atr_multiplier: float = 2.0
+
+    @classmethod
+    def from_dict(cls, p):
+        """프리셋 dict / session_state 값을 변환합니다 (모르는 키와 None/NaN 값은 기본값)"""
+        if isinstance(p, StrategyConfig): return p
+        kw = {}
+        for k, v in (p or {}).items():
+            if k in _PARSERS and v is not None and not (isinstance(v, float) and math.isnan(v)):
+                kw[k] = _parse(k, v)
+        return cls(**kw)
+
+    def replace(self, **changes):
+        """일부 값만 바꾼 새 설정 (값은 from_dict 와 같은 규칙으로 변환)"""
+        return _dc_replace(self, **{k: _parse(k, v) for k, v in changes.items()})
+
+    def to_dict(self):
+        """프리셋 저장/화면 표시용 dict (연산자/볼린저 기준은 UI 문구로)"""
+        d = {f.name: getattr(self, f.name) for f in fields(self)}
+        d["buy_operator"], d["sell_operator"] = self.buy_operator.symbol, self.sell_operator.symbol
+        d["bb_entry_type"], d["bb_exit_type"] = BB_ENTRY_LABELS[self.bb_entry_type], BB_EXIT_LABELS[self.bb_exit_type]
+        return d
+
+PARAM_DEFAULTS = StrategyConfig().to_dict()
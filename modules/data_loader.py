@@ -1,13 +1,13 @@
-import streamlit as st
 import pandas as pd
-import FinanceDataReader as fdr
-import yfinance as yf
 import datetime
+from .cache import cached
+from .profiler import profiled, timer
 
 # [핵심] 에러 방지용 빈 껍데기 데이터프레임 정의
 EMPTY_DF = pd.DataFrame(columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
 
-@st.cache_data(show_spinner=False, ttl=600)
+@profiled("get_data")
+@cached(ttl=600)
 def get_data(ticker, start_date, end_date):
     if not ticker:
         return EMPTY_DF
@@ -15,12 +15,14 @@ def get_data(ticker, start_date, end_date):
     ticker = ticker.strip().upper()
     df = pd.DataFrame()
 
-    # 1. FinanceDataReader 시도 (국장/미장 통합)
+    # 1. FinanceDataReader 시도 (국장/미장 통합) — 데이터 소스는 실제로 받을 때만 import
     try:
-        if ticker.isdigit():
-            df = fdr.DataReader(ticker, start_date, end_date)
-        else:
-            df = fdr.DataReader(ticker, start_date, end_date)
+        import FinanceDataReader as fdr
+        with timer("get_data.fdr"):
+            if ticker.isdigit():
+                df = fdr.DataReader(ticker, start_date, end_date)
+            else:
+                df = fdr.DataReader(ticker, start_date, end_date)
             
         if not df.empty:
             df = df.reset_index()
@@ -30,8 +32,10 @@ def get_data(ticker, start_date, end_date):
 
     # 2. 실패 시 yfinance 백업 시도
     try:
+        import yfinance as yf
         yf_code = f"{ticker}.KS" if ticker.isdigit() else ticker
-        df = yf.download(yf_code, start=start_date, end=end_date, progress=False, auto_adjust=True)
+        with timer("get_data.yfinance"):
+            df = yf.download(yf_code, start=start_date, end=end_date, progress=False, auto_adjust=True)
         
         if not df.empty:
             if isinstance(df.columns, pd.MultiIndex):
@@ -90,7 +94,8 @@ def _standardize_df(df):
     except Exception:
         return EMPTY_DF
 
-@st.cache_data(show_spinner=False, ttl=3600)
+@profiled("get_fundamental_info")
+@cached(ttl=3600)
 def get_fundamental_info(ticker):
     default = {
         "Name": ticker, "Symbol": ticker, "Sector": "-", 
@@ -98,6 +103,7 @@ def get_fundamental_info(ticker):
         "NetIncome": 0, "Description": ""
     }
     try:
+        import yfinance as yf
         target = f"{ticker}.KS" if ticker.isdigit() else ticker
         info = yf.Ticker(target).info
         if not info: return default
@@ -0,0 +1,595 @@
+import pandas as pd
+import numpy as np
+import weakref
+from collections import OrderedDict
+from .cache import register_cache, approx_size
+from .config import StrategyConfig, Op, BBMode, PARAM_DEFAULTS
+from .profiler import profiled, count
+
+# ---------------------------------------------------------------
+# 고속 엔진 (numpy 배열 기반, Streamlit 비의존)
+# backtest_fast 와 동일한 규칙을 조건 배열 + 이벤트 점프 방식으로 계산합니다.
+# ---------------------------------------------------------------
+
+IDX0 = 50  # backtest_fast 와 동일한 워밍업 구간
+ATR_WARMUP = 13  # prepare_base 에서 ATR(14) 의 앞 13봉이 dropna 로 잘립니다
+
+# --- 수학 계산 함수들 ---
+@profiled("indicator.ma")
+def _fast_ma(x: np.ndarray, w: int) -> np.ndarray:
+    if w is None or w <= 1: return x.astype(float)
+    kernel = np.ones(w, dtype=float) / w
+    y = np.full(x.shape, np.nan, dtype=float)
+    if len(x) >= w:
+        conv = np.convolve(x, kernel, mode="valid")
+        y[w-1:] = conv
+    return y
+
+@profiled("indicator.bollinger")
+def calculate_bollinger_bands(close_data, period, std_dev_mult):
+    period = int(period)
+    close_series = pd.Series(close_data)
+    ma = close_series.rolling(window=period).mean()
+    std = close_series.rolling(window=period).std()
+    upper = ma + (std * std_dev_mult)
+    lower = ma - (std * std_dev_mult)
+    return ma.to_numpy(), upper.to_numpy(), lower.to_numpy()
+
+@profiled("indicator.rsi")
+def calculate_indicators(close_data, rsi_period):
+    rsi_period = int(rsi_period)
+    df = pd.DataFrame({'close': close_data})
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi.to_numpy()
+
+@profiled("indicator.atr")
+def calculate_atr(df, period=14):
+    high_low = df['High'] - df['Low']
+    high_close = np.abs(df['High'] - df['Close'].shift())
+    low_close = np.abs(df['Low'] - df['Close'].shift())
+    ranges = pd.concat([high_low, high_close, low_close], axis=1)
+    true_range = ranges.max(axis=1)
+    atr = true_range.rolling(window=period).mean()
+    return atr
+
+# --- 파라미터 / 배열 준비 ---
+def normalize_params(p):
+    """프리셋 dict (또는 StrategyConfig) 를 엔진용 StrategyConfig 로 변환 (이미 설정 객체면 그대로)"""
+    return StrategyConfig.from_dict(p)
+
+def required_lookback(p, market_ma_period=200):
+    """마지막 봉의 시그널을 계산하는 데 필요한 최소 봉 수.
+    이평/추세 비교 창 + 오프셋, 볼린저/RSI/시장 이평 창 중 가장 긴 것 (엔진 시작봉 IDX0 이후여야 하므로 최소 IDX0+1)"""
+    q = normalize_params(p)
+    need = [q.ma_buy + q.offset_ma_buy, q.ma_sell + q.offset_ma_sell, q.offset_cl_buy + 1, q.offset_cl_sell + 1]
+    if q.ma_compare_short and q.ma_compare_long:
+        need += [q.ma_compare_short + q.offset_compare_short, q.ma_compare_long + q.offset_compare_long]
+    if q.use_bollinger: need.append(q.bb_period + max(q.offset_cl_buy, q.offset_cl_sell))
+    if q.use_rsi_filter: need.append(q.rsi_period + 2)   # diff 1봉 + 전일 RSI 1봉
+    if q.use_market_filter: need.append(int(market_ma_period or 0))
+    return max(max(need), IDX0 + 1)
+
+def market_arrays(base, x_sig, x_trd, ma_dict, x_mkt=None, ma_mkt_arr=None):
+    """prepare_base 결과를 엔진이 쓰는 배열 묶음으로 변환 (한 번 만들어 재사용)"""
+    n = len(base)
+    return {
+        "n": n, "sig": x_sig, "close": x_trd, "ma": ma_dict,
+        "open": base["Open_trd"].to_numpy(dtype=float),
+        "high": base["High_trd"].to_numpy(dtype=float),
+        "low": base["Low_trd"].to_numpy(dtype=float),
+        "atr": base["ATR"].to_numpy(dtype=float) if "ATR" in base.columns else np.zeros(n),
+        "mkt": x_mkt, "ma_mkt": ma_mkt_arr,
+        "dates": base["Date"].to_numpy(),
+    }
+
+def _lag(arr, off):
+    # backtest_fast 의 arr[i - off] 와 동일 (음수 인덱스는 파이썬처럼 뒤에서부터)
+    n = len(arr)
+    return arr[(np.arange(n) - int(off)) % n] if n else arr
+
+def next_true(mask):
+    # nxt[i] = i 이상에서 처음 True 인 위치 (없으면 n)
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    return np.append(np.minimum.accumulate(idx[::-1])[::-1], n)
+
+# --- 조건 배열 ---
+# 매수/매도 조건이 각각 의존하는 파라미터 (같은 키면 같은 배열 → 캐시/재사용 가능)
+_BB_KEYS = ("use_bollinger", "bb_period", "bb_std")
+_TREND_KEYS = ("ma_compare_short", "ma_compare_long", "offset_compare_short", "offset_compare_long")
+_FILTER_KEYS = ("use_rsi_filter", "rsi_period", "rsi_max", "use_market_filter")
+
+def trend_key(q):
+    return ("trend",) + tuple(getattr(q, k) for k in _TREND_KEYS)
+
+def buy_key(arrs, q):
+    # 매도 쪽 이평 창은 키에 넣지 않음 — 두 이평 배열이 다 있는지만 먼저 확인 (없으면 전부 False 인 같은 배열)
+    if not _has_ma(arrs, q): return ("buy", None)
+    if q.use_bollinger: core = _BB_KEYS + ("bb_entry_type", "offset_cl_buy")
+    else: core = ("use_bollinger", "ma_buy", "offset_ma_buy", "offset_cl_buy", "buy_operator", "use_trend_in_buy") + (_TREND_KEYS if q.use_trend_in_buy else ())
+    return ("buy",) + tuple(getattr(q, k) for k in core + _FILTER_KEYS)
+
+def sell_key(arrs, q):
+    if not _has_ma(arrs, q) or q.sell_operator == Op.OFF: return ("sell", None)
+    if q.use_bollinger: core = _BB_KEYS + ("bb_exit_type", "offset_cl_sell")
+    else: core = ("use_bollinger", "ma_sell", "offset_ma_sell", "offset_cl_sell", "sell_operator", "use_trend_in_sell") + (_TREND_KEYS if q.use_trend_in_sell else ())
+    return ("sell",) + tuple(getattr(q, k) for k in core)
+
+def _has_ma(arrs, q):
+    # backtest_fast 는 ma_buy/ma_sell 배열이 없으면 모든 봉을 건너뜁니다
+    return arrs["n"] > 0 and arrs["ma"].get(q.ma_buy) is not None and arrs["ma"].get(q.ma_sell) is not None
+
+def _trend_ok(arrs, q, cache=None):
+    if cache is not None: return cache.get("trend", trend_key(q), lambda: _trend_ok(arrs, q))
+    ma = arrs["ma"]
+    ma_s_arr = ma.get(q.ma_compare_short) if q.ma_compare_short else None
+    ma_l_arr = ma.get(q.ma_compare_long) if q.ma_compare_long else None
+    if ma_s_arr is None or ma_l_arr is None: return np.ones(arrs["n"], dtype=bool)
+    with np.errstate(invalid="ignore"):
+        return _lag(ma_s_arr, q.offset_compare_short) >= _lag(ma_l_arr, q.offset_compare_long)
+
+def _bands(arrs, q):
+    return calculate_bollinger_bands(arrs["sig"], q.bb_period, q.bb_std)
+
+def _cmp(a, b, op):
+    return (a > b) if op == Op.GT else (a < b)
+
+def _buy_line(arrs, q, bands=None):
+    # 매수 비교선: (lag 적용 종가, 기준선, 연산자(Op), 기준선 이름)
+    cl = _lag(arrs["sig"], q.offset_cl_buy)
+    if q.use_bollinger:
+        bb_mid, bb_up, bb_lo = bands or _bands(arrs, q)
+        if q.bb_entry_type == BBMode.UPPER: return cl, _lag(bb_up, q.offset_cl_buy), Op.GT, "상단"
+        if q.bb_entry_type == BBMode.LOWER: return cl, _lag(bb_lo, q.offset_cl_buy), Op.LT, "하단"
+        return cl, _lag(bb_mid, q.offset_cl_buy), Op.GT, "중심"
+    return cl, _lag(arrs["ma"][q.ma_buy], q.offset_ma_buy), q.buy_operator, "이평"
+
+def _sell_line(arrs, q, bands=None):
+    # 매도 비교선: (lag 적용 종가, 기준선, 연산자(Op), 기준선 이름)
+    cl = _lag(arrs["sig"], q.offset_cl_sell)
+    if q.use_bollinger:
+        bb_mid, bb_up, bb_lo = bands or _bands(arrs, q)
+        if q.bb_exit_type == BBMode.UPPER: return cl, _lag(bb_up, q.offset_cl_sell), Op.LT, "상단"
+        if q.bb_exit_type == BBMode.LOWER: return cl, _lag(bb_lo, q.offset_cl_sell), Op.LT, "하단"
+        return cl, _lag(bb_mid, q.offset_cl_sell), Op.LT, "중심"
+    return cl, _lag(arrs["ma"][q.ma_sell], q.offset_ma_sell), q.sell_operator, "이평"
+
+def _buy_base(arrs, q, cache=None, line=None):
+    # 기술적 매수 조건 (+ 추세 필터, 볼린저는 추세 미적용), RSI/시장 필터 적용 전
+    with np.errstate(invalid="ignore"):
+        buy = _cmp(*(line or _buy_line(arrs, q))[:3])
+        if not q.use_bollinger and q.use_trend_in_buy: buy &= _trend_ok(arrs, q, cache)
+    return buy
+
+def _buy_filters(arrs, q):
+    # (RSI 통과 배열, 시장 필터 통과 배열) — 사용하지 않으면 None
+    rsi_ok, mkt_ok = None, None
+    with np.errstate(invalid="ignore"):
+        if q.use_rsi_filter:
+            rsi_ok = ~(_lag(calculate_indicators(arrs["sig"], q.rsi_period), 1) > q.rsi_max)
+        if q.use_market_filter and arrs["mkt"] is not None and arrs["ma_mkt"] is not None:
+            mkt_ok = ~(arrs["mkt"] < arrs["ma_mkt"])
+    return rsi_ok, mkt_ok
+
+def buy_array(arrs, q, cache=None):
+    """매수 조건 bool 배열 (backtest_fast 의 기술적 조건 + RSI/시장 필터)"""
+    if not _has_ma(arrs, q): return np.zeros(arrs["n"], dtype=bool)
+    buy = _buy_base(arrs, q, cache)
+    for ok in _buy_filters(arrs, q):
+        if ok is not None: buy &= ok
+    return buy
+
+def sell_array(arrs, q, cache=None, line=None):
+    """전략 매도 조건 bool 배열 (매도 OFF 면 전부 False)"""
+    if not _has_ma(arrs, q) or q.sell_operator == Op.OFF: return np.zeros(arrs["n"], dtype=bool)
+    with np.errstate(invalid="ignore"):
+        sell = _cmp(*(line or _sell_line(arrs, q))[:3])
+        if not q.use_bollinger and q.use_trend_in_sell: sell &= ~_trend_ok(arrs, q, cache)
+    return sell
+
+def signal_arrays(arrs, q):
+    """매수/매도 조건을 전 구간 bool 배열로 계산 (backtest_fast 의 1~2단계와 동일)"""
+    return buy_array(arrs, q), sell_array(arrs, q)
+
+# --- 전략 컴파일러 (백테스트 / 오늘 시그널 / 프리셋 요약 공용) ---
+@profiled("engine.compile")
+def compile_strategy(arrs, p, cache=None, detail=False):
+    """프리셋 dict 를 전 구간 매수/매도 조건 배열로 컴파일합니다. 오늘 시그널은 항상 마지막 봉 값입니다.
+    cache(ConditionCache) 를 주면 같은 조건 배열을 재사용하고,
+    detail=True 면 설명용 비교선(buy_line/sell_line), 볼린저 밴드(bands), 필터 전 매수 조건(buy_base), rsi_ok/mkt_ok 도 담습니다."""
+    q = normalize_params(p)
+    if not detail:
+        if cache is not None:
+            buy = cache.get("buy", buy_key(arrs, q), lambda: _with_nxt(buy_array(arrs, q, cache)))[0]
+            sell = cache.get("sell", sell_key(arrs, q), lambda: _with_nxt(sell_array(arrs, q, cache)))[0]
+        else: buy, sell = signal_arrays(arrs, q)
+        return {"q": q, "buy": buy, "sell": sell}
+
+    n, has_ma = arrs["n"], _has_ma(arrs, q)
+    bands = _bands(arrs, q) if q.use_bollinger else None
+    buy_line = _buy_line(arrs, q, bands) if has_ma else None
+    sell_line = _sell_line(arrs, q, bands) if has_ma and q.sell_operator != Op.OFF else None
+    buy_base = _buy_base(arrs, q, line=buy_line) if has_ma else np.zeros(n, dtype=bool)
+    rsi_ok, mkt_ok = _buy_filters(arrs, q)
+    buy = buy_base.copy()
+    if has_ma:
+        for ok in (rsi_ok, mkt_ok):
+            if ok is not None: buy &= ok
+    return {"q": q, "buy": buy, "sell": sell_array(arrs, q, line=sell_line), "buy_base": buy_base, "bands": bands,
+            "buy_line": buy_line, "sell_line": sell_line, "rsi_ok": rsi_ok, "mkt_ok": mkt_ok}
+
+def line_text(line, i):
+    """비교선의 i 봉 값을 '종가(x) > 이평(y)' 형태로"""
+    if line is None: return "OFF"
+    cl, ref, op, name = line
+    return f"종가({cl[i]:.2f}) {op.symbol} {name}({ref[i]:.2f})"
+
+def frame_arrays(df, p):
+    """시그널 계산에 필요한 배열만 DataFrame 에서 만듭니다 (Close_sig 또는 Close, 선택적으로 Close_mkt).
+    prepare_base 결과가 없을 때용 — 시뮬레이션용 OHLC/ATR 은 들어 있지 않습니다."""
+    q = normalize_params(p)
+    x = pd.to_numeric(df["Close_sig"] if "Close_sig" in df.columns else df["Close"], errors="coerce").to_numpy(dtype=float)
+    windows = [q.ma_buy, q.ma_sell, q.ma_compare_short, q.ma_compare_long]
+    x_mkt = df["Close_mkt"].to_numpy(dtype=float) if "Close_mkt" in df.columns else None
+    return {"n": len(x), "sig": x, "ma": {w: _fast_ma(x, w) for w in set(windows) if w > 0},
+            "mkt": x_mkt, "ma_mkt": _fast_ma(x_mkt, q.market_ma_period) if x_mkt is not None else None,
+            "dates": df["Date"].to_numpy()}
+
+# --- 조건 배열 캐시 (계층별 LRU) ---
+def _with_nxt(mask):
+    # 캐시에는 조건 배열과 next_true 목록을 함께 저장합니다
+    return mask, next_true(mask).tolist()
+
+def _release_held(stats, held):
+    stats.removed(held[1], held[0], evicted=False)
+
+class ConditionCache:
+    """추세 → 매수/매도 조건 배열을 각자 의존하는 파라미터 키로 저장하는 LRU 캐시.
+    손절/익절/ATR 처럼 청산 루프에만 쓰이는 값이 달라도 같은 조건 배열을 재사용합니다.
+    하나의 캐시는 하나의 arrs(데이터)에만 사용해야 합니다."""
+    LAYERS = ("trend", "buy", "sell")
+
+    def __init__(self, maxsize=256):
+        self.maxsize = int(maxsize)
+        self._data = {layer: OrderedDict() for layer in self.LAYERS}
+        self.hits = dict.fromkeys(self.LAYERS, 0)
+        self.misses = dict.fromkeys(self.LAYERS, 0)
+        self.evictions = dict.fromkeys(self.LAYERS, 0)
+        # 캐시 레지스트리에는 모든 인스턴스를 합쳐 하나로 (인스턴스가 사라지면 보관 항목/바이트를 뺌)
+        self._stats, self._held = register_cache("engine.conditions"), [0, 0]
+        weakref.finalize(self, _release_held, self._stats, self._held)
+
+    def _hold(self, val, sign):
+        nbytes = approx_size(val)
+        self._held[0] += sign; self._held[1] += sign * nbytes
+        return nbytes
+
+    def get(self, layer, key, fn):
+        d = self._data[layer]
+        if key in d:
+            self.hits[layer] += 1
+            self._stats.hit()
+            d.move_to_end(key)
+            return d[key]
+        self.misses[layer] += 1
+        self._stats.miss()
+        d[key] = val = fn()
+        self._stats.stored(self._hold(val, 1))
+        if len(d) > self.maxsize:
+            self._stats.removed(self._hold(d.popitem(last=False)[1], -1))
+            self.evictions[layer] += 1
+        return val
+
+    def signals(self, arrs, q):
+        """(매수 next_true 목록, 매도 next_true 목록) — simulate_nxt 에 바로 넘길 수 있는 형태"""
+        nb = self.get("buy", buy_key(arrs, q), lambda: _with_nxt(buy_array(arrs, q, self)))[1]
+        ns = self.get("sell", sell_key(arrs, q), lambda: _with_nxt(sell_array(arrs, q, self)))[1]
+        return nb, ns
+
+    def stats(self):
+        out = {}
+        for layer in self.LAYERS:
+            total = self.hits[layer] + self.misses[layer]
+            out[layer] = {"hits": self.hits[layer], "misses": self.misses[layer], "evictions": self.evictions[layer],
+                          "size": len(self._data[layer]), "hit_rate": round(self.hits[layer] / total * 100, 1) if total else 0.0}
+        return out
+
+# --- 상태 머신 (이벤트 점프) ---
+def simulate(arrs, q, buy, sell, start=IDX0, end=None, initial_cash=5000000):
+    """start 봉부터 무포지션으로 시작해 end 직전까지 매매.
+    무포지션 구간은 다음 매수 신호로, 보유 구간은 다음 매도 신호까지만 손절/익절을 확인하며 건너뜁니다.
+    반환: (자산곡선 배열, 이벤트 리스트[(봉, 'BUY'/'SELL', 체결가, 자산, 사유)])"""
+    return simulate_nxt(arrs, q, next_true(buy).tolist(), next_true(sell).tolist(), start, end, initial_cash)
+
+@profiled("engine.loop")
+def simulate_nxt(arrs, q, nxt_buy, nxt_sell, start=IDX0, end=None, initial_cash=5000000, merge_at=None):
+    """simulate 와 같지만 next_true 목록을 받습니다 (같은 조건 배열을 여러 번 돌릴 때 재사용).
+    merge_at(봉별 bool) 을 주면 그 봉에서 무포지션 매수가 일어나는 순간 멈추고
+    (그 직전까지의 자산곡선, 이벤트, 멈춘 봉 또는 None) 을 반환합니다 — 같은 상태의 다른 경로에 합류할 때 사용."""
+    n = arrs["n"]
+    end = n if end is None else min(int(end), n)
+    start = int(start)
+    count("engine.bars", max(end - start, 0))
+    if end <= start: return (np.zeros(0), [], None) if merge_at is not None else (np.zeros(0), [])
+
+    C = arrs["close"]
+    cost = (q.slip_bps + q.fee_bps) / 10000.0
+    sl, tp, min_hold = q.stop_loss_pct, q.take_profit_pct, q.min_hold_days
+    use_atr, atr_mult = q.use_atr_stop, float(q.atr_multiplier)
+    if "_lists" not in arrs:
+        arrs["_lists"] = tuple(arrs[k].tolist() for k in ["open", "high", "low", "close", "atr"])
+    Ol, Hl, Ll, Cl, Al = arrs["_lists"]
+
+    events = []
+    seg_bar, seg_val, seg_hold = [], [], []   # 자산곡선 구간: 시작 봉, 현금 또는 수량, 보유 여부
+    cash, i, merged = float(initial_cash), start, None
+    while i < end:
+        b = nxt_buy[i]
+        if b >= end: break
+        if merge_at is not None and merge_at[b]: merged = b; break
+
+        entry = Cl[b]
+        position = cash / (entry * (1 + cost))
+        events.append((b, "BUY", entry, position * entry, "전략매수"))
+        seg_bar.append(b); seg_val.append(position); seg_hold.append(True)
+        if b + 1 >= end: break
+
+        # 손절가는 진입 다음 봉의 ATR 에 고정됩니다 (backtest_fast 의 i - hold_days)
+        stop = 0.0
+        if use_atr and Al[b + 1] > 0: stop = entry - (Al[b + 1] * atr_mult)
+        elif sl > 0: stop = entry * (1 - sl / 100)
+        tp_price = entry * (1 + tp / 100) if tp > 0 else 0.0
+
+        k_sig = nxt_sell[min(b + 1 + min_hold, n)]
+        last = min(k_sig, end - 1) + 1
+        k = -1
+        # 보유 구간만 스칼라로 훑습니다 (구간 길이 합 <= 전체 봉 수)
+        if stop > 0 and tp > 0:
+            for j in range(b + 1, last):
+                if Ll[j] <= stop or Hl[j] >= tp_price: k = j; break
+        elif stop > 0:
+            for j in range(b + 1, last):
+                if Ll[j] <= stop: k = j; break
+        elif tp > 0:
+            for j in range(b + 1, last):
+                if Hl[j] >= tp_price: k = j; break
+
+        if k >= 0:
+            if stop > 0 and Ll[k] <= stop:
+                px = Ol[k] if Ol[k] < stop else stop
+                reason = "ATR손절" if use_atr else "손절"
+            else:
+                px, reason = (Ol[k] if Ol[k] > tp_price else tp_price), "익절"
+        elif k_sig < end:
+            k, px, reason = k_sig, Cl[k_sig], "전략매도"
+        else: break
+
+        cash = position * (px * (1 - cost))
+        events.append((k, "SELL", px, cash, reason))
+        seg_bar.append(k); seg_val.append(cash); seg_hold.append(False)
+        i = k + 1
+
+    # 구간 정보로 자산곡선을 한 번에 구성 (보유: 수량 x 종가, 무포지션: 현금)
+    if merged is not None: end = merged
+    if not seg_bar: eq = np.full(end - start, float(initial_cash))
+    else:
+        bars = np.arange(start, end)
+        sid = np.searchsorted(np.asarray(seg_bar), bars, side="right") - 1
+        vals = np.append(np.asarray(seg_val, dtype=float), float(initial_cash))
+        hold = np.append(np.asarray(seg_hold, dtype=bool), False)
+        v = vals[sid]
+        eq = np.where(hold[sid], v * C[start:end], v)
+    return (eq, events, merged) if merge_at is not None else (eq, events)
+
+@profiled("metrics")
+def summarize(eq, events, initial_cash=5000000):
+    """backtest_fast 와 같은 키의 요약 지표 (매매가 없으면 빈 dict)"""
+    if not events or len(eq) == 0: return {}
+    g_profit, g_loss, wins, total_sells = 0, 0, 0, 0
+    last_buy_price = None
+    for _, side, px, _, _ in events:
+        if side == "BUY": last_buy_price = px
+        else:
+            total_sells += 1
+            if last_buy_price:
+                pnl = (px - last_buy_price) / last_buy_price
+                if pnl > 0: wins += 1; g_profit += pnl
+                else: g_loss += abs(pnl)
+                last_buy_price = None
+    peak = np.maximum.accumulate(eq)
+    pf = (g_profit / g_loss) if g_loss > 0 else 999.0
+    win_rate = (wins / total_sells * 100) if total_sells > 0 else 0.0
+    return {
+        "수익률 (%)": round((eq[-1] - initial_cash) / initial_cash * 100, 2),
+        "MDD (%)": round(((eq - peak) / peak).min() * 100, 2),
+        "승률 (%)": round(win_rate, 2),
+        "Profit Factor": round(pf, 2),
+        "총 매매 횟수": total_sells,
+    }
+
+# --- 일괄 상태 머신 (여러 설정을 봉 단위로 동시에) ---
+def _exit_levels(px, a_next, use_atr, atr_mult, sl, tp):
+    # 진입가 기준 손절가(ATR 은 진입 다음 봉 값)/익절가, 0 이면 없음
+    stop = np.where(use_atr & (a_next > 0), px - (a_next * atr_mult), np.where(sl > 0, px * (1 - sl / 100), 0.0))
+    return stop, np.where(tp > 0, px * (1 + tp / 100), 0.0)
+
+BATCH_STATE_KEYS = ("cash", "position", "entry", "hold_days", "peak", "mdd", "wins", "sells", "g_profit", "g_loss", "traded", "entry_bar")
+
+@profiled("engine.batch")
+def simulate_batch(arrs, qs, buy_mat, sell_mat, buy_rows, sell_rows, start=IDX0, end=None, initial_cash=5000000, state=None):
+    """설정 G 개를 한 번의 봉 루프로 동시에 시뮬레이션합니다 (상태는 길이 G 벡터).
+    buy_mat/sell_mat 은 서로 다른 조건 배열을 쌓은 (봉 x 종류) 행렬, *_rows 는 설정별 행 번호.
+    자산곡선을 저장하지 않고 MDD/승률/PF 를 누적하므로 메모리는 G 에만 비례합니다.
+    state: 이전 실행의 "상태" (start 봉 직전까지 처리한 결과) 를 넘기면 start 부터 이어서 계산합니다.
+    반환: summarize 와 같은 키의 배열 dict (+ "체결": 매매 발생 여부, "보유중"/"진입봉": 마지막 봉 기준 포지션, "상태")"""
+    n = arrs["n"]
+    end = n if end is None else min(int(end), n)
+    G = len(qs)
+    count("engine.batch_bars", max(end - int(start), 0) * G)
+    O, H, L, C, atr = arrs["open"], arrs["high"], arrs["low"], arrs["close"], arrs["atr"]
+    col = lambda k, dt=float: np.array([getattr(q, k) for q in qs], dtype=dt)
+    cost = np.array([(q.slip_bps + q.fee_bps) / 10000.0 for q in qs])
+    sl, tp, min_hold = col("stop_loss_pct"), col("take_profit_pct"), col("min_hold_days", int)
+    use_atr, atr_mult = col("use_atr_stop", bool), col("atr_multiplier")
+    buy_rows, sell_rows = np.asarray(buy_rows), np.asarray(sell_rows)
+
+    if state is None:
+        cash = np.full(G, float(initial_cash))
+        position, entry, stop, tp_price = np.zeros(G), np.zeros(G), np.zeros(G), np.zeros(G)
+        hold_days = np.zeros(G, dtype=int)
+        peak, mdd = np.full(G, -np.inf), np.zeros(G)   # backtest_fast 처럼 첫 봉 자산이 첫 고점 (진입 비용은 낙폭에 안 넣음)
+        wins, total_sells, g_profit, g_loss = np.zeros(G, dtype=int), np.zeros(G, dtype=int), np.zeros(G), np.zeros(G)
+        traded = np.zeros(G, dtype=bool)
+        entry_bar = np.full(G, -1)
+        total = cash
+    else:
+        cash, position, entry, peak, mdd, g_profit, g_loss = (np.array(state[k], dtype=float) for k in ("cash", "position", "entry", "peak", "mdd", "g_profit", "g_loss"))
+        hold_days, wins, total_sells, entry_bar = (np.array(state[k], dtype=int) for k in ("hold_days", "wins", "sells", "entry_bar"))
+        traded = np.array(state["traded"], dtype=bool)
+        # 손절/익절가는 진입봉에서 다시 계산 (마지막 봉에 진입했던 경우 이제 다음 봉 ATR 이 있음)
+        e = np.clip(entry_bar, 0, n - 1)
+        stop, tp_price = _exit_levels(entry, np.where(e + 1 < n, atr[np.minimum(e + 1, n - 1)], np.nan), use_atr, atr_mult, sl, tp)
+        total = cash + position * C[int(start) - 1]
+    zeros = np.zeros(G)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for i in range(int(start), end):
+            holding = position > 0
+            if holding.any():
+                s_hit = holding & (stop > 0) & (L[i] <= stop)
+                t_hit = holding & ~s_hit & (tp > 0) & (H[i] >= tp_price)
+                sig = holding & ~s_hit & ~t_hit & sell_mat[i][sell_rows] & (hold_days >= min_hold)
+                sold = s_hit | t_hit | sig
+                if sold.any():
+                    px = np.where(s_hit, np.where(O[i] < stop, O[i], stop), np.where(t_hit, np.where(O[i] > tp_price, O[i], tp_price), C[i]))
+                    cash = np.where(sold, position * (px * (1 - cost)), cash)
+                    pnl = (px - entry) / entry
+                    win = sold & (pnl > 0)
+                    wins += win; total_sells += sold
+                    g_profit += np.where(win, pnl, zeros); g_loss += np.where(sold & ~win, np.abs(pnl), zeros)
+                    position = np.where(sold, 0.0, position)
+                    traded |= sold
+            bought = ~holding & buy_mat[i][buy_rows]
+            if bought.any():
+                position = np.where(bought, cash / (C[i] * (1 + cost)), position)
+                cash = np.where(bought, 0.0, cash)
+                entry = np.where(bought, C[i], entry)
+                new_stop, new_tp = _exit_levels(C[i], atr[i + 1] if i + 1 < n else np.nan, use_atr, atr_mult, sl, tp)
+                stop, tp_price = np.where(bought, new_stop, stop), np.where(bought, new_tp, tp_price)
+                entry_bar = np.where(bought, i, entry_bar)
+                traded |= bought
+            hold_days = np.where((position > 0) & ~bought, hold_days + 1, 0)
+            total = cash + position * C[i]
+            peak = np.maximum(peak, total)
+            mdd = np.minimum(mdd, (total - peak) / peak)
+
+    pf = np.where(g_loss > 0, g_profit / np.where(g_loss > 0, g_loss, 1), 999.0)
+    win_rate = np.where(total_sells > 0, wins / np.maximum(total_sells, 1) * 100, 0.0)
+    return {"수익률 (%)": (total - initial_cash) / initial_cash * 100,
+            "MDD (%)": mdd * 100, "승률 (%)": win_rate, "Profit Factor": pf, "총 매매 횟수": total_sells, "체결": traded,
+            "보유중": position > 0, "진입봉": np.where(position > 0, entry_bar, -1),
+            "상태": dict(zip(BATCH_STATE_KEYS, (cash, position, entry, hold_days, peak, mdd, wins, total_sells, g_profit, g_loss, traded, entry_bar)))}
+
+def _stack_conditions(arrs, qs, layer, key_fn, arr_fn, cache=None):
+    # 서로 다른 조건 배열만 만들어 (봉 x 종류) 행렬로 쌓고, 설정별 행 번호를 돌려줍니다
+    keys, rows, cols = {}, [], []
+    for q in qs:
+        k = key_fn(arrs, q)
+        if k not in keys:
+            keys[k] = len(cols)
+            if cache is None: cols.append(arr_fn(arrs, q))
+            else: cols.append(cache.get(layer, k, lambda: _with_nxt(arr_fn(arrs, q, cache)))[0])
+        rows.append(keys[k])
+    mat = np.stack(cols, axis=1) if cols else np.zeros((arrs["n"], 0), dtype=bool)
+    return mat, rows
+
+def evaluate_many(arrs, params_list, start=IDX0, end=None, initial_cash=5000000, cache=None, states=None, return_states=False):
+    """프리셋 dict 여러 개를 한 번에 평가해 summarize 형식 dict 리스트를 반환 (매매 없으면 {})
+    각 dict 에는 마지막 봉 기준 "보유중"/"진입봉" 도 들어 있습니다.
+    states: 설정별 batch_states 결과 (start 봉부터 이어서 계산), return_states=True 면 (결과, 상태 리스트) 반환"""
+    qs = [normalize_params(p) for p in params_list]
+    if not qs: return ([], []) if return_states else []
+    buy_mat, buy_rows = _stack_conditions(arrs, qs, "buy", buy_key, buy_array, cache)
+    sell_mat, sell_rows = _stack_conditions(arrs, qs, "sell", sell_key, sell_array, cache)
+    state = {k: [st[k] for st in states] for k in BATCH_STATE_KEYS} if states is not None else None
+    out = simulate_batch(arrs, qs, buy_mat, sell_mat, buy_rows, sell_rows, start, end, initial_cash, state)
+    res = _batch_results(out, len(qs))
+    return (res, batch_states(out, len(qs))) if return_states else res
+
+def batch_states(out, G):
+    # simulate_batch 의 "상태" 를 설정별 JSON 저장 가능한 dict 로 (evaluate_many(states=...) 로 이어서 계산)
+    st = out["상태"]
+    return [{k: st[k][g].item() for k in BATCH_STATE_KEYS} for g in range(G)]
+
+def _batch_results(out, G):
+    # simulate_batch 의 배열 결과를 summarize 형식 dict 리스트로 (매매 없으면 {})
+    keys = ["수익률 (%)", "MDD (%)", "승률 (%)", "Profit Factor"]
+    return [({k: round(float(out[k][g]), 2) for k in keys} | {"총 매매 횟수": int(out["총 매매 횟수"][g]),
+             "보유중": bool(out["보유중"][g]), "진입봉": int(out["진입봉"][g])}) if out["체결"][g] else {}
+            for g in range(G)]
+
+# --- 여러 시작일(구간) 동시 평가 ---
+def horizon_starts(dates, start_dates, warmup=ATR_WARMUP):
+    """각 시작일로 prepare_base 를 다시 불렀을 때 base 의 첫 봉이 되는 위치.
+    가장 이른 시작일과, 데이터가 구간 안에서 시작하는 경우(상장이 시작일보다 늦은 종목)는 0 을 돌려줍니다."""
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    ts = [np.datetime64(pd.Timestamp(d), "ns") for d in start_dates]
+    first = min(ts)
+    if not len(dates): return [0 for _ in ts]
+    return [0 if t <= first or t <= dates[0] else min(int(np.searchsorted(dates, t)) + warmup, len(dates)) for t in ts]
+
+def _rewarm(a, s):
+    # s 봉부터 새로 계산한 것처럼 앞쪽 워밍업(선행 NaN 개수만큼)을 다시 비웁니다
+    if a is None: return None
+    lead = int(np.argmax(~np.isnan(a))) if (~np.isnan(a)).any() else len(a)
+    b = a[s:].copy()
+    b[:lead] = np.nan
+    return b
+
+def window_arrays(arrs, s):
+    """s 봉부터 로드한 것과 같은 배열 묶음 (이평선/시장 이평선은 창 안에서 다시 워밍업, RSI/볼린저는 잘린 종가로 계산)"""
+    if s <= 0: return arrs
+    cut = lambda a: None if a is None else a[s:]
+    return dict(arrs, n=max(arrs["n"] - s, 0), sig=cut(arrs["sig"]), close=cut(arrs["close"]),
+                open=cut(arrs["open"]), high=cut(arrs["high"]), low=cut(arrs["low"]), atr=cut(arrs["atr"]),
+                mkt=cut(arrs["mkt"]), ma_mkt=_rewarm(arrs["ma_mkt"], s), dates=cut(arrs["dates"]),
+                ma={w: _rewarm(a, s) for w, a in arrs["ma"].items()})
+
+def evaluate_horizons(arrs, params_list, start_dates, initial_cash=5000000):
+    """한 번 로드한 배열로 여러 시작일을 동시에 평가합니다 (시작일마다 지표 워밍업/포지션 초기화).
+    조건 배열만 구간별로 만들고, 상태 머신은 (구간 x 설정) 을 한 배치로 가장 긴 구간 한 번만 돌립니다.
+    반환: (결과[구간][설정] — evaluate_many 형식, 구간별 첫 봉 위치)"""
+    qs = [normalize_params(p) for p in params_list]
+    starts = horizon_starts(arrs["dates"], start_dates)
+    n, G = arrs["n"], len(qs)
+    if not qs or n == 0: return [[{} for _ in qs] for _ in starts], starts
+
+    uniq = sorted(set(starts))
+    buy_cols, sell_cols, buy_rows, sell_rows = [], [], [], []
+    for s in uniq:
+        w = window_arrays(arrs, s)
+        for layer, key_fn, arr_fn, cols, rows in [("buy", buy_key, buy_array, buy_cols, buy_rows),
+                                                  ("sell", sell_key, sell_array, sell_cols, sell_rows)]:
+            mat, r = _stack_conditions(w, qs, layer, key_fn, arr_fn)
+            full = np.zeros((n, mat.shape[1]), dtype=bool)
+            full[s:] = mat
+            if layer == "buy": full[:s + IDX0] = False  # 구간 시작 전에는 진입하지 않음 (무포지션 유지)
+            offset = sum(c.shape[1] for c in cols)
+            rows.extend(offset + k for k in r)
+            cols.append(full)
+
+    out = simulate_batch(arrs, qs * len(uniq), np.concatenate(buy_cols, axis=1), np.concatenate(sell_cols, axis=1),
+                         buy_rows, sell_rows, IDX0, None, initial_cash)
+    res = _batch_results(out, len(qs) * len(uniq))
+    return [res[uniq.index(s) * G:(uniq.index(s) + 1) * G] for s in starts], starts
+
+def run_fast(arrs, p, start=IDX0, end=None, initial_cash=5000000):
+    """프리셋 dict 한 개를 고속 엔진으로 실행해 요약 지표를 반환"""
+    q = normalize_params(p)
+    buy, sell = signal_arrays(arrs, q)
+    eq, events = simulate(arrs, q, buy, sell, start, end, initial_cash)
+    return summarize(eq, events, initial_cash)
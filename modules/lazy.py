@@ -0,0 +1,30 @@
+import importlib
+
+# ---------------------------------------------------------------
+# 지연 import: 무거운 선택 의존성(plotly 등)을 모듈 상단에 그대로 두되,
+# 실제 속성/함수를 처음 쓸 때 import 합니다. 한 번 불러오면 sys.modules 를 재사용합니다.
+# ---------------------------------------------------------------
+
+class _LazyModule:
+    __slots__ = ("_name", "_mod")
+
+    def __init__(self, name):
+        self._name, self._mod = name, None
+
+    def __getattr__(self, attr):
+        if self._mod is None: self._mod = importlib.import_module(self._name)
+        return getattr(self._mod, attr)
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}' ({'loaded' if self._mod is not None else 'not loaded'})>"
+
+def lazy_module(name):
+    """import name 을 첫 속성 접근 때까지 미룹니다 (go = lazy_module("plotly.graph_objects"))"""
+    return _LazyModule(name)
+
+def lazy_attr(module, attr):
+    """from module import attr 함수를 첫 호출 때까지 미룹니다"""
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module), attr)(*args, **kwargs)
+    call.__name__ = call.__qualname__ = attr
+    return call
@@ -1,10 +1,20 @@
-import google.generativeai as genai
 import streamlit as st
 
+def _genai(api_key):
+    # Gemini SDK 는 import 만 1초 가까이 걸려 실제로 쓸 때 처음 불러옵니다 (이후는 sys.modules 재사용)
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai
+
+def list_gemini_models(api_key):
+    """generateContent 를 지원하는 모델 이름 목록"""
+    genai = _genai(api_key)
+    return [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+
 def ask_gemini_analysis(summary, params, ticker, api_key, model_name):
     if not api_key: return "⚠️ API Key를 입력해주세요."
     try:
-        genai.configure(api_key=api_key)
+        genai = _genai(api_key)
         m_name = model_name if model_name else "gemini-1.5-flash"
         model = genai.GenerativeModel(m_name)
         
@@ -35,7 +45,7 @@ def ask_gemini_analysis(summary, params, ticker, api_key, model_name):
 def ask_gemini_chat(question, res, params, ticker, api_key, model_name):
     if not api_key: return "⚠️ API Key를 입력해주세요."
     try:
-        genai.configure(api_key=api_key)
+        genai = _genai(api_key)
         model = genai.GenerativeModel(model_name if model_name else "gemini-1.5-flash")
         context = f"""
         당신은 월스트리트의 상위 1% 퀀트 전문가입니다. 다음 전략 데이터를 바탕으로 사용자의 질문에 답하세요.
@@ -53,7 +63,7 @@ def ask_gemini_chat(question, res, params, ticker, api_key, model_name):
 def ask_gemini_comprehensive_analysis(summary, fundamental, params, ticker, api_key, model_name):
     if not api_key: return "⚠️ API Key를 입력해주세요."
     try:
-        genai.configure(api_key=api_key)
+        genai = _genai(api_key)
         model = genai.GenerativeModel(model_name if model_name else "gemini-1.5-flash")
         mkt_cap = f"{fundamental['MarketCap'] / 100000000:.2f}억" if fundamental['MarketCap'] else "N/A"
         
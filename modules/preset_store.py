@@ -0,0 +1,52 @@
+import json
+import os
+import threading
+
+# ---------------------------------------------------------------
+# 프리셋별 마지막 평가 상태 저장소 (Streamlit 비의존, JSON 파일)
+# 레코드: 파라미터 키, 데이터 지문(마지막 봉까지), 화면 행, 엔진 상태
+# 프리셋 탭은 키/지문이 같으면 저장된 행을 그대로, 봉만 늘었으면 새 봉만 계산합니다.
+# ---------------------------------------------------------------
+
+STORE_VERSION = 2   # 레코드/행 형식이 바뀌면 올림 (이전 파일은 무시하고 새로 계산)
+
+class PresetStateStore:
+    def __init__(self, path="preset_state.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._records = None
+        self._dirty = False
+        self.last_run = {}   # 마지막 evaluate_presets 의 재사용/이어서/전체 계산 개수
+
+    def _load(self):
+        if self._records is not None: return self._records
+        self._records = {}
+        try:
+            with open(self.path, encoding="utf-8") as f: data = json.load(f)
+            if data.get("version") == STORE_VERSION: self._records = data.get("presets", {})
+        except (OSError, ValueError, AttributeError): pass
+        return self._records
+
+    def get(self, name):
+        with self._lock: return self._load().get(name)
+
+    def put(self, name, record):
+        with self._lock:
+            self._load()[name] = record
+            self._dirty = True
+
+    def save(self):
+        # 임시 파일에 쓰고 교체 (중간에 끊겨도 기존 파일은 온전)
+        with self._lock:
+            if not self._dirty: return
+            tmp = f"{self.path}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"version": STORE_VERSION, "presets": self._records}, f, ensure_ascii=False)
+                os.replace(tmp, self.path)
+                self._dirty = False
+            except OSError: pass
+
+    def clear(self):
+        with self._lock:
+            self._records, self._dirty = {}, True
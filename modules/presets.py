@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+import time
+from .cache import register_cache, approx_size
+
+# ---------------------------------------------------------------
+# 프리셋 목록 (Streamlit 비의존: 앱과 CLI 배치가 같이 씀)
+# 기본 프리셋 + JSON 파일(my_strategies.json 형식) + 구글 시트(Name/Params 열)
+# ---------------------------------------------------------------
+
+# [복구 완료] 사용자님의 원본 프리셋 데이터 전체
+DEFAULT_PRESETS = {
+    "GGLL": {"signal_ticker": "GGLL", "trade_ticker": "GGLL", "offset_cl_buy": 10, "buy_operator": ">", "offset_ma_buy": 50, "ma_buy": 5, "offset_cl_sell": 10, "sell_operator": "<", "offset_ma_sell": 20, "ma_sell": 20, "use_trend_in_buy": True, "use_trend_in_sell": True, "offset_compare_short": 10, "ma_compare_short": 20, "offset_compare_long": 50, "ma_compare_long": 10, "stop_loss_pct": 20.0, "take_profit_pct": 20.0},
+    "TQQQ": {"signal_ticker": "TQQQ", "trade_ticker": "TQQQ", "offset_cl_buy": 50, "buy_operator": ">", "offset_ma_buy": 10, "ma_buy": 1, "offset_cl_sell": 50, "sell_operator": ">", "offset_ma_sell": 1, "ma_sell": 1, "use_trend_in_buy": True, "use_trend_in_sell": True, "offset_compare_short": 1, "ma_compare_short": 50, "offset_compare_long": 10, "ma_compare_long": 1, "stop_loss_pct": 15.0, "take_profit_pct": 25.0},
+    "BITX-TQQQ": {"signal_ticker": "BITX", "trade_ticker": "TQQQ", "offset_cl_buy": 10, "buy_operator": ">", "offset_ma_buy": 10, "ma_buy": 20, "offset_cl_sell": 50, "sell_operator": ">", "offset_ma_sell": 1, "ma_sell": 5, "use_trend_in_buy": False, "use_trend_in_sell": True, "offset_compare_short": 50, "ma_compare_short": 5, "offset_compare_long": 1, "ma_compare_long": 50, "stop_loss_pct": 0.0, "take_profit_pct": 15.0},
+}
+
+SHEET_SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+
+def load_preset_file(path):
+    """{전략명: 파라미터} JSON 파일 (없거나 형식이 다르면 빈 dict)"""
+    try:
+        with open(path, encoding="utf-8") as f: data = json.load(f)
+    except (OSError, ValueError): return {}
+    return {str(k): v for k, v in data.items() if isinstance(v, dict)} if isinstance(data, dict) else {}
+
+def parse_sheet_records(records):
+    # 시트 행(Name, Params JSON) → {전략명: 파라미터}, 깨진 행은 건너뜀
+    strategies = {}
+    for row in records:
+        if not row: continue
+        name, params_str = row.get("Name"), row.get("Params")
+        if name and params_str:
+            try: strategies[name] = json.loads(params_str)
+            except ValueError: continue
+    return strategies
+
+def open_sheet(key_dict, url):
+    """서비스 계정 키(dict)로 시트 첫 장을 엽니다 (gspread 는 여기서만 import)"""
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+    key_dict = dict(key_dict)
+    if "private_key" in key_dict: key_dict["private_key"] = key_dict["private_key"].replace("\\n", "\n")
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(key_dict, SHEET_SCOPE)
+    return gspread.authorize(creds).open_by_url(url).sheet1
+
+def load_sheet_presets_from_env(key_var="GCP_KEY", url_var="SHEET_URL"):
+    """환경변수(앱의 Secrets 와 같은 이름)로 시트 전략을 읽습니다. 설정이 없으면 None"""
+    key, url = os.environ.get(key_var), os.environ.get(url_var)
+    if not key or not url: return None
+    return parse_sheet_records(open_sheet(json.loads(key), url).get_all_records())
+
+class PresetRepository:
+    """저장 전략 목록 캐시 (재실행마다 시트를 다시 읽지 않도록).
+    loader() → {전략명: 파라미터} 결과를 ttl 초 동안 재사용하고, 만료되면 이전 목록을 바로 돌려주면서
+    백그라운드에서 다시 읽습니다 (시트가 느려도 화면은 기다리지 않음). 처음 한 번만 동기로 읽습니다.
+    저장/삭제는 put/remove 로 즉시 반영되고 다음 조회 때 원본과 다시 맞춥니다.
+    version: 목록 내용이 바뀔 때마다 1씩 증가 (목록으로 만든 결과를 다시 쓸지 판단용)"""
+    def __init__(self, loader, ttl=300):
+        self.loader, self.ttl = loader, ttl
+        self._lock = threading.Lock()
+        self._data, self._loaded_at, self._refreshing = None, None, False
+        self.version, self.last_error = 0, None
+        self.stats = register_cache("saved_strategies")
+
+    def _fresh(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def _set(self, data):
+        if data != self._data:
+            self._data, self.version = data, self.version + 1
+            self.stats.set_size(len(data), approx_size(data))
+
+    def _load(self):
+        try: data, error = self.loader(), None
+        except Exception as e: data, error = None, e
+        with self._lock:
+            # 실패하면 이전 목록 유지 (처음이면 빈 목록), ttl 뒤 다시 시도
+            self._set(data if error is None else (self._data if self._data is not None else {}))
+            self._loaded_at, self._refreshing, self.last_error = time.monotonic(), False, error
+
+    def get(self):
+        with self._lock:
+            if self._data is not None and (self._fresh() or self._refreshing):
+                self.stats.hit()
+                return dict(self._data)
+            self.stats.miss()
+            background, self._refreshing = self._data is not None, True
+        if background: threading.Thread(target=self._load, daemon=True).start()
+        else: self._load()
+        with self._lock: return dict(self._data)
+
+    def invalidate(self):
+        """다음 get 에서 원본을 다시 읽게 함"""
+        with self._lock: self._loaded_at = None
+
+    def put(self, name, params):
+        with self._lock:
+            self._set({**(self._data or {}), name: params})
+            self._loaded_at = None
+
+    def remove(self, name):
+        with self._lock:
+            if self._data and name in self._data: self._set({k: v for k, v in self._data.items() if k != name})
+            self._loaded_at = None
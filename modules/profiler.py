@@ -0,0 +1,109 @@
+import contextvars
+import json
+import threading
+import time
+from functools import wraps
+
+# ---------------------------------------------------------------
+# 구간별 시간 측정 (Streamlit 비의존)
+#   with timer("prepare_base.merge"): ...      # 코드 블록
+#   @profiled("indicator.ma")                   # 함수 전체
+#   count("engine.bars", n)                     # 개수
+# 한 실행(앱 재실행 1회, CLI 1회) 단위로 start_run 이 집계 객체를 만들어 현재 컨텍스트(contextvars)에 걸고,
+# report/export_json 으로 봅니다. 세션마다 스크립트 스레드가 따로라 다른 세션의 켜기/끄기·집계와 섞이지 않습니다.
+# 꺼져 있으면(집계 객체 없음) timer 는 공용 빈 객체, profiled 는 컨텍스트 확인 한 번뿐이라 비용이 거의 없습니다.
+# 스레드 풀에서 같은 실행으로 모으려면 contextvars.copy_context().run 으로 넘겨야 합니다 (기본은 안 따라감).
+# ---------------------------------------------------------------
+
+class _Run:
+    __slots__ = ("label", "started", "stages", "counters", "lock")
+
+    def __init__(self, label):
+        self.label, self.started = label, time.perf_counter()
+        self.stages = {}     # 구간 → [호출 수, 합계 초, 최대 초]
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, dt):
+        with self.lock:
+            s = self.stages.get(name)
+            if s is None: self.stages[name] = [1, dt, dt]
+            else:
+                s[0] += 1; s[1] += dt
+                if dt > s[2]: s[2] = dt
+
+_current = contextvars.ContextVar("profiler_run", default=None)
+
+class _Timer:
+    __slots__ = ("run", "name", "t0")
+
+    def __init__(self, run, name):
+        self.run, self.name = run, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.run.record(self.name, time.perf_counter() - self.t0)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL = _NullTimer()
+
+def timer(name):
+    """with timer(구간): 블록 시간을 구간에 더함 (꺼져 있으면 아무것도 안 함)"""
+    run = _current.get()
+    return _NULL if run is None else _Timer(run, name)
+
+def profiled(name):
+    """함수 호출 시간을 구간에 더하는 데코레이터"""
+    def deco(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            run = _current.get()
+            if run is None: return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try: return fn(*args, **kwargs)
+            finally: run.record(name, time.perf_counter() - t0)
+        return inner
+    return deco
+
+def add(name, seconds):
+    """직접 잰 시간을 구간에 더함 (긴 루프를 with 로 감싸기 어려울 때)"""
+    run = _current.get()
+    if run is not None: run.record(name, seconds)
+
+def count(name, n=1):
+    run = _current.get()
+    if run is None: return
+    with run.lock: run.counters[name] = run.counters.get(name, 0) + n
+
+def enabled():
+    return _current.get() is not None
+
+def start_run(label=None, on=True):
+    """현재 컨텍스트에서 새 실행을 시작 (on=False 면 이번 실행은 측정 안 함). 집계 객체(꺼져 있으면 None) 반환"""
+    run = _Run(label) if on else None
+    _current.set(run)
+    return run
+
+def report(run=None):
+    """{실행, 경과(ms), 구간: [{구간, 호출, 합계(ms), 평균(ms), 최대(ms)}] (합계 큰 순), 카운터}
+    run 을 안 주면 현재 컨텍스트의 실행 (없으면 None).
+    구간은 겹칠 수 있습니다 (prepare_base 안의 get_data 처럼 바깥 구간이 안쪽 시간을 포함)."""
+    run = run if run is not None else _current.get()
+    if run is None: return None
+    with run.lock:
+        stages = [{"구간": k, "호출": c, "합계(ms)": round(t * 1000, 2), "평균(ms)": round(t * 1000 / c, 3), "최대(ms)": round(m * 1000, 2)}
+                  for k, (c, t, m) in run.stages.items()]
+        counters = dict(run.counters)
+    stages.sort(key=lambda r: -r["합계(ms)"])
+    return {"실행": run.label, "경과(ms)": round((time.perf_counter() - run.started) * 1000, 1), "구간": stages, "카운터": counters}
+
+def export_json(rep=None):
+    return json.dumps(rep if rep is not None else report(), ensure_ascii=False, indent=1, default=str)
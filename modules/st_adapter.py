@@ -0,0 +1,94 @@
+import threading
+import time
+from functools import wraps
+import streamlit as st
+from .cache import set_cache_backend, get_cache_backend, register_cache, approx_size, _freeze
+from .strategy import signal_today, opt_row_params
+
+# ---------------------------------------------------------------
+# Streamlit 어댑터: 코어(engine/strategy/data_loader)는 화면을 모르고,
+# 캐시 백엔드 연결과 st.* 출력/세션 상태 반영은 여기서만 합니다.
+# ---------------------------------------------------------------
+
+class StreamlitCache:
+    """코어의 @cached 함수를 st.cache_data 로 감싸는 백엔드 (세션 간 공유, 결과 복사).
+    st.cache_data 는 통계를 주지 않으므로, 함수 본문이 실제로 실행되면 미스, 아니면 적중으로 세고
+    보관 항목은 ttl 로 만료를 추정합니다 (max_entries 를 쓰지 않으므로 제거는 만료뿐)."""
+    def wrap(self, fn, ttl=None):
+        stats = register_cache(fn.__qualname__, "streamlit")
+        live, lock, local = {}, threading.Lock(), threading.local()   # live: 키 → (저장 시각, 바이트)
+
+        def expire(now):
+            if ttl is None: return
+            for key in [k for k, (t, _) in live.items() if now - t >= ttl]: stats.removed(live.pop(key)[1])
+
+        @wraps(fn)   # st.cache_data 는 __wrapped__ 의 소스로 함수를 구분하므로 원래 함수별로 따로 캐시됩니다
+        def compute(*args, **kwargs):
+            local.missed = True
+            stats.miss()
+            value = fn(*args, **kwargs)
+            nbytes, now = approx_size(value), time.monotonic()
+            with lock:
+                expire(now)
+                old = live.pop((_freeze(args), _freeze(kwargs)), None)
+                if old is not None: stats.removed(old[1])
+                live[(_freeze(args), _freeze(kwargs))] = (now, nbytes)
+                stats.stored(nbytes)
+            return value
+
+        cached_fn = st.cache_data(show_spinner=False, ttl=ttl)(compute)
+
+        @wraps(fn)
+        def call(*args, **kwargs):
+            local.missed = False
+            value = cached_fn(*args, **kwargs)
+            if not local.missed: stats.hit()
+            return value
+
+        def clear():
+            cached_fn.clear()
+            with lock:
+                live.clear(); stats.set_size(0, 0)
+        call.clear = clear
+        return call
+
+def use_streamlit_cache():
+    # 재실행(rerun)마다 불려도 한 번만 교체 (이미 감싼 함수를 다시 감싸지 않도록)
+    if not isinstance(get_cache_backend(), StreamlitCache): set_cache_backend(StreamlitCache())
+
+def check_signal_today(df, p, arrs=None):
+    """오늘(마지막 봉) 매수/매도 시그널을 화면에 표시합니다 (판정은 strategy.signal_today)."""
+    res = signal_today(df, p, arrs)
+    last_date = res.get("date")
+    if last_date is not None:
+        # 날짜 안내 메시지 (오늘 날짜와 다르면 알려줌)
+        if res["stale"]:
+            st.info(f"💡 장 시작 전입니다. **{last_date.strftime('%Y-%m-%d')} (전일 종가)** 기준으로 분석합니다.")
+        else:
+            st.caption(f"📅 기준일: **{last_date.strftime('%Y-%m-%d')}** (최신)")
+    if res.get("error"): st.error(res["error"]); return
+
+    buy_ok, sell_ok, final_buy = res["buy_ok"], res["sell_ok"], res["final_buy"]
+    st.subheader(f"📌 시그널 ({last_date.strftime('%Y-%m-%d')})")
+    st.write(f"💡 매수({res['buy_mode']}): {res['buy_text']} → {'✅' if buy_ok else '❌'}")
+    if buy_ok and not res["market_ok"]: st.warning("⚠️ 시장 필터 미충족")
+    if buy_ok and not res["rsi_ok"]: st.warning("⚠️ RSI 과열 필터 미충족")
+    st.write(f"💡 매도: {res['sell_text']} → {'✅' if sell_ok else '❌'}")
+
+    # [수정] 매수/매도 동시 발생 시 명확하게 표시
+    if final_buy and sell_ok:
+        st.warning("⚠️ 매수/매도 신호 중복 (전략 점검 필요)")
+    elif final_buy:
+        st.success("🚀 매수 진입 (종가)")
+    elif sell_ok:
+        st.error("💧 매도 청산 (종가)")
+    else:
+        st.info("⏸ 관망")
+
+def apply_opt_params(row):
+    """최적화 결과 행을 사이드바 설정에 반영 (버튼 on_click 콜백)"""
+    try:
+        updates = {**opt_row_params(row), "auto_run_trigger": True, "preset_name_selector": "직접 설정"}
+        for k, v in updates.items(): st.session_state[k] = v
+        st.toast("✅ 설정이 적용되었습니다! 백테스트 탭을 확인하세요.")
+    except Exception as e: st.error(f"설정 적용 오류: {e}")
@@ -1,49 +1,23 @@
 import pandas as pd
 import numpy as np
-import streamlit as st
 import random
+import json
+import datetime
+import time
+import contextvars
+from .cache import cached
+from . import profiler
+from .profiler import profiled, timer
 from .data_loader import get_data
-
-# --- 수학 계산 함수들 ---
-def _fast_ma(x: np.ndarray, w: int) -> np.ndarray:
-    if w is None or w <= 1: return x.astype(float)
-    kernel = np.ones(w, dtype=float) / w
-    y = np.full(x.shape, np.nan, dtype=float)
-    if len(x) >= w:
-        conv = np.convolve(x, kernel, mode="valid")
-        y[w-1:] = conv
-    return y
-
-def calculate_bollinger_bands(close_data, period, std_dev_mult):
-    period = int(period)
-    close_series = pd.Series(close_data)
-    ma = close_series.rolling(window=period).mean()
-    std = close_series.rolling(window=period).std()
-    upper = ma + (std * std_dev_mult)
-    lower = ma - (std * std_dev_mult)
-    return ma.to_numpy(), upper.to_numpy(), lower.to_numpy()
-
-def calculate_indicators(close_data, rsi_period):
-    rsi_period = int(rsi_period)
-    df = pd.DataFrame({'close': close_data})
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=rsi_period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=rsi_period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi.to_numpy()
-
-def calculate_atr(df, period=14):
-    high_low = df['High'] - df['Low']
-    high_close = np.abs(df['High'] - df['Close'].shift())
-    low_close = np.abs(df['Low'] - df['Close'].shift())
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = ranges.max(axis=1)
-    atr = true_range.rolling(window=period).mean()
-    return atr
+from .engine import _fast_ma, calculate_atr
+from .config import StrategyConfig, BB_ENTRY_LABELS
+from .engine import compile_strategy, line_text, frame_arrays
+from .engine import IDX0, required_lookback, market_arrays, normalize_params, simulate_nxt, summarize, ConditionCache, evaluate_many, evaluate_horizons
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # --- 데이터 준비 ---
-@st.cache_data(show_spinner=False, ttl=1800)
+@profiled("prepare_base")
+@cached(ttl=1800)
 def prepare_base(signal_ticker, trade_ticker, market_ticker, start_date, end_date, ma_pool, market_ma_period=200):
     sig = get_data(signal_ticker, start_date, end_date).sort_values("Date")
     trd = get_data(trade_ticker,  start_date, end_date).sort_values("Date")
@@ -56,14 +30,14 @@ def prepare_base(signal_ticker, trade_ticker, market_ticker, start_date, end_dat
     sig = sig.rename(columns={"Close": "Close_sig", "Open":"Open_sig", "High":"High_sig", "Low":"Low_sig"})[["Date", "Close_sig", "Open_sig", "High_sig", "Low_sig"]]
     trd = trd.rename(columns={"Open": "Open_trd", "High": "High_trd", "Low": "Low_trd", "Close": "Close_trd"})
     
-    base = pd.merge(sig, trd, on="Date", how="inner")
+    with timer("prepare_base.merge"): base = pd.merge(sig, trd, on="Date", how="inner")
     
     x_mkt, ma_mkt_arr = None, None
     if market_ticker:
         mkt = get_data(market_ticker, start_date, end_date).sort_values("Date")
         if not mkt.empty:
             mkt = mkt.rename(columns={"Close": "Close_mkt"})[["Date", "Close_mkt"]]
-            base = pd.merge(base, mkt, on="Date", how="inner")
+            with timer("prepare_base.merge"): base = pd.merge(base, mkt, on="Date", how="inner")
             
     base = base.dropna().reset_index(drop=True)
     
@@ -80,213 +54,79 @@ def prepare_base(signal_ticker, trade_ticker, market_ticker, start_date, end_dat
         
     return base, x_sig, x_trd, ma_dict_sig, x_mkt, ma_mkt_arr
 
+# --- 오늘 시그널용 최소 구간 로드 ---
+SIGNAL_LOOKBACK_MARGIN = 1.2   # 필요 봉 수 대비 여유 (휴장일/종목 간 거래일 차이)
+
+def prepare_signal_base(signal_ticker, trade_ticker, market_ticker, start_date, end_date, p):
+    """오늘 시그널에 필요한 만큼(required_lookback x 여유)만 받아 prepare_base 와 같은 형식으로 반환합니다.
+    사이드바 시작일보다 앞으로 가지는 않으며, 합친 뒤 봉이 모자라면 사이드바 전체 구간으로 다시 받습니다."""
+    q = normalize_params(p)
+    market_ma_period = q.market_ma_period or 200
+    need = required_lookback(q, market_ma_period)
+    ma_pool = [q.ma_buy, q.ma_sell, q.ma_compare_short, q.ma_compare_long]
+    days = int(np.ceil(need * SIGNAL_LOOKBACK_MARGIN * 365 / 252)) + 14
+    short_start = max(pd.Timestamp(start_date), pd.Timestamp(end_date) - pd.Timedelta(days=days)).date()
+    out = prepare_base(signal_ticker, trade_ticker, market_ticker, short_start, end_date, ma_pool, market_ma_period)
+    if out[0] is not None and len(out[0]) >= need: return out
+    return prepare_base(signal_ticker, trade_ticker, market_ticker, start_date, end_date, ma_pool, market_ma_period)
+
 # --- 시그널 체크 (상세) ---
-def check_signal_today(df, ma_buy, offset_ma_buy, ma_sell, offset_ma_sell, offset_cl_buy, offset_cl_sell, ma_compare_short, ma_compare_long, offset_compare_short, offset_compare_long, buy_operator, sell_operator, use_trend_in_buy, use_trend_in_sell,
-                       use_market_filter=False, market_ticker="", market_ma_period=200, 
-                       use_bollinger=False, bb_period=20, bb_std=2.0, bb_entry_type="상단선 돌파 (추세)", bb_exit_type="중심선(MA) 이탈"):
-    if df is None or df.empty: st.error("데이터 없음"); return
-    
+@profiled("signal_today")
+def signal_today(df, p, arrs=None, today=None):
+    """오늘(마지막 봉) 매수/매도 시그널의 판정 내용 (화면 표시는 st_adapter.check_signal_today).
+    조건은 compile_strategy 의 마지막 봉 값이라 백테스트의 신호 배열과 항상 같습니다.
+    arrs: prepare_base 결과로 만든 market_arrays (없으면 df 에서 시그널용 배열만 계산)
+    반환: date/stale(기준일이 오늘 이전) 와 매수·매도 비교 문구/통과 여부, 실패 시 "error" 메시지"""
+    if df is None or df.empty: return {"error": "데이터 없음"}
+
     # 1. 데이터 정렬 및 마지막 날짜 확인
-    df = df.copy().sort_values("Date").reset_index(drop=True)
-    last_row = df.iloc[-1]
-    last_date = pd.to_datetime(last_row['Date'])
-    
-    # 2. 날짜 안내 메시지 (오늘 날짜와 다르면 알려줌)
-    import datetime
-    diff_days = (datetime.datetime.now().date() - last_date.date()).days
-    if diff_days >= 1:
-        st.info(f"💡 장 시작 전입니다. **{last_date.strftime('%Y-%m-%d')} (전일 종가)** 기준으로 분석합니다.")
-    else:
-        st.caption(f"📅 기준일: **{last_date.strftime('%Y-%m-%d')}** (최신)")
-    
-    has_market = "Close_mkt" in df.columns
-    ma_buy = int(ma_buy)
-    ma_sell = int(ma_sell)
-    
-    df = df.copy().sort_values("Date").reset_index(drop=True)
-    df["Close"] = pd.to_numeric(df["Close_sig"], errors="coerce") 
-    df["MA_BUY"] = df["Close"].rolling(ma_buy).mean()
-    df["MA_SELL"] = df["Close"].rolling(ma_sell).mean()
-    
-    if has_market and use_market_filter:
-        df["MA_MKT"] = df["Close_mkt"].rolling(int(market_ma_period)).mean()
-    
-    if use_bollinger:
-        m, u, l = calculate_bollinger_bands(df["Close"], bb_period, bb_std)
-        df["BB_UP"], df["BB_MID"], df["BB_LO"] = u, m, l
+    df = df.sort_values("Date").reset_index(drop=True)
+    last_date = pd.to_datetime(df["Date"].iloc[-1])
+    today = today or datetime.datetime.now().date()
+    out = {"date": last_date, "stale": (today - last_date.date()).days >= 1}
 
-    if ma_compare_short and ma_compare_long:
-        df["MA_SHORT"] = df["Close"].rolling(int(ma_compare_short)).mean()
-        df["MA_LONG"] = df["Close"].rolling(int(ma_compare_long)).mean()
-    
-    i = len(df) - 1
     try:
-        if i - max(int(offset_cl_buy), int(offset_ma_buy), int(offset_cl_sell), int(offset_ma_sell)) < 0:
-            st.error("데이터 부족"); return
-        
-        market_ok = True
-        if has_market and use_market_filter:
-            market_ok = df["Close_mkt"].iloc[i] > df["MA_MKT"].iloc[i]
-
-        cl_b = float(df["Close"].iloc[i - int(offset_cl_buy)])
-        cl_s = float(df["Close"].iloc[i - int(offset_cl_sell)])
-        ref_date = df["Date"].iloc[-1].strftime('%Y-%m-%d')
-        
-        buy_ok, sell_ok = False, False
-        cond_str, sell_cond_str = "", ""
-
-        if use_bollinger:
-            bb_u, bb_m, bb_l = float(df["BB_UP"].iloc[i]), float(df["BB_MID"].iloc[i]), float(df["BB_LO"].iloc[i])
-            if "상단선" in str(bb_entry_type): buy_ok = cl_b > bb_u; cond_str = f"종가 > 상단 {bb_u:.2f}"
-            elif "하단선" in str(bb_entry_type): buy_ok = cl_b < bb_l; cond_str = f"종가 < 하단 {bb_l:.2f}"
-            else: buy_ok = cl_b > bb_m; cond_str = f"종가 > 중심 {bb_m:.2f}"
-
-            if sell_operator == "OFF":
-                sell_ok = False
-                sell_cond_str = "OFF (전략매도 끔)"
-            else:
-                if "상단선" in str(bb_exit_type): sell_ok = cl_s < bb_u; sell_cond_str = f"종가 < 상단 {bb_u:.2f}"
-                elif "하단선" in str(bb_exit_type): sell_ok = cl_s < bb_l; sell_cond_str = f"종가 < 하단 {bb_l:.2f}"
-                else: sell_ok = cl_s < bb_m; sell_cond_str = f"종가 < 중심 {bb_m:.2f}"
-        else:
-            ma_b = float(df["MA_BUY"].iloc[i - int(offset_ma_buy)])
-            ma_s = float(df["MA_SELL"].iloc[i - int(offset_ma_sell)])
-            trend_ok = True
-            if (use_trend_in_buy or use_trend_in_sell) and "MA_SHORT" in df.columns:
-                trend_ok = df["MA_SHORT"].iloc[i - int(offset_compare_short)] >= df["MA_LONG"].iloc[i - int(offset_compare_long)]
-
-            buy_base = (cl_b > ma_b) if (buy_operator == ">") else (cl_b < ma_b)
-            
-            if sell_operator == "OFF":
-                sell_ok = False
-                sell_cond_str = "OFF (전략매도 끔)"
-            else:
-                sell_base = (cl_s < ma_s) if (sell_operator == "<") else (cl_s > ma_s)
-                sell_ok = (sell_base and (not trend_ok)) if use_trend_in_sell else sell_base
-                sell_cond_str = f"종가 {cl_s:.2f} {sell_operator} 이평 {ma_s:.2f}"
-            
-            buy_ok = (buy_base and trend_ok) if use_trend_in_buy else buy_base
-            cond_str = f"종가 {cl_b:.2f} {buy_operator} 이평 {ma_b:.2f}"
-
-        final_buy = buy_ok and market_ok
-        st.subheader(f"📌 시그널 ({ref_date})")
-        st.write(f"💡 매수({bb_entry_type if use_bollinger else '이평'}): {cond_str} → {'✅' if buy_ok else '❌'}")
-        if buy_ok and not market_ok: st.warning("⚠️ 시장 필터 미충족")
-        st.write(f"💡 매도: {sell_cond_str} → {'✅' if sell_ok else '❌'}")
-        
-        # [수정] 매수/매도 동시 발생 시 명확하게 표시
-        if final_buy and sell_ok:
-            st.warning("⚠️ 매수/매도 신호 중복 (전략 점검 필요)")
-        elif final_buy:
-            st.success("🚀 매수 진입 (종가)")
-        elif sell_ok:
-            st.error("💧 매도 청산 (종가)")
-        else:
-            st.info("⏸ 관망")
-
-    except Exception as e: st.error(f"오류: {e}")
-
-def summarize_signal_today(df, p):
-    if df is None or df.empty: return {"label": "N/A", "last_buy": "-", "last_sell": "-", "last_hold": "-"}
+        arrs = arrs if arrs is not None else frame_arrays(df, p)
+        i = arrs["n"] - 1
+        if i < IDX0: return {**out, "error": "데이터 부족"}
+
+        comp = compile_strategy(arrs, p, detail=True)
+        q = comp["q"]
+        return {**out,
+                "buy_mode": BB_ENTRY_LABELS[q.bb_entry_type] if q.use_bollinger else "이평",
+                "buy_text": line_text(comp["buy_line"], i), "buy_ok": bool(comp["buy_base"][i]), "final_buy": bool(comp["buy"][i]),
+                "market_ok": comp["mkt_ok"] is None or bool(comp["mkt_ok"][i]),
+                "rsi_ok": comp["rsi_ok"] is None or bool(comp["rsi_ok"][i]),
+                "sell_text": line_text(comp["sell_line"], i) if comp["sell_line"] is not None else "OFF (전략매도 끔)",
+                "sell_ok": bool(comp["sell"][i])}
+    except Exception as e: return {**out, "error": f"오류: {e}"}
+
+def summarize_signal_today(df, p, arrs=None):
+    """오늘 시그널 라벨과 최근 365봉 내 마지막 매수/매도 신호일.
+    compile_strategy 의 매수/매도 배열을 그대로 쓰므로 백테스트와 같은 봉(IDX0 이후)만 신호로 봅니다.
+    arrs: prepare_base 결과로 만든 market_arrays (없으면 df 에서 시그널용 배열만 계산)"""
+    empty = {"label": "N/A", "last_buy": "-", "last_sell": "-", "last_hold": "-"}
+    if arrs is None and (df is None or df.empty): return empty
     try:
-        # 1. 데이터 정렬
-        df = df.copy().sort_values("Date").reset_index(drop=True)
-        if len(df) < 60: return {"label": "데이터부족", "last_buy": "-", "last_sell": "-", "last_hold": "-"}
-        
-        # [핵심] 무조건 마지막 행(최신 데이터)을 기준으로 삼습니다.
-        idx_now = df.index[-1]
-        
-        ma_buy = int(p.get("ma_buy", 20))
-        ma_sell = int(p.get("ma_sell", 10))
-        off_ma_b = int(p.get("offset_ma_buy", 0))
-        off_cl_b = int(p.get("offset_cl_buy", 0))
-        off_ma_s = int(p.get("offset_ma_sell", 0))
-        off_cl_s = int(p.get("offset_cl_sell", 0))
-        buy_op = str(p.get("buy_operator", ">"))
-        sell_op = str(p.get("sell_operator", "<"))
-        use_trend_buy = bool(p.get("use_trend_in_buy", False))
-        use_trend_sell = bool(p.get("use_trend_in_sell", False))
-        ma_comp_s = int(p.get("ma_compare_short", 0) or 0)
-        ma_comp_l = int(p.get("ma_compare_long", 0) or 0)
-        off_comp_s = int(p.get("offset_compare_short", 0))
-        off_comp_l = int(p.get("offset_compare_long", 0))
-        use_bollinger = bool(p.get("use_bollinger", False))
-        
-        df = df.copy().sort_values("Date").reset_index(drop=True)
-        if len(df) < 120: return {"label": "데이터부족", "last_buy": "-", "last_sell": "-", "last_hold": "-"}
-        df["Close"] = pd.to_numeric(df["Close"], errors="coerce")
-        
-        if (use_trend_buy or use_trend_sell) and ma_comp_s > 0 and ma_comp_l > 0:
-            df["MA_COMP_S"] = df["Close"].rolling(ma_comp_s).mean()
-            df["MA_COMP_L"] = df["Close"].rolling(ma_comp_l).mean()
-
-        if use_bollinger:
-            bb_p = int(p.get("bb_period", 20))
-            bb_s = float(p.get("bb_std", 2.0))
-            _, u, l = calculate_bollinger_bands(df["Close"], bb_p, bb_s)
-            mid = df["Close"].rolling(bb_p).mean()
-            df["BB_UP"], df["BB_LO"], df["BB_MID"] = u, l, mid
-        else:
-            df["MA_BUY"] = df["Close"].rolling(ma_buy).mean()
-            df["MA_SELL"] = df["Close"].rolling(ma_sell).mean()
-
-        last_buy_date, last_sell_date = "-", "-"
-        idx_now = len(df) - 1
-        
-        def _check(i, type_):
-            if i < 60: return False
-            try:
-                if type_ == 'sell' and sell_op == "OFF": return False
-
-                trend_ok = True
-                if (use_trend_buy or use_trend_sell) and "MA_COMP_S" in df.columns:
-                    s_val = df["MA_COMP_S"].iloc[i - off_comp_s]
-                    l_val = df["MA_COMP_L"].iloc[i - off_comp_l]
-                    trend_ok = (s_val >= l_val)
-
-                if use_bollinger:
-                    bb_entry = str(p.get("bb_entry_type", ""))
-                    bb_exit = str(p.get("bb_exit_type", ""))
-                    cl = df["Close"].iloc[i - (off_cl_b if type_=='buy' else off_cl_s)]
-                    if type_ == 'buy':
-                        if "상단선" in bb_entry: return cl > df["BB_UP"].iloc[i-off_cl_b]
-                        elif "하단선" in bb_entry: return cl < df["BB_LO"].iloc[i-off_cl_b]
-                        else: return cl > df["BB_MID"].iloc[i-off_cl_b]
-                    else:
-                        if "상단선" in bb_exit: return cl < df["BB_UP"].iloc[i-off_cl_s]
-                        elif "하단선" in bb_exit: return cl < df["BB_LO"].iloc[i-off_cl_s]
-                        else: return cl < df["BB_MID"].iloc[i-off_cl_s]
-                else:
-                    cl = df["Close"].iloc[i - (off_cl_b if type_=='buy' else off_cl_s)]
-                    ma = df["MA_BUY"].iloc[i - off_ma_b] if type_=='buy' else df["MA_SELL"].iloc[i - off_ma_s]
-                    if type_ == 'buy':
-                        return ((cl > ma) if buy_op == ">" else (cl < ma)) and (trend_ok if use_trend_buy else True)
-                    else:
-                        return ((cl < ma) if sell_op == "<" else (cl > ma)) and ((not trend_ok) if use_trend_sell else True)
-            except: return False
-
-        is_buy_now = _check(idx_now, 'buy')
-        is_sell_now = _check(idx_now, 'sell')
-        
+        if arrs is None: arrs = frame_arrays(df.sort_values("Date").reset_index(drop=True), p)
+        n = arrs["n"]
+        if n <= IDX0: return {**empty, "label": "데이터부족"}
+        comp = compile_strategy(arrs, p)
+        buy, sell = comp["buy"], comp["sell"]
+
         # [수정] 라벨 표시 로직 수정 (중복 시그널 체크)
         label = "관망"
-        if is_buy_now and is_sell_now:
-            label = "⚠️매수/매도 중복"
-        elif is_buy_now:
-            label = "매수진입"
-        elif is_sell_now:
-            label = "매도청산"
-        
-        search_range = min(365, len(df)-60)
-        for k in range(search_range):
-            curr_idx = idx_now - k
-            d_str = df["Date"].iloc[curr_idx].strftime("%Y-%m-%d")
-            if last_buy_date == "-" and _check(curr_idx, 'buy'): last_buy_date = d_str
-            if last_sell_date == "-" and _check(curr_idx, 'sell'): last_sell_date = d_str
-            if last_buy_date != "-" and last_sell_date != "-": break
-        
-        return {"label": label, "last_buy": last_buy_date, "last_sell": last_sell_date, "last_hold": "-"}
-    except: return {"label": "오류", "last_buy": "-", "last_sell": "-", "last_hold": "-"}
+        if buy[-1] and sell[-1]: label = "⚠️매수/매도 중복"
+        elif buy[-1]: label = "매수진입"
+        elif sell[-1]: label = "매도청산"
+
+        lo = max(IDX0, n - 365)
+        def _last(mask):
+            hit = np.flatnonzero(mask[lo:])
+            return pd.Timestamp(arrs["dates"][lo + hit[-1]]).strftime("%Y-%m-%d") if len(hit) else "-"
+
+        return {"label": label, "last_buy": _last(buy), "last_sell": _last(sell), "last_hold": "-"}
+    except: return {**empty, "label": "오류"}
 
 # --- 백테스트 함수 (상세 로그 버전으로 교체됨) ---
 def backtest_fast(base, x_sig, x_trd, ma_dict_sig, ma_buy, offset_ma_buy, ma_sell, offset_ma_sell, offset_cl_buy, offset_cl_sell, ma_compare_short, ma_compare_long, offset_compare_short, offset_compare_long, initial_cash, stop_loss_pct, take_profit_pct, strategy_behavior, min_hold_days, fee_bps, slip_bps, use_trend_in_buy, use_trend_in_sell, buy_operator, sell_operator, 
@@ -294,115 +134,82 @@ def backtest_fast(base, x_sig, x_trd, ma_dict_sig, ma_buy, offset_ma_buy, ma_sel
                   use_market_filter=False, x_mkt=None, ma_mkt_arr=None,
                   use_bollinger=False, bb_period=20, bb_std=2.0, 
                   bb_entry_type="상단선 돌파 (추세)", bb_exit_type="중심선(MA) 이탈",
-                  use_atr_stop=False, atr_multiplier=2.0):
-    
+                  use_atr_stop=False, atr_multiplier=2.0, state=None):
+    """기존 위치 인자 호출용 호환 함수 (StrategyConfig 로 변환해 run_backtest 호출, state 는 run_backtest 참고)"""
+    cfg = StrategyConfig.from_dict({
+        "ma_buy": ma_buy, "offset_ma_buy": offset_ma_buy, "ma_sell": ma_sell, "offset_ma_sell": offset_ma_sell,
+        "offset_cl_buy": offset_cl_buy, "offset_cl_sell": offset_cl_sell,
+        "ma_compare_short": ma_compare_short, "ma_compare_long": ma_compare_long,
+        "offset_compare_short": offset_compare_short, "offset_compare_long": offset_compare_long,
+        "stop_loss_pct": stop_loss_pct, "take_profit_pct": take_profit_pct, "strategy_behavior": strategy_behavior,
+        "min_hold_days": min_hold_days, "fee_bps": fee_bps, "slip_bps": slip_bps,
+        "use_trend_in_buy": use_trend_in_buy, "use_trend_in_sell": use_trend_in_sell,
+        "buy_operator": buy_operator, "sell_operator": sell_operator,
+        "use_rsi_filter": use_rsi_filter, "rsi_period": rsi_period, "rsi_max": rsi_max, "use_market_filter": use_market_filter,
+        "use_bollinger": use_bollinger, "bb_period": bb_period, "bb_std": bb_std, "bb_entry_type": bb_entry_type, "bb_exit_type": bb_exit_type,
+        "use_atr_stop": use_atr_stop, "atr_multiplier": atr_multiplier,
+    })
+    return run_backtest(base, x_sig, x_trd, ma_dict_sig, cfg, initial_cash, x_mkt, ma_mkt_arr, state)
+
+STATE_VERSION = 1   # 최종상태 형식 버전 (바뀌면 저장된 상태는 무시하고 처음부터 계산)
+
+def _data_mark(base, x_sig, x_trd, upto):
+    # 이어서 계산해도 되는 데이터인지 확인용 (시작일/마지막 처리봉 날짜와 종가: 수정주가 재조정/시작일 변경 감지)
+    last = upto - 1
+    return [str(pd.Timestamp(base["Date"].iloc[0]).date()), str(pd.Timestamp(base["Date"].iloc[last]).date()),
+            float(x_trd[0]), float(x_trd[last]), float(x_sig[last])]
+
+def _resume_point(state, base, x_sig, x_trd, cfg, initial_cash):
+    # 저장된 최종 상태를 이 데이터/설정에 이어 쓸 수 있으면 다음 처리할 봉, 아니면 None (→ 전체 재계산)
+    if not state or state.get("version") != STATE_VERSION: return None
+    nb = int(state.get("next_bar", 0))
+    if nb <= IDX0 or nb > len(base): return None
+    if state.get("config") != cfg.to_dict() or state.get("initial_cash") != float(initial_cash): return None
+    return nb if state.get("data") == _data_mark(base, x_sig, x_trd, nb) else None
+
+@profiled("backtest")
+def run_backtest(base, x_sig, x_trd, ma_dict_sig, cfg, initial_cash=5000000, x_mkt=None, ma_mkt_arr=None, state=None):
+    """상세 로그 백테스트. cfg: StrategyConfig (dict 도 받지만 변환은 호출 전에 한 번만 하는 것을 권장)
+    결과의 "최종상태" (현금/포지션/진입가/보유일/진입봉/MDD 고점 등) 를 state 로 다시 넘기면
+    같은 설정·같은 과거 데이터에 새로 붙은 봉만 시뮬레이션합니다 (데이터나 설정이 바뀌었으면 처음부터).
+    이어서 계산한 경우 "매매 로그" 는 새 봉의 매매만, 수익률/MDD/승률 등은 전체 기간 기준입니다."""
     n = len(base)
     if n == 0: return {}
-    
-    ma_buy_arr, ma_sell_arr = ma_dict_sig.get(int(ma_buy)), ma_dict_sig.get(int(ma_sell))
-    ma_s_arr = ma_dict_sig.get(int(ma_compare_short)) if ma_compare_short else None
-    ma_l_arr = ma_dict_sig.get(int(ma_compare_long)) if ma_compare_long else None
-    rsi_arr = calculate_indicators(x_sig, int(rsi_period)) if use_rsi_filter else None
-    atr_arr = base["ATR"].to_numpy(dtype=float) if "ATR" in base.columns else np.zeros(n)
-    
-    bb_up, bb_mid, bb_lo = None, None, None
-    if use_bollinger: bb_mid, bb_up, bb_lo = calculate_bollinger_bands(x_sig, bb_period, bb_std)
 
-    idx0 = 50
+    # 1~2. 매수/매도 조건은 전략 컴파일러가 전 구간 배열로 계산 (오늘 시그널/프리셋 요약과 같은 배열)
+    cfg = StrategyConfig.from_dict(cfg)
+    arrs = market_arrays(base, x_sig, x_trd, ma_dict_sig, x_mkt, ma_mkt_arr)
+    comp = compile_strategy(arrs, cfg, detail=True)
+    buy_arr, sell_arr = comp["buy"], comp["sell"]
+    ma_buy_arr, ma_sell_arr = ma_dict_sig.get(cfg.ma_buy), ma_dict_sig.get(cfg.ma_sell)
+    atr_arr, open_arr, low_arr, high_arr = arrs["atr"], arrs["open"], arrs["low"], arrs["high"]
+    bb_mid, bb_up, bb_lo = comp["bands"] if comp["bands"] is not None else (None, None, None)
+    stop_loss_pct, take_profit_pct, min_hold_days = cfg.stop_loss_pct, cfg.take_profit_pct, cfg.min_hold_days
+    use_atr_stop, atr_multiplier, use_bollinger = cfg.use_atr_stop, cfg.atr_multiplier, cfg.use_bollinger
+    cost = (cfg.slip_bps + cfg.fee_bps) / 10000.0
+
+    idx0 = IDX0
     xC_trd = x_trd
     cash, position, hold_days, entry_price = float(initial_cash), 0.0, 0, 0.0
-    logs, asset_curve = [], []
-
-    def _fill(px, type): return px * (1 + (slip_bps + fee_bps)/10000.0) if type=='buy' else px * (1 - (slip_bps + fee_bps)/10000.0)
-
-    for i in range(idx0, n):
+    peak, mdd, total = None, 0.0, float(initial_cash)
+    g_profit, g_loss, wins, total_sells, n_logs, last_buy_price = 0, 0, 0, 0, 0, None
+    start = _resume_point(state, base, x_sig, x_trd, cfg, initial_cash)
+    if start is not None:
+        cash, position, hold_days, entry_price = state["cash"], state["position"], state["hold_days"], state["entry_price"]
+        peak, mdd, total = state["peak"], state["mdd"], state["asset"]
+        g_profit, g_loss, wins, total_sells, n_logs, last_buy_price = (state["g_profit"], state["g_loss"], state["wins"],
+                                                                      state["sells"], state["trades"], state["last_buy_price"])
+    logs = []
+
+    def _fill(px, type): return px * (1 + cost) if type=='buy' else px * (1 - cost)
+
+    t_loop = time.perf_counter() if profiler.enabled() else None
+    for i in range(idx0 if start is None else start, n):
         just_bought = False
         exec_price, signal, reason, reason_detail = None, "HOLD", None, ""
         close_today = xC_trd[i]
-        open_today, low_today, high_today = base["Open_trd"].iloc[i], base["Low_trd"].iloc[i], base["High_trd"].iloc[i]
-
-        try:
-            cl_b, ma_b = x_sig[i - int(offset_cl_buy)], ma_buy_arr[i - int(offset_ma_buy)]
-            cl_s, ma_s = x_sig[i - int(offset_cl_sell)], ma_sell_arr[i - int(offset_ma_sell)]
-        except: 
-            asset_curve.append(cash + position * close_today)
-            continue
-
-        buy_cond, sell_cond = False, False
-        buy_msg, sell_msg = "", "" 
-
-        # 1. 기술적 지표 조건 판단
-        if use_bollinger:
-            idx_b, idx_s = i - int(offset_cl_buy), i - int(offset_cl_sell)
-            
-            if "상단선" in str(bb_entry_type): 
-                buy_cond = cl_b > bb_up[idx_b]
-                buy_msg = f"종가({cl_b:.2f}) > 상단({bb_up[idx_b]:.2f})"
-            elif "하단선" in str(bb_entry_type): 
-                buy_cond = cl_b < bb_lo[idx_b]
-                buy_msg = f"종가({cl_b:.2f}) < 하단({bb_lo[idx_b]:.2f})"
-            else: 
-                buy_cond = cl_b > bb_mid[idx_b]
-                buy_msg = f"종가({cl_b:.2f}) > 중심({bb_mid[idx_b]:.2f})"
-
-            if "상단선" in str(bb_exit_type): 
-                sell_cond = cl_s < bb_up[idx_s]
-                sell_msg = f"종가({cl_s:.2f}) < 상단({bb_up[idx_s]:.2f})"
-            elif "하단선" in str(bb_exit_type): 
-                sell_cond = cl_s < bb_lo[idx_s]
-                sell_msg = f"종가({cl_s:.2f}) < 하단({bb_lo[idx_s]:.2f})"
-            else: 
-                sell_cond = cl_s < bb_mid[idx_s]
-                sell_msg = f"종가({cl_s:.2f}) < 중심({bb_mid[idx_s]:.2f})"
-        else:
-            t_ok = True
-            t_msg = ""
-            if ma_s_arr is not None: 
-                s_val = ma_s_arr[i-int(offset_compare_short)]
-                l_val = ma_l_arr[i-int(offset_compare_long)]
-                t_ok = s_val >= l_val
-                t_msg = f" [추세:{'상승' if t_ok else '하락'}]"
-
-            if buy_operator == ">":
-                buy_cond = (cl_b > ma_b)
-                buy_msg = f"종가({cl_b:.2f}) > 이평({ma_b:.2f})"
-            else:
-                buy_cond = (cl_b < ma_b)
-                buy_msg = f"종가({cl_b:.2f}) < 이평({ma_b:.2f})"
-            
-            if use_trend_in_buy and not t_ok: 
-                buy_cond = False
-                buy_msg += " (추세필터거부)"
-
-            if sell_operator == "OFF":
-                sell_cond = False
-                sell_msg = "매도조건 OFF"
-            else:
-                if sell_operator == "<":
-                    sell_cond = (cl_s < ma_s)
-                    sell_msg = f"종가({cl_s:.2f}) < 이평({ma_s:.2f})"
-                else:
-                    sell_cond = (cl_s > ma_s)
-                    sell_msg = f"종가({cl_s:.2f}) > 이평({ma_s:.2f})"
-                
-                if use_trend_in_sell and t_ok: 
-                    sell_cond = False
-                    sell_msg += " (역추세필터거부)"
-
-        if buy_cond and use_rsi_filter:
-            if rsi_arr[i-1] > rsi_max: 
-                buy_cond = False
-                buy_msg += f" (RSI 과열 {rsi_arr[i-1]:.1f})"
-        
-        if buy_cond and use_market_filter:
-            if x_mkt[i] < ma_mkt_arr[i]: 
-                buy_cond = False
-                buy_msg += f" (시장하락장 {x_mkt[i]:.1f})"
-
-        # 2. 매도 OFF 강제 적용
-        if sell_operator == "OFF":
-            sell_cond = False
-            sell_msg = "OFF"
+        open_today, low_today, high_today = open_arr[i], low_arr[i], high_arr[i]
+        buy_cond, sell_cond = bool(buy_arr[i]), bool(sell_arr[i])
 
         stop_hit, take_hit = False, False
         sold_today = False 
@@ -416,7 +223,7 @@ def backtest_fast(base, x_sig, x_trd, ma_dict_sig, ma_buy, offset_ma_buy, ma_sel
                  entry_idx = i - hold_days
                  if entry_idx >= 0:
                      entry_atr = atr_arr[entry_idx]
-                     current_stop_price = entry_price - (entry_atr * float(atr_multiplier))
+                     current_stop_price = entry_price - (entry_atr * atr_multiplier)
                      atr_info_str = f"(ATR:{entry_atr:.2f}x{atr_multiplier})"
             elif stop_loss_pct > 0:
                 current_stop_price = entry_price * (1 - stop_loss_pct / 100)
@@ -445,11 +252,11 @@ def backtest_fast(base, x_sig, x_trd, ma_dict_sig, ma_buy, offset_ma_buy, ma_sel
                 sold_today = True
 
         if position > 0 and signal == "HOLD":
-            if sell_cond and hold_days >= int(min_hold_days):
+            if sell_cond and hold_days >= min_hold_days:
                 exec_price = close_today
                 cash = position * _fill(exec_price, 'sell')
                 position, signal, reason, entry_price = 0.0, "SELL", "전략매도", 0.0
-                reason_detail = sell_msg
+                reason_detail = line_text(comp["sell_line"], i)
                 sold_today = True
 
         elif position == 0 and not sold_today:
@@ -457,11 +264,12 @@ def backtest_fast(base, x_sig, x_trd, ma_dict_sig, ma_buy, offset_ma_buy, ma_sel
                 exec_price = close_today
                 position = cash / _fill(exec_price, 'buy')
                 cash, signal, reason, just_bought, entry_price = 0.0, "BUY", "전략매수", True, exec_price
-                reason_detail = buy_msg
+                reason_detail = line_text(comp["buy_line"], i)
 
         hold_days = hold_days + 1 if position > 0 and not just_bought else 0
         total = cash + (position * close_today)
-        asset_curve.append(total)
+        peak = total if peak is None or total > peak else peak
+        mdd = min(mdd, (total - peak) / peak)
         
         # [NEW] 로그에 상세 내용(reason_detail) 포함
         if signal != "HOLD":
@@ -470,34 +278,45 @@ def backtest_fast(base, x_sig, x_trd, ma_dict_sig, ma_buy, offset_ma_buy, ma_sel
                 "체결가": exec_price, "자산": total, "이유": reason, 
                 "상세내용": reason_detail, "손절발동": stop_hit, "익절발동": take_hit
             })
-
-    if not logs: return {}
-    s = pd.Series(asset_curve)
-    
-    g_profit, g_loss, wins = 0, 0, 0
-    last_buy_price = None
-    for r in logs:
-        if r['신호'] == 'BUY': last_buy_price = r['체결가']
-        elif r['신호'] == 'SELL' and last_buy_price:
-            pnl = (r['체결가'] - last_buy_price) / last_buy_price
-            if pnl > 0: wins += 1; g_profit += pnl
-            else: g_loss += abs(pnl)
-            last_buy_price = None
-            
-    total_sells = len([l for l in logs if l['신호']=='SELL'])
+            if signal == "BUY": last_buy_price = exec_price
+            else:
+                total_sells += 1
+                if last_buy_price:
+                    pnl = (exec_price - last_buy_price) / last_buy_price
+                    if pnl > 0: wins += 1; g_profit += pnl
+                    else: g_loss += abs(pnl)
+                    last_buy_price = None
+
+    if t_loop is not None:
+        profiler.add("backtest.loop", time.perf_counter() - t_loop)
+        profiler.count("backtest.bars", n - (idx0 if start is None else start))
+    n_logs += len(logs)
+    if not n_logs: return {}
     pf = (g_profit / g_loss) if g_loss > 0 else 999.0
     win_rate = (wins / total_sells * 100) if total_sells > 0 else 0.0
+    final_state = {
+        "version": STATE_VERSION, "next_bar": n, "data": _data_mark(base, x_sig, x_trd, n),
+        "config": cfg.to_dict(), "initial_cash": float(initial_cash),
+        "cash": float(cash), "position": float(position), "entry_price": float(entry_price), "hold_days": int(hold_days),
+        "entry_idx": int(n - 1 - hold_days) if position > 0 else None,
+        "peak": float(peak), "mdd": float(mdd), "asset": float(total),
+        "g_profit": float(g_profit), "g_loss": float(g_loss), "wins": wins, "sells": total_sells, "trades": n_logs,
+        "last_buy_price": None if last_buy_price is None else float(last_buy_price),
+    }
 
     return {
-        "수익률 (%)": round((asset_curve[-1] - initial_cash)/initial_cash*100, 2),
-        "MDD (%)": round(((s - s.cummax()) / s.cummax()).min() * 100, 2),
+        "수익률 (%)": round((total - initial_cash)/initial_cash*100, 2),
+        "MDD (%)": round(mdd * 100, 2),
         "승률 (%)": round(win_rate, 2),
         "Profit Factor": round(pf, 2),
         "총 매매 횟수": total_sells,
         "매매 로그": logs,
-        "차트데이터": {"ma_buy_arr": ma_buy_arr[idx0:], "ma_sell_arr": ma_sell_arr[idx0:], "base": base.iloc[idx0:].reset_index(drop=True), "bb_up": bb_up[idx0:] if use_bollinger else None, "bb_lo": bb_lo[idx0:] if use_bollinger else None}
+        "차트데이터": {"ma_buy_arr": ma_buy_arr[idx0:], "ma_sell_arr": ma_sell_arr[idx0:], "base": base.iloc[idx0:].reset_index(drop=True), "bb_up": bb_up[idx0:] if use_bollinger else None, "bb_lo": bb_lo[idx0:] if use_bollinger else None},
+        "최종상태": final_state,
+        "이어서계산": start is not None,
     }
 
+@profiled("auto_search")
 def auto_search_train_test(signal_ticker, trade_ticker, start_date, end_date, split_ratio, choices_dict, n_trials=50, initial_cash=5000000, fee_bps=0, slip_bps=0, strategy_behavior="1", min_hold_days=0, constraints=None, **kwargs):
     ma_pool = set([5, 10, 20, 60, 120])
     for k in ["ma_buy", "ma_sell", "ma_compare_short", "ma_compare_long"]:
@@ -509,10 +328,11 @@ def auto_search_train_test(signal_ticker, trade_ticker, start_date, end_date, sp
     base_full, x_sig_full, x_trd_full, ma_dict, _, _ = prepare_base(signal_ticker, trade_ticker, "", start_date, end_date, list(ma_pool))
     if base_full is None: return pd.DataFrame()
     
+    # 조건 배열은 trend/buy/sell 계층별 LRU 캐시로 재사용 (손절/익절/ATR 만 다른 시도는 재계산 없음)
+    # Train/Test 는 전체 배열을 공유하고 구간만 나눠 시뮬레이션합니다.
     split_idx = int(len(base_full) * split_ratio)
-    base_tr, base_te = base_full.iloc[:split_idx].reset_index(drop=True), base_full.iloc[split_idx:].reset_index(drop=True)
-    x_sig_tr, x_sig_te = x_sig_full[:split_idx], x_sig_full[split_idx:]
-    x_trd_tr, x_trd_te = x_trd_full[:split_idx], x_trd_full[split_idx:]
+    arrs = market_arrays(base_full, x_sig_full, x_trd_full, ma_dict)
+    cache = ConditionCache(maxsize=kwargs.get("cache_size", 256))
     
     results = []
     defaults = {"ma_buy": 50, "ma_sell": 10, "offset_ma_buy": 0, "offset_ma_sell": 0, "offset_cl_buy":0, "offset_cl_sell":0, "buy_operator":">", "sell_operator":"<"}
@@ -523,38 +343,32 @@ def auto_search_train_test(signal_ticker, trade_ticker, start_date, end_date, sp
     min_train_r = constraints.get("min_train_ret", -999.0)
     min_test_r = constraints.get("min_test_ret", -999.0)
 
+    def _run(q, nb, ns, start, end):
+        eq, events = simulate_nxt(arrs, q, nb, ns, start, end, initial_cash)
+        return summarize(eq, events, initial_cash)
+
     for _ in range(int(n_trials)):
         p = {}
         for k in choices_dict.keys():
             arr = choices_dict[k]
             p[k] = random.choice(arr) if arr else defaults.get(k)
         
-        common_args = {
-            "ma_dict_sig": ma_dict,
-            "ma_buy": int(p.get('ma_buy', 50)), "offset_ma_buy": int(p.get('offset_ma_buy', 0)),
-            "ma_sell": int(p.get('ma_sell', 10)), "offset_ma_sell": int(p.get('offset_ma_sell', 0)),
-            "offset_cl_buy": int(p.get('offset_cl_buy', 0)), "offset_cl_sell": int(p.get('offset_cl_sell', 0)),
-            "ma_compare_short": int(p.get('ma_compare_short')) if p.get('ma_compare_short') else 0,
-            "ma_compare_long": int(p.get('ma_compare_long')) if p.get('ma_compare_long') else 0,
-            "offset_compare_short": int(p.get('offset_compare_short', 0)), "offset_compare_long": int(p.get('offset_compare_long', 0)),
-            "initial_cash": initial_cash, "stop_loss_pct": float(p.get('stop_loss_pct', 0)), "take_profit_pct": float(p.get('take_profit_pct', 0)),
-            "strategy_behavior": strategy_behavior, "min_hold_days": min_hold_days, "fee_bps": fee_bps, "slip_bps": slip_bps,
-            "use_trend_in_buy": p.get('use_trend_in_buy', True), "use_trend_in_sell": p.get('use_trend_in_sell', False),
-            "buy_operator": p.get('buy_operator', '>'), "sell_operator": p.get('sell_operator', '<'),
-            "use_atr_stop": p.get('use_atr_stop', False), "atr_multiplier": p.get('atr_multiplier', 2.0)
-        }
+        q = normalize_params({**p, "strategy_behavior": strategy_behavior,
+                              "min_hold_days": min_hold_days, "fee_bps": fee_bps, "slip_bps": slip_bps})
+        nb, ns = cache.signals(arrs, q)
 
-        res_full = backtest_fast(base_full, x_sig_full, x_trd_full, **common_args)
+        res_full = _run(q, nb, ns, IDX0, None)
         if not res_full: continue
         
         if res_full.get('총 매매 횟수', 0) < min_tr: continue
         if res_full.get('승률 (%)', 0) < min_wr: continue
         if limit_mdd > 0 and res_full.get('MDD (%)', 0) < -abs(limit_mdd): continue
 
-        res_tr = backtest_fast(base_tr, x_sig_tr, x_trd_tr, **common_args)
+        res_tr = _run(q, nb, ns, IDX0, split_idx)
         if res_tr.get('수익률 (%)', -999) < min_train_r: continue
 
-        res_te = backtest_fast(base_te, x_sig_te, x_trd_te, **common_args)
+        # 예전 backtest_fast(test 구간) 처럼 test 첫 봉에서 IDX0 봉 지난 뒤부터 매매 (test 지표 기간 유지)
+        res_te = _run(q, nb, ns, split_idx + IDX0, None)
         if res_te.get('수익률 (%)', -999) < min_test_r: continue
 
         row = {
@@ -570,27 +384,174 @@ def auto_search_train_test(signal_ticker, trade_ticker, start_date, end_date, sp
         }
         results.append(row)
         
-    return pd.DataFrame(results)
+    df = pd.DataFrame(results)
+    df.attrs["cache_stats"] = cache.stats()
+    # 실제 매매 구간 (첫 봉, 마지막 봉 날짜), 봉이 모자라면 None
+    day = lambda i: pd.Timestamp(arrs["dates"][i]).date()
+    win = lambda a, b: (day(a), day(b - 1)) if a < b else None
+    df.attrs["windows"] = {"train": win(IDX0, split_idx), "test": win(split_idx + IDX0, arrs["n"])}
+    return df
+
+# --- 프리셋 일괄 평가 (같은 종목 조합끼리 묶어서) ---
+def preset_tickers(p):
+    return (p.get("signal_ticker", p.get("signal_ticker_input", "SOXL")),
+            p.get("trade_ticker", p.get("trade_ticker_input", "SOXL")),
+            p.get("market_ticker", p.get("market_ticker_input", "SPY")))
+
+@profiled("presets.load")
+def _group_arrays(tickers, items, start_date, end_date):
+    # 한 (시그널, 매매, 시장) 조합: 데이터 로드/정렬 1회, 이평선은 전 프리셋 창 합집합으로 1회
+    # 반환: 시장 이평선 기간별 [(프리셋 목록, arrs)] (데이터 없으면 None)
+    s_ticker, t_ticker, m_ticker = tickers
+    qs = [(name, p, normalize_params(p)) for name, p in items]   # 값 변환/검사는 StrategyConfig 한 곳에서
+    ma_pool = sorted(set(w for _, _, q in qs for w in (q.ma_buy, q.ma_sell, q.ma_compare_short, q.ma_compare_long) if w > 0))
+    periods = sorted(set(q.market_ma_period for _, _, q in qs))
+    base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr = prepare_base(s_ticker, t_ticker, m_ticker, start_date, end_date, ma_pool, periods[0])
+    if base is None or base.empty: return None
+
+    arrs = market_arrays(base, x_sig, x_trd, ma_dict, x_mkt, ma_mkt_arr)
+    out = []
+    for period in periods:
+        group = [(name, p) for name, p, q in qs if q.market_ma_period == period]
+        out.append((group, arrs if (x_mkt is None or period == periods[0]) else dict(arrs, ma_mkt=_fast_ma(x_mkt, period))))
+    return out
+
+def _preset_key(tickers, p, start_date):
+    # 결과에 영향을 주는 값 전체 (종목, 시작일, 시장 이평 기간, 전략 설정)
+    q = normalize_params(p)
+    return json.dumps([list(tickers), str(start_date), q.market_ma_period, q.to_dict()],
+                      ensure_ascii=False, sort_keys=True)
+
+def _arrs_mark(arrs, upto):
+    # upto 봉까지의 데이터 지문 (시작일/마지막 날짜와 종가: 봉 추가·수정주가 재조정 감지)
+    last, mkt = upto - 1, arrs["mkt"]
+    return [str(pd.Timestamp(arrs["dates"][0]).date()), str(pd.Timestamp(arrs["dates"][last]).date()),
+            float(arrs["close"][0]), float(arrs["close"][last]), float(arrs["sig"][last]), None if mkt is None else float(mkt[last])]
+
+def _evaluate_preset_group(tickers, items, start_date, end_date, store=None):
+    # 반환: {전략명: (PRESETS 행, "재사용"/"이어서"/"전체")}
+    groups = _group_arrays(tickers, items, start_date, end_date)
+    if groups is None: return {name: None for name, _ in items}
+    out = {}
+    for group, arrs in groups:
+        n, dates = arrs["n"], pd.Series(pd.to_datetime(arrs["dates"]))
+        mark = _arrs_mark(arrs, n) if n else None
+        # 저장된 상태와 비교: 그대로면 저장된 행, 봉만 늘었으면 저장된 봉 다음부터, 그 외(설정 변경/데이터 수정)는 처음부터
+        batches = {IDX0: []}
+        for name, p in group:
+            key = _preset_key(tickers, p, start_date)
+            rec = store.get(name) if store is not None else None
+            if rec and rec.get("key") == key and mark is not None:
+                nb = rec["next_bar"]
+                if nb == n and rec["data"] == mark:
+                    out[name] = (rec["row"], "재사용"); continue
+                if IDX0 < nb < n and rec["data"] == _arrs_mark(arrs, nb):
+                    batches.setdefault(nb, []).append((name, p, key, rec["state"])); continue
+            batches[IDX0].append((name, p, key, None))
+
+        for start, batch in batches.items():
+            if not batch: continue
+            res, states = evaluate_many(arrs, [p for _, p, _, _ in batch], start, None, 5000000,
+                                        states=[s for *_, s in batch] if start != IDX0 else None, return_states=True)
+            for (name, p, key, _), r, state in zip(batch, res, states):
+                # 오늘 시그널도 백테스트와 같은 배열(컴파일된 조건의 마지막 봉)로 계산
+                row = _preset_row(name, tickers[1], (r, summarize_signal_today(None, p, arrs), dates))
+                if store is not None and mark is not None:
+                    store.put(name, {"key": key, "next_bar": n, "data": mark, "row": row, "state": state})
+                out[name] = (row, "전체" if start == IDX0 else "이어서")
+    return out
+
+def _evaluate_horizon_group(tickers, items, start_dates, end_date):
+    # 가장 긴 구간으로 한 번 로드한 뒤 구간별 결과를 한 배치로 계산
+    groups = _group_arrays(tickers, items, min(start_dates), end_date)
+    if groups is None: return {name: [None] * len(start_dates) for name, _ in items}   # 데이터 없음은 오류가 아니라 빈 구간
+    out = {}
+    for group, arrs in groups:
+        res, starts = evaluate_horizons(arrs, [p for _, p in group], start_dates)
+        for j, (name, p) in enumerate(group):
+            out[name] = [(res[h][j], pd.Timestamp(arrs["dates"][s]).date()) if s < arrs["n"] else None for h, s in enumerate(starts)]
+    return out
+
+def _run_groups(presets, fn, args, max_workers=4, on_progress=None):
+    # 프리셋을 (시그널, 매매, 시장) 조합별로 묶어 스레드로 병렬 평가 (진행률 콜백은 호출한 스레드에서 실행)
+    groups = {}
+    for name, p in presets.items():
+        groups.setdefault(preset_tickers(p), []).append((name, p))
+
+    evaluated, done = {}, 0
+    if not groups: return evaluated
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(groups)))) as ex:
+        # 스레드마다 현재 컨텍스트 복사본에서 실행 (프로파일 집계가 부른 쪽 실행으로 모이도록)
+        futures = {ex.submit(contextvars.copy_context().run, fn, key, items, *args): key for key, items in groups.items()}
+        for fut in as_completed(futures):
+            key = futures[fut]
+            try: evaluated.update(fut.result())
+            except Exception: evaluated.update({name: None for name, _ in groups[key]})
+            done += len(groups[key])
+            if on_progress: on_progress(done, len(presets), key[0])
+    return evaluated
+
+def _preset_row(name, t_ticker, evaluated):
+    if evaluated is None:
+        return {"전략명": name, "티커": t_ticker, "보유여부": "❌ 에러", "현재상태": "데이터오류"}
+    bt_res, sig_res, dates = evaluated
+    hold_status = "⚪ 미보유"
+    if bt_res.get("보유중"):
+        hold_status = f"🟢 보유중 ({pd.Timestamp(dates.iloc[bt_res['진입봉']]).strftime('%Y-%m-%d')})"
+    return {
+        "전략명": name, "티커": t_ticker, "현재상태": sig_res["label"], "최근매수": sig_res["last_buy"],
+        "보유여부": hold_status,
+        "총 수익률(%)": f"{bt_res.get('수익률 (%)', 0)}%",
+        "MDD(%)": f"{bt_res.get('MDD (%)', 0)}%",
+        "승률(%)": f"{bt_res.get('승률 (%)', 0)}%",
+        "매매횟수": bt_res.get('총 매매 횟수', 0),
+        # 화면에는 안 쓰는 원값 (CLI 배치 출력/정렬용)
+        "최근매도": sig_res["last_sell"], "보유중": bool(bt_res.get("보유중", False)),
+        "진입일": pd.Timestamp(dates.iloc[bt_res["진입봉"]]).strftime("%Y-%m-%d") if bt_res.get("보유중") else "-",
+        "기준일": pd.Timestamp(dates.iloc[-1]).strftime("%Y-%m-%d") if len(dates) else "-",
+        "수익률 (%)": bt_res.get("수익률 (%)", 0.0), "MDD (%)": bt_res.get("MDD (%)", 0.0),
+        "승률 (%)": bt_res.get("승률 (%)", 0.0), "Profit Factor": bt_res.get("Profit Factor", 0.0),
+    }
 
-def apply_opt_params(row):
-    try:
-        updates = {
-            "ma_buy": int(row["ma_buy"]), "offset_ma_buy": int(row["offset_ma_buy"]),
-            "offset_cl_buy": int(row["offset_cl_buy"]), "buy_operator": str(row["buy_operator"]),
-            "ma_sell": int(row["ma_sell"]), "offset_ma_sell": int(row["offset_ma_sell"]),
-            "offset_cl_sell": int(row["offset_cl_sell"]), "sell_operator": str(row["sell_operator"]),
-            "use_trend_in_buy": bool(row["use_trend_in_buy"]), "use_trend_in_sell": bool(row["use_trend_in_sell"]),
-            "ma_compare_short": int(row["ma_compare_short"]) if not pd.isna(row["ma_compare_short"]) else 20,
-            "ma_compare_long": int(row["ma_compare_long"]) if not pd.isna(row["ma_compare_long"]) else 50,
-            "offset_compare_short": int(row["offset_compare_short"]),
-            "offset_compare_long": int(row["offset_compare_long"]),
-            "stop_loss_pct": float(row["stop_loss_pct"]),
-            "take_profit_pct": float(row["take_profit_pct"]),
-            "use_atr_stop": bool(row["use_atr_stop"]) if "use_atr_stop" in row else False,
-            "atr_multiplier": float(row["atr_multiplier"]) if "atr_multiplier" in row else 2.0,
-            "auto_run_trigger": True,
-            "preset_name_selector": "직접 설정"
-        }
-        for k, v in updates.items(): st.session_state[k] = v
-        st.toast("✅ 설정이 적용되었습니다! 백테스트 탭을 확인하세요.")
-    except Exception as e: st.error(f"설정 적용 오류: {e}")
+@profiled("presets.evaluate")
+def evaluate_presets(presets, start_date, end_date, max_workers=4, on_progress=None, store=None):
+    """전체 프리셋을 (시그널, 매매, 시장) 조합별로 묶어 평가합니다.
+    조합마다 데이터 정렬/이평선 계산은 한 번, 백테스트는 simulate_batch 한 번이며, 조합끼리는 스레드로 병렬 처리합니다.
+    store(PresetStateStore) 를 주면 설정·데이터가 그대로인 프리셋은 저장된 행을 바로 쓰고,
+    새 봉만 생긴 프리셋은 저장된 엔진 상태에서 새 봉만 계산합니다 (개수는 store.last_run).
+    반환: PRESETS 탭과 같은 형식의 행 리스트 (presets 순서 유지)"""
+    evaluated = _run_groups(presets, _evaluate_preset_group, (start_date, end_date, store), max_workers, on_progress)
+    rows, counts = [], {"재사용": 0, "이어서": 0, "전체": 0}
+    for name, p in presets.items():
+        hit = evaluated.get(name)
+        if hit is None: rows.append(_preset_row(name, preset_tickers(p)[1], None)); continue
+        rows.append(hit[0]); counts[hit[1]] += 1
+    if store is not None:
+        store.last_run = counts
+        store.save()
+    return rows
+
+@profiled("presets.horizons")
+def evaluate_preset_horizons(presets, start_dates, end_date, max_workers=4, on_progress=None):
+    """프리셋별로 여러 시작일(예: 5/10/15/20년 전)~end_date 구간을 평가합니다.
+    조합마다 가장 긴 구간 데이터만 한 번 로드하고, 구간별 포지션/지표 워밍업은 새로 로드한 것과 같게 초기화합니다.
+    반환: {전략명: [구간별 (결과 dict, 실제 시작일) 또는 데이터가 없으면 None]} (계산 중 예외면 목록 대신 None)"""
+    return _run_groups(presets, _evaluate_horizon_group, (list(start_dates), end_date), max_workers, on_progress)
+
+def opt_row_params(row):
+    """최적화 결과 한 행 → 사이드바에 적용할 값 dict (화면 적용은 st_adapter.apply_opt_params)"""
+    return {
+        "ma_buy": int(row["ma_buy"]), "offset_ma_buy": int(row["offset_ma_buy"]),
+        "offset_cl_buy": int(row["offset_cl_buy"]), "buy_operator": str(row["buy_operator"]),
+        "ma_sell": int(row["ma_sell"]), "offset_ma_sell": int(row["offset_ma_sell"]),
+        "offset_cl_sell": int(row["offset_cl_sell"]), "sell_operator": str(row["sell_operator"]),
+        "use_trend_in_buy": bool(row["use_trend_in_buy"]), "use_trend_in_sell": bool(row["use_trend_in_sell"]),
+        "ma_compare_short": int(row["ma_compare_short"]) if not pd.isna(row["ma_compare_short"]) else 20,
+        "ma_compare_long": int(row["ma_compare_long"]) if not pd.isna(row["ma_compare_long"]) else 50,
+        "offset_compare_short": int(row["offset_compare_short"]),
+        "offset_compare_long": int(row["offset_compare_long"]),
+        "stop_loss_pct": float(row["stop_loss_pct"]),
+        "take_profit_pct": float(row["take_profit_pct"]),
+        "use_atr_stop": bool(row["use_atr_stop"]) if "use_atr_stop" in row else False,
+        "atr_multiplier": float(row["atr_multiplier"]) if "atr_multiplier" in row else 2.0,
+    }
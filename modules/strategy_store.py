@@ -0,0 +1,170 @@
+import json
+import sqlite3
+import threading
+import time
+
+# ---------------------------------------------------------------
+# 저장 전략 원본 = 로컬 SQLite (이름 기본키, Streamlit 비의존)
+# 저장/삭제는 SQLite 한 행만 바꾸고 outbox 에 기록, 구글 시트는 SheetReplica 가
+# 백그라운드에서 모아서 반영하는 복제본입니다 (시트가 죽어도 저장은 성공, 나중에 반영).
+# ---------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS strategies (name TEXT PRIMARY KEY, params TEXT NOT NULL, updated_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS outbox (name TEXT PRIMARY KEY, op TEXT NOT NULL, params TEXT, queued_at REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+class StrategyStore:
+    """SQLite 전략 저장소. outbox 에는 이름마다 시트에 아직 반영 안 된 마지막 변경(put/delete)만 남습니다."""
+    def __init__(self, path="strategies.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def all(self):
+        """{전략명: 파라미터} (깨진 행은 건너뜀)"""
+        with self._lock: rows = self._db().execute("SELECT name, params FROM strategies ORDER BY rowid").fetchall()
+        out = {}
+        for name, params in rows:
+            try: out[name] = json.loads(params)
+            except ValueError: continue
+        return out
+
+    def put(self, name, params):
+        params_str, now = json.dumps(params, ensure_ascii=False), time.time()
+        with self._lock, self._db() as db:
+            db.execute("INSERT INTO strategies VALUES (?, ?, ?) ON CONFLICT(name) DO UPDATE SET params=excluded.params, updated_at=excluded.updated_at",
+                       (name, params_str, now))
+            db.execute("INSERT OR REPLACE INTO outbox VALUES (?, 'put', ?, ?)", (name, params_str, now))
+
+    def delete(self, name):
+        """있었으면 True"""
+        with self._lock, self._db() as db:
+            found = db.execute("DELETE FROM strategies WHERE name = ?", (name,)).rowcount > 0
+            db.execute("INSERT OR REPLACE INTO outbox VALUES (?, 'delete', NULL, ?)", (name, time.time()))
+        return found
+
+    def pending(self, limit=100):
+        """시트에 반영할 변경 [(이름, op, params 문자열, queued_at)] (오래된 순)"""
+        with self._lock: return self._db().execute("SELECT name, op, params, queued_at FROM outbox ORDER BY queued_at LIMIT ?", (limit,)).fetchall()
+
+    def pending_count(self):
+        with self._lock: return self._db().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def ack(self, rows):
+        # 반영하는 사이 같은 이름이 다시 바뀌었으면 (queued_at 이 다르면) 남겨 둠
+        with self._lock, self._db() as db:
+            db.executemany("DELETE FROM outbox WHERE name = ? AND queued_at = ?", [(r[0], r[3]) for r in rows])
+
+    def seed(self, strategies):
+        """처음 한 번 시트 내용을 가져옴 (로컬에 있거나 삭제 대기 중인 이름은 건드리지 않음). 가져온 개수"""
+        now = time.time()
+        with self._lock, self._db() as db:
+            if db.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone(): return 0
+            pending = {r[0] for r in db.execute("SELECT name FROM outbox")}
+            rows = [(k, json.dumps(v, ensure_ascii=False), now) for k, v in strategies.items() if k not in pending]
+            added = sum(db.execute("INSERT OR IGNORE INTO strategies VALUES (?, ?, ?)", r).rowcount for r in rows)
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('seeded', ?)", (str(now),))
+        return added
+
+    def seeded(self):
+        with self._lock: return self._db().execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone() is not None
+
+class SheetReplica:
+    """outbox 를 묶어서 시트(Name/Params 열)에 반영하는 백그라운드 스레드.
+    open_sheet() 로 연 워크시트 하나를 계속 재사용하고, 실패하면 연결을 버리고 retry 초 뒤 다시 시도합니다.
+    open_sheet() 가 None 이면(인증 정보 없음) 재시도해도 소용없으므로 disabled 로 두고 스레드를 끝냅니다 (로컬 저장만).
+    on_pull(n): 백그라운드 pull 로 시트 전략 n개를 로컬에 처음 들여왔을 때 (목록 캐시 무효화용)
+    한 묶음마다 시트를 한 번 읽어 A열(이름)이 정확히 같은 행만 고치므로 JSON 안의 같은 글자를 잘못 찾지 않습니다."""
+    def __init__(self, store, open_sheet, parse_records=None, interval=2.0, retry=30.0, batch=100, on_pull=None):
+        self.store, self.open_sheet, self.parse_records, self.on_pull = store, open_sheet, parse_records, on_pull
+        self.interval, self.retry, self.batch = interval, retry, batch
+        self._sheet, self._thread = None, None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._io = threading.RLock()   # 시트 연결은 하나뿐이라 스레드 간 순서대로 사용
+        self.last_error, self.last_sync, self.disabled = None, None, False
+
+    def _client(self):
+        # 설정이 없으면 None (disabled 로 표시)
+        if self._sheet is None and not self.disabled:
+            self._sheet = self.open_sheet()
+            if self._sheet is None: self.disabled = True
+        return self._sheet
+
+    def start(self):
+        """스레드를 (한 번만) 띄우고 바로 한 번 돌게 함 (disabled 면 아무것도 안 함)"""
+        if self.disabled: return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sheet-replica", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self.sync()
+                self.last_error = None
+                if self.disabled: return
+            except Exception as e:
+                self._sheet, self.last_error = None, e
+                time.sleep(self.retry)
+                self._wake.set()
+                continue
+            if self.store.pending_count(): self._wake.set()   # 묶음보다 많이 쌓였으면 이어서
+            time.sleep(self.interval)                          # 연속 저장은 다음 묶음으로 모음
+
+    def pull(self):
+        """로컬이 아직 비어 있던 적만 있으면 시트 내용을 한 번 가져옴 (기존 시트 사용자의 이전용). 가져온 개수"""
+        if self.parse_records is None or self.store.seeded(): return 0
+        with self._io:
+            try:
+                sheet = self._client()
+                if sheet is None: return 0
+                n = self.store.seed(self.parse_records(sheet.get_all_records()))
+            except Exception:
+                self._sheet = None; raise
+        if n and self.on_pull: self.on_pull(n)
+        return n
+
+    def sync(self):
+        """pull 후 대기 중인 변경을 시트에 반영. 반영한 변경 수"""
+        self.pull()
+        with self._io: return self._push()
+
+    def _push(self):
+        rows = self.store.pending(self.batch)
+        if not rows: return 0
+        sheet = self._client()
+        if sheet is None: return 0   # 시트 없이 로컬만 (outbox 는 남겨 둠)
+        values = sheet.get_all_values()
+        if not values:
+            sheet.append_row(["Name", "Params"]); values = [["Name", "Params"]]
+        where = {}
+        for i, row in enumerate(values[1:], start=2):
+            if row and row[0]: where.setdefault(row[0], []).append(i)
+
+        updates, appends, deletes = [], [], []
+        for name, op, params, _ in rows:
+            found = where.get(name, [])
+            if op == "put":
+                if found: updates.append({"range": f"B{found[0]}", "values": [[params]]}); deletes += found[1:]
+                else: appends.append([name, params])
+            else: deletes += found
+        if updates: sheet.batch_update(updates)
+        for i in sorted(set(deletes), reverse=True): sheet.delete_rows(i)   # 아래 행부터 지워야 번호가 안 밀림
+        if appends: sheet.append_rows(appends)
+        self.store.ack(rows)
+        self.last_sync = time.time()
+        return len(rows)
@@ -1,125 +1,71 @@
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 import json
+import sqlite3
+from .presets import open_sheet, parse_sheet_records, PresetRepository
+from .strategy_store import StrategyStore, SheetReplica
 
 # -----------------------------------------------------------
 # [설정] Streamlit Secrets 변수명
 SECRET_KEY_NAME = "GCP_KEY"     
 SHEET_URL_NAME = "SHEET_URL"    
+SAVED_STRATEGIES_TTL = 300      # 저장 전략 목록 캐시 시간(초), 저장/삭제 시에는 바로 반영
+STRATEGY_DB_PATH = "strategies.db"
 # -----------------------------------------------------------
 
-def _get_sheet_connection():
-    """Streamlit Secrets의 URL을 이용해 구글 시트에 연결"""
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive"
-    ]
-    
-    if SECRET_KEY_NAME not in st.secrets:
-        st.error(f"⚠️ 설정 오류: Secrets에 '{SECRET_KEY_NAME}'가 없습니다.")
-        return None
-    if SHEET_URL_NAME not in st.secrets:
-        st.error(f"⚠️ 설정 오류: Secrets에 '{SHEET_URL_NAME}'가 없습니다.")
-        return None
+class SheetError(Exception):
+    """시트 설정/연결 오류 (메시지는 화면에 그대로 표시)"""
 
+def _open_sheet_from_secrets():
+    # 화면 출력 없이 예외만 (시트 동기화 스레드에서 부름). Secrets 에 설정이 없으면 None (시트 동기화 끔)
+    try:
+        if any(name not in st.secrets for name in (SECRET_KEY_NAME, SHEET_URL_NAME)): return None
+    except FileNotFoundError: return None   # secrets.toml 자체가 없음
     try:
         secret_value = st.secrets[SECRET_KEY_NAME]
-        
-        if isinstance(secret_value, str):
-            key_dict = json.loads(secret_value)
-        else:
-            key_dict = dict(secret_value)
-        
-        if "private_key" in key_dict:
-            key_dict["private_key"] = key_dict["private_key"].replace("\\n", "\n")
+        key_dict = json.loads(secret_value) if isinstance(secret_value, str) else dict(secret_value)
+        # 인증/시트 열기는 CLI 배치와 같은 코드 (modules/presets.py)
+        return open_sheet(key_dict, st.secrets[SHEET_URL_NAME])
+    except Exception as e: raise SheetError(f"❌ 구글 시트 연결 실패: {e}") from e
 
-        creds = ServiceAccountCredentials.from_json_keyfile_dict(key_dict, scope)
-        client = gspread.authorize(creds)
-        
-        target_url = st.secrets[SHEET_URL_NAME]
-        sheet = client.open_by_url(target_url).sheet1
-        return sheet
-        
-    except Exception as e:
-        st.error(f"❌ 구글 시트 연결 실패: {e}")
-        return None
+# 저장 전략 원본은 로컬 SQLite, 구글 시트는 백그라운드로 따라가는 복제본 (modules/strategy_store.py)
+# 프로세스당 하나씩 (모듈은 재실행 사이에 유지되므로 세션/재실행이 같은 저장소와 시트 연결을 공유)
+_store = StrategyStore(STRATEGY_DB_PATH)
+# 로컬이 처음이면 기존 시트 전략은 동기화 스레드가 가져오고, 들여온 뒤 목록 캐시를 무효화해 다음 재실행에 보이게 함
+_replica = SheetReplica(_store, _open_sheet_from_secrets, parse_sheet_records, on_pull=lambda n: _saved_strategies.invalidate())
 
-# -----------------------------------------------------------
-# [핵심 수정] 에러 이름을 쓰지 않는 안전한 방식으로 변경
-# -----------------------------------------------------------
+def _load_local_strategies():
+    # 첫 화면은 로컬 목록으로 바로 (시트는 기다리지 않음)
+    _replica.start()
+    return _store.all()
+
+_saved_strategies = PresetRepository(_load_local_strategies, ttl=SAVED_STRATEGIES_TTL)
 
 def load_saved_strategies():
-    sheet = _get_sheet_connection()
-    if sheet is None: return {}
-    try:
-        records = sheet.get_all_records()
-        strategies = {}
-        for row in records:
-            if not row: continue
-            name = row.get('Name')
-            params_str = row.get('Params')
-            if name and params_str:
-                try: strategies[name] = json.loads(params_str)
-                except: continue
-        return strategies
-    except: return {}
+    """저장된 전략 (로컬 저장소, 캐시)"""
+    return _saved_strategies.get()
 
 def save_strategy_to_file(name, params):
-    sheet = _get_sheet_connection()
-    if sheet is None: return
-
-    try:
-        # 헤더가 없으면 추가
-        if not sheet.get_all_values():
-            sheet.append_row(["Name", "Params"])
-
-        # 1. 먼저 해당 이름의 셀을 찾아봅니다.
-        cell = None
-        try:
-            cell = sheet.find(name)
-        except Exception:
-            # 못 찾으면 에러가 나는데, 이걸 무시하고 cell을 None으로 둡니다.
-            cell = None
-
-        params_str = json.dumps(params, ensure_ascii=False)
-
-        # 2. 셀이 있으면(이미 저장된 전략) -> 업데이트
-        if cell:
-            # 해당 행의 2번째 열(Params)을 수정
-            sheet.update_cell(cell.row, 2, params_str)
-            # st.success(f"✅ 전략 업데이트 완료: {name}") # (메시지는 main.py에서 띄움)
-            
-        # 3. 셀이 없으면(새로운 전략) -> 추가
-        else:
-            sheet.append_row([name, params_str])
-            # st.success(f"✅ 새 전략 저장 완료: {name}")
-
-    except Exception as e:
+    # 로컬에 바로 저장하고 시트 반영은 백그라운드로 (시트가 느리거나 죽어도 저장은 성공)
+    try: _store.put(name, params)
+    except sqlite3.Error as e:
         st.error(f"❌ 저장 실패: {e}")
-        # 디버깅을 위해 에러 내용을 화면에 출력
-        st.write(e)
         raise e
+    _saved_strategies.put(name, params)
+    _replica.start()
 
 def delete_strategy_from_file(name):
-    sheet = _get_sheet_connection()
-    if sheet is None: return
-
-    try:
-        cell = None
-        try:
-            cell = sheet.find(name)
-        except Exception:
-            cell = None
-
-        if cell:
-            sheet.delete_rows(cell.row)
-            st.success(f"🗑️ 삭제 완료: {name}")
-        else:
-            st.warning("삭제할 전략이 시트에 없습니다.")
-
-    except Exception as e:
-        st.error(f"삭제 오류: {e}")
+    try: found = _store.delete(name)
+    except sqlite3.Error as e:
+        st.error(f"삭제 오류: {e}"); return
+    _saved_strategies.remove(name)
+    _replica.start()
+    if found: st.success(f"🗑️ 삭제 완료: {name}")
+    else: st.warning("삭제할 전략이 저장소에 없습니다.")
+
+def strategy_sync_status():
+    """시트 반영 대기 수, 마지막 동기화 오류 (없으면 None), 시트 설정이 없어 동기화를 끈 상태인지"""
+    err = _replica.last_error
+    return {"대기": _store.pending_count(), "오류": str(err) if err is not None else None, "꺼짐": _replica.disabled}
 
 def parse_choices(text_input, dtype="str"):
     if not text_input: return []
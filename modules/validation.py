@@ -0,0 +1,326 @@
+import itertools
+import numpy as np
+import pandas as pd
+from .engine import IDX0, normalize_params, signal_arrays, simulate, simulate_nxt, next_true, summarize, evaluate_many
+
+# ---------------------------------------------------------------
+# 전략 견고성 검증 (Streamlit 비의존)
+# ---------------------------------------------------------------
+
+# --- 조합 퍼지 교차검증 (CPCV) ---
+def cpcv_groups(n, n_groups=6, embargo=5, start=IDX0):
+    """[start, n) 구간을 n_groups 개로 나누고, 두 번째 그룹부터 앞쪽 embargo 봉을 비워 둡니다.
+    모든 그룹 사이에 공백이 있으므로 어떤 train/test 조합이든 경계가 퍼지됩니다."""
+    edges = np.linspace(start, n, int(n_groups) + 1).astype(int)
+    groups = []
+    for g in range(int(n_groups)):
+        gs = edges[g] + (int(embargo) if g > 0 else 0)
+        groups.append((int(min(gs, edges[g + 1])), int(edges[g + 1])))
+    return groups
+
+def _chain_metrics(curves):
+    # 그룹별 정규화 자산곡선을 이어 붙여 수익률/MDD 계산
+    if not curves: return 0.0, 0.0
+    parts, level = [], 1.0
+    for c in curves:
+        if len(c) == 0: continue
+        parts.append(c * level)
+        level = parts[-1][-1]
+    if not parts: return 0.0, 0.0
+    eq = np.concatenate(parts)
+    peak = np.maximum.accumulate(eq)
+    return (level - 1) * 100, ((eq - peak) / peak).min() * 100
+
+def purged_cv(arrs, candidates, n_groups=6, n_test_groups=2, embargo=5, initial_cash=5000000):
+    """후보 파라미터(dict 리스트)를 모든 train/test 그룹 조합에서 평가합니다.
+    그룹마다 무포지션에서 한 번씩만 시뮬레이션하고(조건 배열은 후보당 1회), 조합은 그룹 결과를 이어 붙여 계산합니다.
+    반환: {"summary": 후보별 OOS 분포, "splits": 조합별 선택 결과, "pbo": 과최적화 확률}"""
+    n = arrs["n"]
+    groups = cpcv_groups(n, n_groups, embargo)
+    combos = list(itertools.combinations(range(len(groups)), int(n_test_groups)))
+    if n <= IDX0 or not candidates or not combos:
+        return {"summary": pd.DataFrame(), "splits": pd.DataFrame(), "pbo": None}
+
+    # 1) 후보 x 그룹 평가 (배치)
+    curves = []
+    for p in candidates:
+        q = normalize_params(p)
+        buy, sell = signal_arrays(arrs, q)
+        curves.append([simulate(arrs, q, buy, sell, gs, ge, initial_cash)[0] / initial_cash for gs, ge in groups])
+
+    # 2) 조합별 train/test 재구성
+    n_c, n_s = len(candidates), len(combos)
+    tr_ret, te_ret, te_mdd = np.zeros((n_c, n_s)), np.zeros((n_c, n_s)), np.zeros((n_c, n_s))
+    for j, test in enumerate(combos):
+        train = [g for g in range(len(groups)) if g not in test]
+        for c in range(n_c):
+            tr_ret[c, j] = _chain_metrics([curves[c][g] for g in train])[0]
+            te_ret[c, j], te_mdd[c, j] = _chain_metrics([curves[c][g] for g in test])
+
+    summary = pd.DataFrame({
+        "후보": list(range(n_c)),
+        "OOS_수익률_평균(%)": te_ret.mean(axis=1), "OOS_수익률_중앙(%)": np.median(te_ret, axis=1),
+        "OOS_수익률_하위5%(%)": np.percentile(te_ret, 5, axis=1), "OOS_수익률_최저(%)": te_ret.min(axis=1),
+        "OOS_양수비율(%)": (te_ret > 0).mean(axis=1) * 100,
+        "OOS_MDD_평균(%)": te_mdd.mean(axis=1), "OOS_MDD_최악(%)": te_mdd.min(axis=1),
+    }).round(2)
+
+    # 3) train 1등 후보의 OOS 순위 (PBO: 선택된 후보가 OOS 중앙값 아래로 떨어진 비율)
+    rows, below = [], 0
+    for j, test in enumerate(combos):
+        best = int(np.argmax(tr_ret[:, j]))
+        rank = (te_ret[:, j] < te_ret[best, j]).sum() / max(n_c - 1, 1)
+        below += rank < 0.5
+        rows.append({"Test 그룹": "+".join(str(g + 1) for g in test), "선택 후보": best,
+                     "Train_수익률(%)": round(tr_ret[best, j], 2), "OOS_수익률(%)": round(te_ret[best, j], 2),
+                     "OOS_MDD(%)": round(te_mdd[best, j], 2), "OOS 순위(%)": round(rank * 100, 1)})
+    pbo = round(below / n_s * 100, 1) if n_c > 1 else None
+    return {"summary": summary, "splits": pd.DataFrame(rows), "pbo": pbo}
+
+# --- 매매 단위 부트스트랩 (Monte Carlo) ---
+def trade_returns(logs, initial_cash=5000000):
+    """매매 로그의 BUY/SELL 쌍에서 비용 반영 매매별 수익률 배열을 만듭니다.
+    매수 직전 현금(직전 SELL 자산) 대비 매도 후 자산 비율이므로 수수료/슬리피지가 포함됩니다."""
+    rets, cash, in_pos = [], float(initial_cash), False
+    for r in logs or []:
+        if r.get("신호") == "BUY": in_pos = True
+        elif r.get("신호") == "SELL" and in_pos:
+            rets.append(r["자산"] / cash - 1)
+            cash, in_pos = float(r["자산"]), False
+    return np.asarray(rets, dtype=float)
+
+def _max_run(mask):
+    # 행마다 True 가 연속된 최대 길이
+    cs = np.cumsum(mask, axis=1, dtype=np.int32)
+    reset = np.maximum.accumulate(np.where(mask, 0, cs), axis=1)
+    return (cs - reset).max(axis=1)
+
+def bootstrap_trades(rets, n_sims=50000, seed=None, chunk=10000):
+    """매매별 수익률을 복원추출로 n_sims 번 재배열해 수익률/MDD/최대 연속손실 분포를 계산합니다.
+    (n_sims x 매매수) 행렬을 chunk 행씩 나눠 처리하므로 메모리 사용량이 일정합니다."""
+    rets = np.asarray(rets, dtype=float)
+    if len(rets) == 0: return None
+    rng = np.random.default_rng(seed)
+    n_t = len(rets)
+    # 로그수익률 누적합으로 계산 (곱/나눗셈 대신 덧셈, float32 로 메모리 절반)
+    log_r = np.log1p(rets).astype(np.float32)
+    loss = rets <= 0
+    tot, mdd, streak = np.empty(n_sims), np.empty(n_sims), np.empty(n_sims)
+    for s in range(0, int(n_sims), int(chunk)):
+        e = min(s + int(chunk), int(n_sims))
+        idx = rng.integers(0, n_t, size=(e - s, n_t), dtype=np.int32)
+        cs = np.cumsum(log_r[idx], axis=1)
+        dd = cs - np.maximum(np.maximum.accumulate(cs, axis=1), 0)
+        tot[s:e] = np.expm1(cs[:, -1]) * 100
+        mdd[s:e] = np.expm1(dd.min(axis=1)) * 100
+        streak[s:e] = _max_run(loss[idx])
+
+    def _ci(x): return {k: round(float(v), 2) for k, v in zip(["하위5%", "중앙값", "상위95%"], np.percentile(x, [5, 50, 95]))}
+    actual_eq = np.cumprod(1 + rets)
+    actual_peak = np.maximum(np.maximum.accumulate(actual_eq), 1.0)
+    return {
+        "매매수": n_t, "시뮬레이션": int(n_sims),
+        "수익률 (%)": _ci(tot), "MDD (%)": _ci(mdd), "최대 연속손실": _ci(streak),
+        "손실확률 (%)": round(float((tot < 0).mean() * 100), 2),
+        "실제": {"수익률 (%)": round(float((actual_eq[-1] - 1) * 100), 2),
+                "MDD (%)": round(float(min(((actual_eq - actual_peak) / actual_peak).min(), 0) * 100), 2),
+                "최대 연속손실": int(_max_run((rets <= 0)[None, :])[0])},
+    }
+
+# --- 블록 부트스트랩 합성 경로 ---
+def _ma_rows(X, w):
+    # 행(경로)별 단순이동평균 (누적합 방식, 2D 일괄 계산)
+    if w is None or w <= 1: return X.copy()
+    out = np.full(X.shape, np.nan)
+    if X.shape[1] >= w:
+        cs = np.cumsum(X, axis=1)
+        out[:, w-1] = cs[:, w-1] / w
+        out[:, w:] = (cs[:, w:] - cs[:, :-w]) / w
+    return out
+
+def block_bootstrap_paths(arrs, n_paths=500, block=20, chunk=50, seed=None):
+    """시그널/매매/시장 수익률을 같은 날짜 인덱스로 묶어 stationary block bootstrap 합니다.
+    (같은 인덱스를 뽑으므로 종목 간 상관관계가 유지됩니다.) chunk 개 경로씩 생성하는 제너레이터라
+    메모리는 chunk x 기간 크기로 제한됩니다."""
+    n = arrs["n"]
+    if n < 3: return
+    sig, C = arrs["sig"], arrs["close"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_sig, r_trd = np.diff(np.log(sig)), np.diff(np.log(C))
+        o_c, h_c, l_c = (arrs["open"] / C)[1:], (arrs["high"] / C)[1:], (arrs["low"] / C)[1:]
+        r_mkt = np.diff(np.log(arrs["mkt"])) if arrs.get("mkt") is not None else None
+    m, T = n - 1, n - 1
+    rng = np.random.default_rng(seed)
+    p_new = 1.0 / max(float(block), 1.0)
+    t_idx = np.arange(T)
+    for s in range(0, int(n_paths), int(chunk)):
+        P = min(int(chunk), int(n_paths) - s)
+        starts = rng.random((P, T)) < p_new
+        starts[:, 0] = True
+        last = np.maximum.accumulate(np.where(starts, t_idx, 0), axis=1)
+        pos = rng.integers(0, m, size=(P, T))
+        idx = (np.take_along_axis(pos, last, axis=1) + (t_idx - last)) % m
+
+        def _path(x0, r): return x0 * np.exp(np.concatenate([np.zeros((P, 1)), np.cumsum(r[idx], axis=1)], axis=1))
+        close = _path(C[0], r_trd)
+        ratio = lambda x, first: np.concatenate([np.full((P, 1), first), x[idx]], axis=1)
+        yield {
+            "sig": _path(sig[0], r_sig), "close": close,
+            "open": close * ratio(o_c, arrs["open"][0] / C[0]),
+            "high": close * ratio(h_c, arrs["high"][0] / C[0]),
+            "low": close * ratio(l_c, arrs["low"][0] / C[0]),
+            "mkt": _path(arrs["mkt"][0], r_mkt) if r_mkt is not None else None,
+        }
+
+def stress_paths(arrs, p, n_paths=500, block=20, chunk=50, seed=None, initial_cash=5000000):
+    """합성 경로 전체에 전략을 실행합니다. 이평선/ATR 은 청크 단위 2D 로 한 번에 계산하고,
+    경로별로는 조건 배열 + 이벤트 점프 상태 머신(simulate)을 경로 수만큼 돕니다.
+    비용은 경로 수 x (조건 배열 + 매매 사이 건너뛰기) 로, 20년(약 5천 봉) 500 경로에 1~2초
+    (benchmarks.suite 의 stress_paths 항목). 청크를 simulate_batch 봉 루프 하나로 돌려도 결과는 같지만
+    모든 봉을 도는 만큼 chunk=50 에서 2배 느리고 chunk=500 (청크당 수백 MB) 에서야 비슷해 경로별 루프를 씁니다.
+    반환: 경로별 수익률/MDD/매매횟수 DataFrame"""
+    q = normalize_params(p)
+    windows = sorted(set(w for w in [q.ma_buy, q.ma_sell, q.ma_compare_short, q.ma_compare_long] if w > 0))
+    rows = []
+    for ch in block_bootstrap_paths(arrs, n_paths, block, chunk, seed):
+        S, C, H, L = ch["sig"], ch["close"], ch["high"], ch["low"]
+        ma_rows = {w: _ma_rows(S, w) for w in windows}
+        prev_c = np.concatenate([np.full((len(C), 1), np.nan), C[:, :-1]], axis=1)
+        tr = np.fmax(H - L, np.fmax(np.abs(H - prev_c), np.abs(L - prev_c)))
+        atr = _ma_rows(tr, 14)
+        ma_mkt = _ma_rows(ch["mkt"], q.market_ma_period) if ch["mkt"] is not None else None
+        for k in range(len(C)):
+            a = {"n": C.shape[1], "sig": S[k], "close": C[k], "open": ch["open"][k], "high": H[k], "low": L[k],
+                 "atr": atr[k], "ma": {w: v[k] for w, v in ma_rows.items()},
+                 "mkt": ch["mkt"][k] if ch["mkt"] is not None else None,
+                 "ma_mkt": ma_mkt[k] if ma_mkt is not None else None}
+            buy, sell = signal_arrays(a, q)
+            eq, events = simulate(a, q, buy, sell, IDX0, None, initial_cash)
+            res = summarize(eq, events, initial_cash)
+            rows.append({"수익률 (%)": res.get("수익률 (%)", 0.0), "MDD (%)": res.get("MDD (%)", 0.0), "총 매매 횟수": res.get("총 매매 횟수", 0)})
+    return pd.DataFrame(rows)
+
+# --- 2-파라미터 민감도 그리드 ---
+SENSITIVITY_PARAMS = [
+    "ma_buy", "ma_sell", "offset_ma_buy", "offset_cl_buy", "offset_ma_sell", "offset_cl_sell",
+    "ma_compare_short", "ma_compare_long", "offset_compare_short", "offset_compare_long",
+    "stop_loss_pct", "take_profit_pct", "atr_multiplier", "min_hold_days", "bb_period", "bb_std",
+]
+
+def sensitivity_grid(arrs, p, x_key, x_vals, y_key, y_vals, initial_cash=5000000):
+    """p 를 기준으로 x_key x y_key 격자 전체를 한 번의 일괄 시뮬레이션으로 평가합니다.
+    조건 배열은 매수/매도가 각각 의존하는 파라미터 키로 한 번씩만 만들어지므로
+    ma_buy x ma_sell 100x100 격자도 조건 계산은 200번이고, 상태 머신은 격자 전체가 봉 루프 하나를 공유합니다.
+    반환: {"수익률 (%)": 2D, "MDD (%)": 2D, "총 매매 횟수": 2D} (행=y, 열=x, 매매 없으면 NaN)"""
+    base_q = normalize_params(p)
+    cells = [base_q.replace(**{x_key: xv, y_key: yv}) for yv in y_vals for xv in x_vals]
+    res = evaluate_many(arrs, cells, IDX0, None, initial_cash)
+    shape = (len(y_vals), len(x_vals))
+    return {k: np.array([r.get(k, np.nan) for r in res], dtype=float).reshape(shape) for k in ["수익률 (%)", "MDD (%)", "총 매매 횟수"]}
+
+# --- 수수료/슬리피지 민감도 ---
+def cost_sweep(arrs, p, fee_levels, initial_cash=5000000):
+    """매매 시점은 비용과 무관하므로(손절/익절 기준가도 비용 전 종가) 한 번만 시뮬레이션하고,
+    수수료 수준별 자산곡선은 기록된 매매로부터 다시 계산합니다. 연산 순서가 엔진과 같아 재실행 결과와 정확히 일치합니다.
+    반환: 수수료 수준별 총비용/수익률/MDD DataFrame (매매가 없으면 빈 DataFrame)"""
+    q = normalize_params(p)
+    buy, sell = signal_arrays(arrs, q)
+    _, events = simulate(arrs, q, buy, sell, IDX0, None, initial_cash)
+    if not events: return pd.DataFrame()
+
+    fees = np.asarray(fee_levels, dtype=float)
+    costs = np.array([(q.slip_bps + f) / 10000.0 for f in fees])
+    cash = np.full(len(fees), float(initial_cash))
+    seg_bar, seg_val, seg_hold = [], [], []
+    for bar, side, px, _, _ in events:
+        if side == "BUY":
+            position = cash / (px * (1 + costs))
+            seg_val.append(position)
+        else:
+            cash = position * (px * (1 - costs))
+            seg_val.append(cash)
+        seg_bar.append(bar); seg_hold.append(side == "BUY")
+
+    n, C = arrs["n"], arrs["close"]
+    sid = np.searchsorted(np.asarray(seg_bar), np.arange(IDX0, n), side="right") - 1
+    vals = np.column_stack(seg_val + [np.full(len(fees), float(initial_cash))])
+    hold = np.append(np.asarray(seg_hold, dtype=bool), False)
+    v = vals[:, sid]
+    eq = np.where(hold[sid], v * C[IDX0:n], v)
+    peak = np.maximum.accumulate(eq, axis=1)
+    return pd.DataFrame({
+        "수수료(bps)": fees, "슬리피지(bps)": q.slip_bps, "총비용(bps)": fees + q.slip_bps,
+        "수익률 (%)": [round(x, 2) for x in (eq[:, -1] - initial_cash) / initial_cash * 100],
+        "MDD (%)": [round(x, 2) for x in ((eq - peak) / peak).min(axis=1) * 100],
+    })
+
+def breakeven_cost(df_cost):
+    """수익률이 0 이 되는 총비용(bps)을 선형 보간으로 추정 (범위 안에서 안 바뀌면 None)"""
+    if df_cost is None or df_cost.empty: return None
+    x, y = df_cost["총비용(bps)"].to_numpy(), df_cost["수익률 (%)"].to_numpy()
+    for j in range(1, len(x)):
+        if y[j - 1] > 0 >= y[j]:
+            return round(float(x[j - 1] + (x[j] - x[j - 1]) * y[j - 1] / (y[j - 1] - y[j])), 1)
+    return None
+
+# --- 시작일 민감도 (모든 시작 봉) ---
+def month_start_bars(dates, start=IDX0):
+    """매월 첫 거래일의 봉 위치 (start 이후)"""
+    months = pd.DatetimeIndex(dates).to_period("M")
+    first = np.r_[True, months[1:] != months[:-1]] if len(months) else np.zeros(0, dtype=bool)
+    idx = np.flatnonzero(first)
+    return idx[idx >= start]
+
+def _holding_at_open(events, n):
+    # 봉 시작 시점에 포지션을 들고 있는지 (매수 다음 봉 ~ 매도 봉)
+    hold = np.zeros(n, dtype=bool)
+    entry = None
+    for bar, side, _, _, _ in events:
+        if side == "BUY": entry = bar
+        else: hold[entry + 1:bar + 1] = True; entry = None
+    if entry is not None: hold[entry + 1:] = True
+    return hold
+
+def start_date_curve(arrs, p, starts=None, initial_cash=5000000):
+    """시작 봉마다 무포지션으로 시작해 끝까지 매매한 수익률/MDD (기본: IDX0 이후 모든 봉).
+    조건 배열은 한 번만 만들고, 각 시작점은 이미 끝까지 돌린 경로가 무포지션인 봉에서 같은 매수를 하는 순간
+    그 경로에 합류시켜 멈춥니다 (이후 상태가 같으므로 자산 = 합류 시점 현금 비율 x 기존 경로).
+    반환: DataFrame [시작일, 수익률 (%), MDD (%), 총 매매 횟수, 합류봉] (attrs 에 시뮬레이션 통계)"""
+    n = arrs["n"]
+    q = normalize_params(p)
+    buy, sell = signal_arrays(arrs, q)
+    nb, ns = next_true(buy).tolist(), next_true(sell).tolist()
+    starts = range(IDX0, n) if starts is None else sorted(int(s) for s in starts if IDX0 <= s < n)
+
+    owner = np.full(n, -1)          # 봉별로 그 봉 시작 시점에 무포지션인 기준 경로 번호
+    merge_mask = owner >= 0
+    refs, rows, simulated = [], [], 0   # refs: 끝까지 돌린 경로 (시작 봉, 자산곡선, 매도 봉 배열)
+    for s in starts:
+        eq, events, m = simulate_nxt(arrs, q, nb, ns, s, None, initial_cash, merge_at=merge_mask)
+        simulated += len(eq)
+        sells = sum(1 for e in events if e[1] == "SELL")
+        if m is None:
+            r = len(refs)
+            refs.append((s, eq, np.array([e[0] for e in events if e[1] == "SELL"], dtype=int)))
+            flat = ~_holding_at_open(events, n)
+            flat[:s] = False
+            owner[flat & (owner < 0)] = r
+            merge_mask = owner >= 0
+            path = eq
+        else:
+            rs, r_eq, r_sells = refs[owner[m]]
+            cash_s = eq[-1] if len(eq) else float(initial_cash)
+            cash_r = r_eq[m - 1 - rs] if m > rs else float(initial_cash)
+            path = np.concatenate([eq, (cash_s / cash_r) * r_eq[m - rs:]])
+            sells += int((r_sells >= m).sum())
+        peak = np.maximum.accumulate(path)
+        traded = sells > 0 or (path != initial_cash).any()
+        rows.append({"시작일": pd.Timestamp(arrs["dates"][s]),
+                     "수익률 (%)": round((path[-1] - initial_cash) / initial_cash * 100, 2) if traded else 0.0,
+                     "MDD (%)": round(((path - peak) / peak).min() * 100, 2) if traded else 0.0,
+                     "총 매매 횟수": sells, "합류봉": m})
+
+    df = pd.DataFrame(rows)
+    df.attrs["stats"] = {"시작점": len(rows), "끝까지 계산한 경로": len(refs), "시뮬레이션 봉": simulated,
+                         "단순 반복 시 봉": int(sum(n - s for s in starts))}
+    return df
@@ -0,0 +1,20 @@
+import inspect
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import use_synthetic_data, years_ago
+from modules.engine import market_arrays
+from modules.strategy import prepare_base
+
+GRID_MAS = list(range(1, 101))
+
+@pytest.fixture(scope="session")
+def arrs():
+    """합성 SOXL/SPY 5년, 이평 1~100 + 200 (네트워크 없음)"""
+    with use_synthetic_data():
+        base, x_sig, x_trd, ma, x_mkt, ma_mkt = inspect.unwrap(prepare_base)("SOXL", "SOXL", "SPY", *years_ago(5), GRID_MAS + [200])
+    return market_arrays(base, x_sig, x_trd, ma, x_mkt, ma_mkt)
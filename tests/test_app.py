@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from benchmarks.rerun import APP, install_stubs
+from benchmarks.synthetic import use_synthetic_data
+from modules import data_loader, llm_advisor, utils
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """가짜 시세/시트/펀더멘털/Gemini 로 main.py 를 띄운 AppTest (네트워크 없음)"""
+    from streamlit.testing.v1 import AppTest
+    for mod, name in ((utils, "_store"), (utils, "_replica"), (data_loader, "get_fundamental_info"), (llm_advisor, "_genai")):
+        monkeypatch.setattr(mod, name, getattr(mod, name))
+    install_stubs(str(tmp_path / "strategies.db"))
+    with use_synthetic_data():
+        at = AppTest.from_file(APP, default_timeout=300)
+        at.run()
+        assert not at.exception
+        yield at
+
+def _button(at, label):
+    return next(b for b in at.button if b.label.startswith(label))
+
+def test_optimizer_button_runs_to_the_end(app):
+    next(n for n in app.number_input if n.label == "시도 횟수").set_value(10)
+    _button(app, "🚀 최적 조합 찾기 시작").click()
+    app.run()
+    assert not app.exception, app.exception[0].value if app.exception else None
+    assert any(e.label.startswith("🗄️ 캐시 현황") for e in app.sidebar.expander)
+
+def _assert_config_error(at, key):
+    assert not at.exception, at.exception[0].value if at.exception else None
+    assert any(key in e.value and "0 이상" in e.value for e in at.error)
+
+def test_negative_optimizer_candidates_show_error(app):
+    next(t for t in app.text_input if t.label == "매수 종가 Offset").set_value("-1, 5")
+    _button(app, "🚀 최적 조합 찾기 시작").click()
+    app.run()
+    _assert_config_error(app, "offset_cl_buy")
+
+def test_negative_heatmap_axis_shows_error(app):
+    app.selectbox(key="sens_X_key").set_value("offset_cl_buy")
+    app.number_input(key="sens_X_lo").set_value(-5.0)
+    _button(app, "🗺️ 히트맵 계산").click()
+    app.run()
+    _assert_config_error(app, "offset_cl_buy")
+    assert "sens_result" not in app.session_state
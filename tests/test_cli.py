@@ -0,0 +1,32 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.synthetic import use_synthetic_data
+from modules import cli
+
+PRESET = {"signal_ticker": "TQQQ", "trade_ticker": "TQQQ", "market_ticker": "SPY", "ma_buy": 20, "ma_sell": 10}
+
+@pytest.fixture
+def run_cli(tmp_path):
+    presets = tmp_path / "presets.json"
+    presets.write_text(json.dumps({"테스트": PRESET}, ensure_ascii=False), encoding="utf-8")
+    out = tmp_path / "out"
+    def run(*extra):
+        argv = ["--no-builtin", "--presets", str(presets), "--db", "", "--state", "", "--cache-dir", "",
+                "--start", "2020-01-01", "--end", "2024-12-31", "--out", str(out), "-q", *extra]
+        with use_synthetic_data(): code = cli.main(argv)
+        return code, sorted(os.listdir(out)) if out.exists() else []
+    return run
+
+def test_default_format_is_json_only(run_cli):
+    code, files = run_cli()
+    assert code == cli.EXIT_OK
+    assert files == ["presets_20241231.json"]
+
+def test_parquet_without_engine_is_skipped(run_cli, monkeypatch):
+    monkeypatch.setattr(cli, "parquet_engine", lambda: None)
+    code, files = run_cli("--format", "json", "parquet")
+    assert code == cli.EXIT_OK
+    assert files == ["presets_20241231.json"]
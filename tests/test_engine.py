@@ -0,0 +1,27 @@
+from modules import engine
+from modules.config import PARAM_DEFAULTS, StrategyConfig
+from modules.engine import ConditionCache, evaluate_many
+
+from conftest import GRID_MAS
+
+def _grid():
+    base = StrategyConfig.from_dict({**PARAM_DEFAULTS, "use_trend_in_buy": False, "use_trend_in_sell": False})
+    return [base.replace(ma_buy=b, ma_sell=s) for b in GRID_MAS for s in GRID_MAS]
+
+def test_ma_grid_builds_one_array_per_side_value(arrs, monkeypatch):
+    # ma_buy x ma_sell 100x100 격자: 매수 배열은 ma_buy 별, 매도 배열은 ma_sell 별로 한 번씩만
+    built = {"buy": 0, "sell": 0}
+    buy_array, sell_array = engine.buy_array, engine.sell_array
+    def count_buy(*a, **k): built["buy"] += 1; return buy_array(*a, **k)
+    def count_sell(*a, **k): built["sell"] += 1; return sell_array(*a, **k)
+    monkeypatch.setattr(engine, "buy_array", count_buy)
+    monkeypatch.setattr(engine, "sell_array", count_sell)
+    res = evaluate_many(arrs, _grid())
+    assert len(res) == len(GRID_MAS) ** 2
+    assert built == {"buy": len(GRID_MAS), "sell": len(GRID_MAS)}
+
+def test_condition_cache_reuses_buy_array_across_ma_sell(arrs):
+    cache = ConditionCache(maxsize=1000)
+    for q in _grid(): cache.signals(arrs, q)
+    assert cache.misses["buy"] == len(GRID_MAS) and cache.misses["sell"] == len(GRID_MAS)
+    assert cache.hits["buy"] == cache.hits["sell"] == len(GRID_MAS) ** 2 - len(GRID_MAS)
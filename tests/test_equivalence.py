@@ -0,0 +1,11 @@
+from benchmarks.equivalence import CANDIDATES, check_horizons, run, synthetic_datasets
+
+def test_fast_paths_match_baseline_backtest():
+    # 기준은 최적화 전 backtest_fast 원본 복사본 (benchmarks/baseline_backtest.py)
+    report, _ = run(synthetic_datasets(3), 40, seed=1, names=list(CANDIDATES), log=lambda *a: None)
+    assert {name: r["불일치"] for name, r in report.items()} == {name: 0 for name in CANDIDATES}
+    assert all(r["설정"] == 120 for r in report.values())
+
+def test_horizons_match_fresh_baseline_per_horizon():
+    rep = check_horizons(20, seed=1, log=lambda *a: None)
+    assert rep["설정"] and rep["불일치"] == 0
@@ -0,0 +1,26 @@
+import threading
+
+from modules import profiler
+
+def _session(on, name, out, ready, go):
+    # 세션 하나의 재실행: 켜기/끄기와 집계가 이 스레드(컨텍스트)에만 걸려야 함
+    profiler.start_run("app rerun", on)
+    ready.wait(); go.wait()
+    with profiler.timer(name): pass
+    profiler.count(name)
+    out[name] = profiler.report()
+
+def test_runs_are_isolated_per_context():
+    out, ready, go = {}, threading.Barrier(4), threading.Barrier(4)
+    threads = [threading.Thread(target=_session, args=(on, name, out, ready, go)) for on, name in ((True, "a"), (True, "b"), (False, "c"))]
+    for t in threads: t.start()
+    profiler.start_run("다른 세션", False)   # 늦게 시작한 세션이 앞선 세션의 집계를 지우거나 끄지 않아야 함
+    ready.wait(); go.wait()
+    for t in threads: t.join()
+    assert [s["구간"] for s in out["a"]["구간"]] == ["a"] and out["a"]["카운터"] == {"a": 1}
+    assert [s["구간"] for s in out["b"]["구간"]] == ["b"] and out["b"]["카운터"] == {"b": 1}
+    assert out["c"] is None and not profiler.enabled()
+
+def test_disabled_run_uses_shared_null_timer():
+    profiler.start_run(None, False)
+    assert profiler.timer("x") is profiler._NULL and profiler.report() is None
@@ -0,0 +1,50 @@
+import datetime
+import inspect
+
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_get_data, use_data, use_synthetic_data
+from modules import strategy
+from modules.engine import IDX0
+from modules.strategy import auto_search_train_test, evaluate_preset_horizons, prepare_base
+
+PRESET = {"signal_ticker": "NODATA", "trade_ticker": "NODATA", "market_ticker": "", "ma_buy": 20, "ma_sell": 10}
+END = datetime.date(2024, 12, 31)
+STARTS = [END - datetime.timedelta(days=365 * yr) for yr in (5, 10)]
+
+def _get_data(ticker, start, end):
+    if ticker == "NODATA": return pd.DataFrame(columns=["Date", "Open", "High", "Low", "Close", "Volume"])
+    if ticker == "BROKEN": raise RuntimeError("데이터 소스 오류")
+    return synthetic_get_data(ticker, start, end)
+
+def test_horizons_without_data_are_empty_not_errors():
+    presets = {"없음": PRESET, "오류": {**PRESET, "signal_ticker": "BROKEN", "trade_ticker": "BROKEN"},
+               "정상": {**PRESET, "signal_ticker": "SOXL", "trade_ticker": "SOXL"}}
+    with use_data(_get_data): out = evaluate_preset_horizons(presets, STARTS, END)
+    assert out["없음"] == [None, None]    # 화면에는 "-"
+    assert out["오류"] is None            # 화면에는 "Err"
+    assert all(h is not None and h[0] for h in out["정상"])
+
+def test_optimizer_test_window_starts_after_split(monkeypatch):
+    # test 구간은 split 봉에서 IDX0 봉 지난 뒤부터 — 어떤 test 매매도 split 이전 봉을 쓰지 않음
+    calls = []
+    simulate_nxt = strategy.simulate_nxt
+    def spy(arrs, q, nb, ns, start, end, cash):
+        eq, events = simulate_nxt(arrs, q, nb, ns, start, end, cash)
+        calls.append((start, end, [e[0] for e in events]))
+        return eq, events
+    monkeypatch.setattr(strategy, "simulate_nxt", spy)
+    choices = {"ma_buy": [5, 20, 60], "ma_sell": [5, 10, 20], "buy_operator": [">"], "sell_operator": ["<"]}
+    with use_synthetic_data():
+        base = inspect.unwrap(prepare_base)("SOXL", "SOXL", "", "2015-01-01", "2024-12-31", [5])[0]
+        df = auto_search_train_test("SOXL", "SOXL", "2015-01-01", "2024-12-31", 0.5, choices, n_trials=30)
+    split = int(len(base) * 0.5)
+    dates = [d.date() for d in base["Date"]]
+    assert df.attrs["windows"] == {"train": (dates[IDX0], dates[split - 1]), "test": (dates[split + IDX0], dates[-1])}
+    assert dates[split + IDX0] > dates[split - 1]
+
+    train = [bars for start, end, bars in calls if end == split]
+    test = [bars for start, end, bars in calls if start == split + IDX0]
+    assert train and test and any(test)
+    assert all(b < split for bars in train for b in bars)
+    assert all(b >= split + IDX0 for bars in test for b in bars)
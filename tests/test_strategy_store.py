@@ -0,0 +1,32 @@
+import json
+import threading
+
+from benchmarks.rerun import FakeSheet
+from modules.presets import parse_sheet_records
+from modules.strategy_store import SheetReplica, StrategyStore
+
+PARAMS = {"signal_ticker": "SOXL", "trade_ticker": "SOXL", "ma_buy": 20, "ma_sell": 10}
+
+def test_first_pull_runs_in_background(tmp_path):
+    # 시트가 느려도 start() 는 바로 돌아오고 로컬 목록부터 보임, 들여온 뒤 on_pull
+    opened, pulled = threading.Event(), threading.Event()
+    sheet = FakeSheet([["시트 전략", json.dumps(PARAMS)]])
+    def open_sheet(): opened.wait(5); return sheet
+    store = StrategyStore(str(tmp_path / "s.db"))
+    replica = SheetReplica(store, open_sheet, parse_sheet_records, interval=0.01, on_pull=lambda n: pulled.set())
+    replica.start()
+    assert store.all() == {}
+    opened.set()
+    assert pulled.wait(5)
+    assert list(store.all()) == ["시트 전략"]
+
+def test_missing_credentials_disable_replica(tmp_path):
+    # 인증 정보가 없으면 재시도하지 않고 꺼짐 (저장은 로컬에만, outbox 는 남김)
+    calls = []
+    store = StrategyStore(str(tmp_path / "s.db"))
+    replica = SheetReplica(store, lambda: calls.append(1), parse_sheet_records, retry=0.01)
+    store.put("로컬", PARAMS)
+    replica.start(); replica._thread.join(5)
+    assert replica.disabled and not replica._thread.is_alive() and replica.last_error is None
+    replica.start()
+    assert calls == [1] and store.pending_count() == 1
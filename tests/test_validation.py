@@ -0,0 +1,139 @@
+import inspect
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.equivalence import MA_POOL, random_params
+from benchmarks.synthetic import use_synthetic_data, years_ago
+from modules.config import StrategyConfig
+from modules.engine import IDX0, market_arrays, signal_arrays, simulate, summarize
+from modules.strategy import prepare_base
+from modules import validation
+from modules.validation import (block_bootstrap_paths, bootstrap_trades, cost_sweep, cpcv_groups,
+                                month_start_bars, purged_cv, start_date_curve)
+
+CASH = 5000000
+
+@pytest.fixture(scope="module")
+def arrs():
+    """합성 SOXL/SPY 8년, 동등성 검사와 같은 이평 창"""
+    with use_synthetic_data():
+        out = inspect.unwrap(prepare_base)("SOXL", "SOXL", "SPY", *years_ago(8), MA_POOL)
+    return market_arrays(*out)
+
+def _configs(n, seed):
+    rng = random.Random(seed)
+    return [StrategyConfig.from_dict(random_params(rng)) for _ in range(n)]
+
+def _full_run(arrs, q, start=IDX0):
+    buy, sell = signal_arrays(arrs, q)
+    return summarize(*simulate(arrs, q, buy, sell, start, None, CASH), CASH)
+
+# --- cost_sweep: 한 번 시뮬레이션 + 비용 재계산 == 수수료마다 다시 실행 ---
+def test_cost_sweep_matches_full_rerun(arrs):
+    fees = [0.0, 5.0, 25.0, 100.0]
+    checked = 0
+    for q in _configs(60, seed=11):
+        df = cost_sweep(arrs, q, fees, CASH)
+        if df.empty: continue
+        for row in df.to_dict("records"):
+            res = _full_run(arrs, q.replace(fee_bps=row["수수료(bps)"]))
+            assert (row["수익률 (%)"], row["MDD (%)"]) == (res["수익률 (%)"], res["MDD (%)"]), (q, row["수수료(bps)"])
+            checked += 1
+    assert checked >= 100
+
+# --- start_date_curve: 기존 경로 합류 == 시작 봉마다 끝까지 다시 실행 ---
+def test_start_date_curve_matches_full_rerun(arrs):
+    starts = month_start_bars(arrs["dates"])
+    checked, merged = 0, 0
+    for q in _configs(12, seed=12):
+        df = start_date_curve(arrs, q, starts, CASH)
+        assert len(df) == len(starts)
+        for s, row in zip(starts, df.to_dict("records")):
+            res = _full_run(arrs, q, s)
+            assert (row["수익률 (%)"], row["MDD (%)"], row["총 매매 횟수"]) == \
+                   (res.get("수익률 (%)", 0.0), res.get("MDD (%)", 0.0), res.get("총 매매 횟수", 0)), (q, s)
+            checked += 1
+        merged += int(df["합류봉"].notna().sum())
+    assert checked == 12 * len(starts) and merged   # 합류 경로도 실제로 검사됨
+
+# --- bootstrap_trades ---
+RETS = [0.10, -0.05, 0.20, -0.10, -0.02, 0.07]
+
+def test_bootstrap_trades_reports_actual_sequence():
+    rep = bootstrap_trades(RETS, n_sims=2000, seed=1)
+    eq = np.cumprod(1 + np.array(RETS))
+    assert rep["매매수"] == 6 and rep["시뮬레이션"] == 2000
+    assert rep["실제"] == {"수익률 (%)": round((eq[-1] - 1) * 100, 2),
+                          "MDD (%)": round(((eq - np.maximum.accumulate(eq)) / np.maximum.accumulate(eq)).min() * 100, 2),
+                          "최대 연속손실": 2}
+    for k in ("수익률 (%)", "MDD (%)", "최대 연속손실"):
+        assert rep[k]["하위5%"] <= rep[k]["중앙값"] <= rep[k]["상위95%"]
+    assert 0 < rep["손실확률 (%)"] < 100
+
+def test_bootstrap_trades_is_seeded_and_chunk_independent():
+    assert bootstrap_trades(RETS, 3000, seed=5, chunk=1000) == bootstrap_trades(RETS, 3000, seed=5, chunk=3000)
+    assert bootstrap_trades([], 100) is None
+
+def test_bootstrap_trades_all_winners_never_lose():
+    rep = bootstrap_trades([0.01, 0.02, 0.03], n_sims=500, seed=0)
+    assert rep["손실확률 (%)"] == 0.0 and rep["최대 연속손실"]["상위95%"] == 0
+    assert rep["MDD (%)"] == {"하위5%": 0.0, "중앙값": 0.0, "상위95%": 0.0}
+
+# --- block_bootstrap_paths ---
+def test_block_bootstrap_paths_shapes_and_anchor(arrs):
+    chunks = list(block_bootstrap_paths(arrs, n_paths=7, block=10, chunk=3, seed=2))
+    assert [c["close"].shape for c in chunks] == [(3, arrs["n"]), (3, arrs["n"]), (1, arrs["n"])]
+    for c in chunks:
+        for k in ("sig", "close", "open", "high", "low", "mkt"):
+            assert np.allclose(c[k][:, 0], arrs[k][0])
+        assert (c["high"] >= c["low"]).all()
+    again = list(block_bootstrap_paths(arrs, n_paths=7, block=10, chunk=3, seed=2))
+    assert all(np.array_equal(a["close"], b["close"]) for a, b in zip(chunks, again))
+
+def test_block_bootstrap_paths_keep_same_day_returns_together(arrs):
+    # 시그널/매매/시장 수익률은 원본의 같은 날에서 함께 뽑혀야 한다 (상관관계 유지)
+    orig = np.stack([np.diff(np.log(arrs[k])) for k in ("sig", "close", "mkt")], axis=1)
+    c = next(block_bootstrap_paths(arrs, n_paths=2, block=20, chunk=2, seed=3))
+    for i in range(2):
+        steps = np.stack([np.diff(np.log(c[k][i])) for k in ("sig", "close", "mkt")], axis=1)
+        hit = np.isclose(steps[:, None, :], orig[None, :, :], rtol=0, atol=1e-9).all(axis=2).any(axis=1)
+        assert hit.all()
+
+def test_block_bootstrap_paths_too_short_yields_nothing(arrs):
+    short = {k: (v[:2] if isinstance(v, np.ndarray) else v) for k, v in arrs.items()}
+    assert list(block_bootstrap_paths({**short, "n": 2}, n_paths=5)) == []
+
+# --- cpcv_groups / purged_cv: 그룹 경계와 embargo ---
+def test_cpcv_groups_cover_range_with_embargo_gaps():
+    groups = cpcv_groups(1000, n_groups=6, embargo=5, start=IDX0)
+    assert len(groups) == 6 and groups[0][0] == IDX0 and groups[-1][1] == 1000
+    assert all(gs < ge for gs, ge in groups)
+    for (_, e1), (s2, _) in zip(groups, groups[1:]):
+        assert s2 - e1 == 5
+    # embargo 가 그룹보다 길면 그 그룹은 비고, 다음 그룹과 겹치지 않는다
+    wide = cpcv_groups(200, n_groups=3, embargo=80, start=IDX0)
+    assert wide[0] == (IDX0, 100) and wide[1] == (150, 150) and wide[2] == (200, 200)
+
+def test_purged_cv_simulates_only_inside_groups(arrs, monkeypatch):
+    seen = []
+    def spy(arrs_, q, buy, sell, start, end, cash):
+        eq, events = simulate(arrs_, q, buy, sell, start, end, cash)
+        seen.append((start, end, [e[0] for e in events]))
+        return eq, events
+    monkeypatch.setattr(validation, "simulate", spy)
+    cands = [c.to_dict() for c in _configs(3, seed=11)]
+    res = purged_cv(arrs, cands, n_groups=5, n_test_groups=2, embargo=10, initial_cash=CASH)
+    groups = cpcv_groups(arrs["n"], 5, 10)
+    assert [(s, e) for s, e, _ in seen] == groups * 3
+    assert all(s <= bar < e for s, e, bars in seen for bar in bars)
+    assert len(res["splits"]) == len(list(itertools.combinations(range(5), 2)))
+    assert list(res["summary"]["후보"]) == [0, 1, 2] and res["pbo"] is not None
+
+def test_purged_cv_degenerate_inputs(arrs):
+    one = purged_cv(arrs, [_configs(1, seed=3)[0].to_dict()], n_groups=4, n_test_groups=1)
+    assert len(one["summary"]) == 1 and len(one["splits"]) == 4 and one["pbo"] is None
+    empty = purged_cv(arrs, [], n_groups=4)
+    assert empty["summary"].empty and empty["splits"].empty and empty["pbo"] is None